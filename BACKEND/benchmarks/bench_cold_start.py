@@ -0,0 +1,51 @@
+"""Cold start time and peak RSS: parsing the CSVs vs memory-mapping the column cache.
+
+Each measurement runs in a fresh interpreter so peak RSS is per boot.
+Run from BACKEND/:  python -m benchmarks.bench_cold_start [rows ...]   (default 1M)
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synth import make_sales
+
+BOOT = """
+import resource, sys, time
+t0 = time.perf_counter()
+from datastore import DataStore
+snap = DataStore(sys.argv[1], cache_dir=sys.argv[2]).current()
+print(time.perf_counter() - t0, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, len(snap.sales))
+"""
+
+
+def boot(data_dir: str, cache_dir: str):
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", BOOT, data_dir, cache_dir],
+                         check=True, capture_output=True, text=True, cwd=os.getcwd()).stdout.split()
+    wall = time.perf_counter() - t0
+    return wall, float(out[0]), int(out[1]) / 1024, int(out[2])
+
+
+def run(n_rows: int):
+    data_dir = tempfile.mkdtemp(prefix="bipa-cold-")
+    try:
+        make_sales(n_rows, days=730).to_csv(os.path.join(data_dir, "sales.csv"), index=False, date_format="%Y-%m-%d")
+        shutil.copy(os.path.join("DATA", "daily_stats.csv"), data_dir)
+        cache_dir = os.path.join(data_dir, ".cache")
+
+        print(f"\n{n_rows:,} sales rows ({os.path.getsize(os.path.join(data_dir, 'sales.csv')) / 2**20:.0f} MiB csv)")
+        print(f"{'boot':<28}{'process s':>10}{'load s':>9}{'peak RSS MiB':>14}")
+        for label, cdir in [("csv, no cache", ""), ("csv, writing cache", cache_dir), ("column cache", cache_dir)]:
+            wall, load, rss, rows = boot(data_dir, cdir)
+            assert rows == n_rows, rows
+            print(f"{label:<28}{wall:>10.2f}{load:>9.2f}{rss:>14.0f}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    for n in [int(a) for a in sys.argv[1:]] or [1_000_000]:
+        run(n)
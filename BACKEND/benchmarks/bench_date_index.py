@@ -0,0 +1,70 @@
+"""Date-window lookups on daily stats: boolean masks over `datetime.date` objects vs searchsorted
+vs per-day prefix sums (DailyPrefix).
+
+Run from BACKEND/:  python -m benchmarks.bench_date_index [years] [stores]
+"""
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synth import timeit
+from timeindex import DailyPrefix, date_window, index_by_date
+
+
+def make_daily_stats(years: int, stores: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2015-01-01", periods=365 * years, freq="D")
+    n = len(days) * stores
+    customers = rng.integers(80, 180, n)
+    aov = rng.uniform(12, 18, n)
+    return pd.DataFrame({
+        "date": np.repeat(days.to_numpy(), stores),
+        "store_id": np.tile(np.arange(stores), len(days)),
+        "total_customers": customers,
+        "total_revenue": np.round(customers * aov, 2),
+        "avg_order_value": np.round(aov, 2),
+    })
+
+
+def run(years: int, stores: int):
+    raw = make_daily_stats(years, stores)
+    old = raw.sample(frac=1, random_state=0)          # CSV order isn't guaranteed
+    old["date"] = pd.to_datetime(old["date"]).dt.date  # the previous object column
+    new = index_by_date(raw)
+    prefix = DailyPrefix(new, ["total_revenue"])
+
+    end = date(2015, 1, 1) + timedelta(days=365 * years - 1)
+    cases = {
+        "kpi window=7": (end - timedelta(days=6), end),
+        "kpi window=30": (end - timedelta(days=29), end),
+        "trend 1 year": (end - timedelta(days=364), end),
+    }
+    print(f"\n{years} years x {stores} stores = {len(raw):,} daily rows")
+    print(f"{'lookup':<16}{'mask ms':>10}{'copy+mask ms':>14}{'searchsorted ms':>17}{'prefix ms':>11}")
+    for name, (s, e) in cases.items():
+        mask = timeit(lambda: old.loc[(old["date"] >= s) & (old["date"] <= e), "total_revenue"].sum())
+
+        def copy_mask():
+            d = old.copy()
+            d = d[d["date"] >= s]
+            d = d[d["date"] <= e]
+            return d.sort_values("date")
+
+        trend = timeit(copy_mask)
+        fast = timeit(lambda: date_window(new, s, e)["total_revenue"].sum())
+
+        def prefix_total():
+            i, j = prefix.bounds(s, e)
+            return prefix.total("total_revenue", i, j)
+
+        o1 = timeit(prefix_total)
+        print(f"{name:<16}{mask:>10.2f}{trend:>14.2f}{fast:>17.3f}{o1:>11.4f}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    years = args[0] if args else 10
+    stores = args[1] if len(args) > 1 else 100
+    run(years, stores)
@@ -0,0 +1,156 @@
+"""/forecast: fit cost, incremental refit, cached answers and backtest accuracy.
+
+For each size the data generator writes a DATA/ directory, then:
+
+    full fit       a fresh Forecaster fitting the 8-week window
+    per-item loop  the same fit run one item at a time, for comparison (and parity)
+    next day       refit after the data gains a day (only that day is aggregated)
+    cached         a 7-day forecast for every item from the kept fit
+
+Appends, through the DataStore listener: rows for the last day keep the
+fit and refit incrementally; rows backdated into the window drop it, and the
+refit has them in its cube.
+
+The backtest fits through each of the last four weeks in turn, forecasts the
+following 7 days and compares with what was sold: WAPE (sum of absolute
+errors over the sum of actuals) per item and day, and per item, day and
+hour, against the seasonal-naive forecast "same as a week earlier".
+
+Run from BACKEND/:  python -m benchmarks.bench_forecast [stores:years ...]   (default 1:1 10:2)
+"""
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+from datetime import timedelta
+
+import numpy as np
+
+import data_generator as gen
+from benchmarks.synth import timeit
+from datastore import DataStore
+from forecast import Forecaster, fit_models, predict, window_cube
+from live import append_sales
+from repository import FrameView
+
+
+class _Upto:
+    """A view whose data ends on `end`."""
+
+    def __init__(self, view, end):
+        self.view, self.end = view, end
+
+    def last_sale_day(self):
+        return self.end
+
+    def item_hours(self, start=None, end=None):
+        return self.view.item_hours(start, min(end, self.end) if end is not None else self.end)
+
+
+def _wape(pred, actual) -> float:
+    return float(np.abs(pred - actual).sum() / max(actual.sum(), 1e-9) * 100)
+
+
+def appends(root: str):
+    store = DataStore(root, cache_dir="")
+    f = Forecaster(sales_path=store.path("sales.csv"))
+    store.listeners.append(f.on_publish)
+    columns = store.current().files["sales.csv"].columns
+
+    def append(day, quantity):
+        append_sales(store.path("sales.csv"), columns, [{
+            "date": day.isoformat(), "time": "10:30", "item_name": "Latte", "category": "Coffee",
+            "quantity": quantity, "price": 5.0, "total": 5.0 * quantity, "payment_method": "Card"}])
+        store.refresh()
+        snap = store.current()
+        return snap.tag, FrameView(snap)
+
+    def latte(fit, day):
+        return fit.cube[fit.items.index("Latte"), (day - fit.start).days, 10]
+
+    first = f.fitted(store.current().tag, FrameView(store.current()))
+    last = first.end
+    tag, view = append(last, 3)
+    still = f._fit is first
+    kept = f.fitted(tag, view)
+    print(f"{'  same-day append kept':<26}{still and latte(kept, last) == latte(first, last) + 3!s:>8}")
+    back = last - timedelta(days=10)
+    before = latte(kept, back)
+    tag, view = append(back, 50)
+    dropped = f._fit is None
+    refit = f.fitted(tag, view)
+    print(f"{'  backdated append refit':<26}{dropped and latte(refit, back) == before + 50!s:>8}")
+
+
+def run(stores: int, years: int):
+    root = tempfile.mkdtemp(prefix="bipa-forecast-")
+    try:
+        end = gen.START_DATE + timedelta(days=round(365.25 * years))
+        with contextlib.redirect_stdout(io.StringIO()):
+            gen.save_datasets(root, gen.START_DATE, end, stores, 0, 1)
+        view = FrameView(DataStore(root, cache_dir="").current())
+        last = view.last_sale_day()
+        print(f"\n{stores} store(s) x {years} years, {len(view.snap.sales):,} sales rows, window 56 days")
+
+        def full():
+            return Forecaster().fitted("t", view)
+
+        fit = full()
+        print(f"{len(fit.items)} items")
+        print(f"{'full fit ms':<26}{timeit(full):>8.2f}")
+
+        def loop():
+            return [fit_models(fit.cube[i:i + 1], fit.start) for i in range(len(fit.items))]
+
+        t_loop = timeit(lambda: (loop(), fit_models(fit.cube, fit.start)))
+        t_batch = timeit(lambda: fit_models(fit.cube, fit.start))
+        per_item = loop()
+        same = all(np.allclose(a, b[i:i + 1].reshape(a.shape)) for i, p in enumerate(per_item)
+                   for a, b in zip(p, (fit.weekday, fit.share, fit.level)))
+        print(f"{'model fit, batched ms':<26}{t_batch:>8.2f}")
+        print(f"{'model fit, per-item ms':<26}{t_loop - t_batch:>8.2f}   same models: {same}")
+
+        def next_day():
+            f = Forecaster()
+            f.fitted("a", _Upto(view, last - timedelta(days=1)))
+            return f
+
+        base = next_day()
+        t_prev = timeit(lambda: Forecaster().fitted("a", _Upto(view, last - timedelta(days=1))))
+
+        def refit():
+            base._fit = prev
+            return base.fitted("b", view)
+
+        prev = base._fit
+        print(f"{'next day refit ms':<26}{timeit(refit):>8.2f}   (full fit of the previous day: {t_prev:.2f})")
+        inc = refit()
+        print(f"{'  equals a full fit':<26}{np.allclose(inc.cube, fit.cube) and np.allclose(inc.level, fit.level)!s:>8}")
+        f = Forecaster()
+        f._fit = fit
+        print(f"{'cached 7-day forecast ms':<26}{timeit(lambda: f.forecast('t', view, 7)):>8.2f}")
+        appends(root)
+
+        # backtest
+        errors = {"model day": [], "naive day": [], "model hour": [], "naive hour": []}
+        for k in range(4, 0, -1):
+            through = last - timedelta(days=7 * k)
+            bt = Forecaster().fitted("bt", _Upto(view, through))
+            pred = predict(bt, 7)
+            actual = window_cube(view.item_hours(through + timedelta(days=1), through + timedelta(days=7)),
+                                 bt.items, through + timedelta(days=1), 7)
+            naive = bt.cube[:, -7:]
+            errors["model day"].append(_wape(pred.sum(axis=2), actual.sum(axis=2)))
+            errors["naive day"].append(_wape(naive.sum(axis=2), actual.sum(axis=2)))
+            errors["model hour"].append(_wape(pred, actual))
+            errors["naive hour"].append(_wape(naive, actual))
+        print("backtest WAPE %, last 4 weeks:  " + "   ".join(f"{k} {np.mean(v):.1f}" for k, v in errors.items()))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    for size in sys.argv[1:] or ["1:1", "10:2"]:
+        stores, years = size.split(":")
+        run(int(stores), int(years))
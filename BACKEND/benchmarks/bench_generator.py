@@ -0,0 +1,42 @@
+"""Data generator throughput: sales lines per second by dataset size and worker count.
+
+Run from BACKEND/:  python -m benchmarks.bench_generator [stores:years ...] [--workers N ...]
+(default: 1 store x the default date range, 10 stores x 2 years, 50 stores x 3 years; 1 worker and all CPUs)
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import data_generator as gen
+
+
+def run(stores: int, years: float, workers: int):
+    out = tempfile.mkdtemp(prefix="bipa-gen-")
+    end = gen.START_DATE + timedelta(days=round(365.25 * years)) if years else gen.END_DATE
+    try:
+        t0 = time.perf_counter()
+        rows, _ = gen.generate_sales_files(out, gen.START_DATE, end, stores, seed=0, workers=workers)
+        elapsed = time.perf_counter() - t0
+        size = os.path.getsize(os.path.join(out, "sales.csv"))
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+    print(f"{stores:>7}{years or (gen.DAYS / 365.25):>7.1f}{workers:>9}{rows:>14,}{size / 2**20:>10.0f}"
+          f"{elapsed:>10.2f}{rows / elapsed / 1000:>12.0f}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    workers = []
+    while "--workers" in args:
+        i = args.index("--workers")
+        workers.append(int(args[i + 1]))
+        del args[i:i + 2]
+    sizes = [tuple(float(v) for v in a.split(":")) for a in args] or [(1, 0), (10, 2), (50, 3)]
+    workers = workers or sorted({1, os.cpu_count() or 1})
+    print(f"{'stores':>7}{'years':>7}{'workers':>9}{'lines':>14}{'MiB':>10}{'s':>10}{'k lines/s':>12}")
+    for stores, years in sizes:
+        for w in workers:
+            run(int(stores), years, w)
@@ -0,0 +1,133 @@
+"""/inventory/projection: cost from the rollup vs the sales lines, and with wide catalogs.
+
+Part 1 generates a DATA/ directory (stores x years) and projects the
+generator's inventory through its recipes twice:
+
+    rollup       stock.project over FrameView (item x day quantities from the rollup)
+    sales lines  the same numbers by joining every sales line in range with recipes.csv
+                 and grouping by ingredient, as without the rollup
+
+Part 2 scales the catalog: a view serving item x day x hour cells for N menu
+items, recipes of 4-8 ingredients per item over N/2 inventory items, and
+projects them all, against a loop that does one ingredient at a time.
+
+Run from BACKEND/:  python -m benchmarks.bench_inventory [stores:years ...]   (default 10:2)
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import data_generator as gen
+from benchmarks.synth import timeit
+from datastore import DataStore
+from repository import ITEM_HOUR_COLUMNS, FrameView
+from stock import Recipes, load_recipes, load_stock, project
+
+WINDOW = 14
+
+
+def from_lines(sales: pd.DataFrame, lines: pd.DataFrame, stock: pd.DataFrame, as_of, window: int) -> pd.Series:
+    """Daily use per ingredient over the trailing window, straight from the sales lines."""
+    start = pd.Timestamp(as_of - timedelta(days=window - 1))
+    recent = sales.loc[sales.index >= start, ["item_name", "quantity"]]
+    recent = recent.assign(item_name=recent["item_name"].astype(str))
+    used = recent.merge(lines, left_on="item_name", right_on="menu_item")
+    used = (used["quantity_x"] * used["quantity_y"]).groupby(used["ingredient"]).sum() / window
+    return used.reindex(stock["item_name"], fill_value=0.0)
+
+
+def real(stores: int, years: int):
+    root = tempfile.mkdtemp(prefix="bipa-inventory-")
+    try:
+        end = gen.START_DATE + timedelta(days=round(365.25 * years))
+        with contextlib.redirect_stdout(io.StringIO()):
+            gen.save_datasets(root, gen.START_DATE, end, stores, 0, 1)
+        view = FrameView(DataStore(root, cache_dir="").current())
+        recipes = load_recipes(os.path.join(root, "recipes.csv"))
+        stock = load_stock(os.path.join(root, "inventory.csv"))
+        lines = pd.read_csv(os.path.join(root, "recipes.csv"))
+        sales = view.snap.sales
+        print(f"\n{stores} store(s) x {years} years, {len(sales):,} sales rows, "
+              f"{len(recipes.items)} menu items, {len(stock)} inventory items, window {WINDOW} days")
+
+        out = project(recipes, stock, view, WINDOW)
+        # a fresh view each time, so the cube slice isn't reused between runs
+        t_roll = timeit(lambda: project(recipes, stock, FrameView(view.snap), WINDOW))
+        t_lines = timeit(lambda: from_lines(sales, lines, stock, view.last_sale_day(), WINDOW))
+        got = pd.Series({r["item_name"]: r["daily_usage"] for r in out["ingredients"]})
+        want = from_lines(sales, lines, stock, view.last_sale_day(), WINDOW)
+        same = np.allclose(got.reindex(want.index), want.round(3), atol=1e-3)
+        print(f"{'rollup ms':<22}{t_roll:>8.2f}")
+        print(f"{'sales lines ms':<22}{t_lines:>8.2f}   same daily use: {same}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+class _Cells:
+    """A view serving fixed item x day x hour cells."""
+
+    def __init__(self, cells: pd.DataFrame, last):
+        self.cells, self.last = cells, last
+
+    def last_sale_day(self):
+        return self.last
+
+    def item_hours(self, start=None, end=None):
+        return self.cells
+
+
+def wide(n_items: int, days: int = 28, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    n_ingredients = max(1, n_items // 2)
+    items = [f"item {i}" for i in range(n_items)]
+    ingredients = [f"ingredient {j}" for j in range(n_ingredients)]
+    matrix = np.zeros((n_items, n_ingredients))
+    for i in range(n_items):
+        k = rng.integers(4, 9)
+        k = min(k, n_ingredients)
+        matrix[i, rng.choice(n_ingredients, k, replace=False)] = rng.uniform(0.01, 0.3, k)
+    recipes = Recipes(items, ingredients, matrix)
+
+    last = date(2024, 9, 30)
+    first = last - timedelta(days=days - 1)
+    grid = pd.MultiIndex.from_product([pd.date_range(first, last), range(6, 22), items], names=ITEM_HOUR_COLUMNS[:3])
+    cells = grid.to_frame(index=False).assign(quantity=rng.poisson(2.0, len(grid)).astype("float64"))
+    # typed as FrameView.item_hours returns them
+    cells = cells.astype({"hour": "int8", "item_name": "category"})
+    stock = pd.DataFrame({
+        "item_name": ingredients,
+        "category": "Supplies",
+        "current_stock": rng.uniform(50, 500, n_ingredients),
+        "reorder_level": rng.uniform(10, 50, n_ingredients),
+        "last_updated": [last - timedelta(days=int(d)) for d in rng.integers(0, 7, n_ingredients)],
+    })
+    view = _Cells(cells, last)
+
+    def loop():
+        daily = cells.groupby("item_name", observed=False)["quantity"].sum().reindex(items, fill_value=0.0) / days
+        return [float(sum(matrix[i, j] * daily.iat[i] for i in range(n_items) if matrix[i, j]))
+                for j in range(n_ingredients)]
+
+    out = project(recipes, stock, view, days)
+    t_batch = timeit(lambda: project(recipes, stock, view, days))
+    t_loop = timeit(loop, repeat=1)
+    got = {r["item_name"]: r["daily_usage"] for r in out["ingredients"]}
+    same = np.allclose([got[j] for j in ingredients], loop(), atol=1e-3)
+    print(f"{n_items:>6} items {n_ingredients:>5} ingredients {len(cells):>10,} cells"
+          f"   project {t_batch:>8.2f} ms   per-ingredient loop {t_loop:>9.2f} ms   same: {same}")
+
+
+if __name__ == "__main__":
+    for size in sys.argv[1:] or ["10:2"]:
+        stores, years = size.split(":")
+        real(int(stores), int(years))
+    print("\nwide catalogs, 28 days x 16 hours of cells")
+    for n in (100, 500, 2000):
+        wide(n)
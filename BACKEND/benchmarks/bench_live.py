@@ -0,0 +1,130 @@
+"""Fan-out latency of /live/stream with many dashboards connected.
+
+Serves a generated dataset with uvicorn in a child process (as bench_load
+does), connects --subscribers SSE clients, then POSTs --events batches of
+sale events to /live/events one after another. For every batch it records
+when each subscriber received the delta carrying that batch's version, and
+reports the POST round trip and the delivery latency (POST sent -> delta
+read) over all subscribers, plus the server's RSS. Ends by checking that
+the /dashboard/bundle refetched afterwards equals the first one plus the
+increments the subscribers saw.
+
+Run from BACKEND/:  python -m benchmarks.bench_live [--subscribers 200] [--events 50] [--batch 1]
+"""
+import argparse
+import http.client
+import json
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.bench_load import Server, get, make_dataset, rss_mib
+
+ITEMS = [("Latte", "Coffee", 4.5), ("Croissant", "Food", 3.25), ("Iced Tea", "Beverages", 3.0)]
+
+
+def subscribe(port: int, received: dict, ready: threading.Barrier, stop: threading.Event, deltas: list):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    conn.request("GET", "/live/stream")
+    response = conn.getresponse()
+    ready.wait()
+    event = None
+    while not stop.is_set():
+        line = response.fp.readline()
+        if not line:
+            break
+        line = line.decode().rstrip("\n")
+        if line.startswith("event: "):
+            event = line[7:]
+        elif line.startswith("data: ") and event == "delta":
+            payload = json.loads(line[6:])
+            received.setdefault(payload["version"], []).append(time.perf_counter())
+            deltas.append(payload)
+    conn.close()
+
+
+def post(conn, events: list):
+    body = json.dumps(events)
+    conn.request("POST", "/live/events", body, {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def _bundle(port: int) -> dict:
+    status, body = get(http.client.HTTPConnection("127.0.0.1", port, timeout=120), "/dashboard/bundle?period=7d")
+    return json.loads(body)
+
+
+def run(args):
+    root = tempfile.mkdtemp(prefix="bipa-live-")
+    server = None
+    try:
+        dataset = make_dataset(root, 1, 0, 0)
+        server = Server(root, {"DATA_RELOAD_SECONDS": "0"})
+        server.wait_ready()
+        before = _bundle(server.port)
+        day = before["end_date"]
+
+        received, deltas = {}, []
+        ready = threading.Barrier(args.subscribers + 1)
+        stop = threading.Event()
+        threads = [threading.Thread(target=subscribe, args=(server.port, received, ready, stop, deltas if k == 0 else []),
+                                    daemon=True) for k in range(args.subscribers)]
+        for t in threads:
+            t.start()
+        ready.wait()
+        time.sleep(0.5)
+        rss_connected = rss_mib(server.proc.pid)
+
+        conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=120)
+        sent, round_trips = {}, []
+        for k in range(args.events):
+            item, category, price = ITEMS[k % len(ITEMS)]
+            events = [{"date": day, "time": f"{8 + (k + j) % 12:02d}:15", "item_name": item, "category": category,
+                       "quantity": 1 + j % 3, "price": price, "payment_method": "Card"} for j in range(args.batch)]
+            t0 = time.perf_counter()
+            status, reply = post(conn, events)
+            round_trips.append(time.perf_counter() - t0)
+            if status != 200:
+                raise RuntimeError(f"POST /live/events -> {status}: {reply}")
+            sent[reply["version"]] = t0
+        deadline = time.perf_counter() + 10
+        while time.perf_counter() < deadline and any(len(received.get(v, ())) < args.subscribers for v in sent):
+            time.sleep(0.05)
+        rss_end = rss_mib(server.proc.pid)
+        stop.set()
+
+        latency = np.array([t - sent[v] for v, times in received.items() if v in sent for t in times]) * 1000
+        missing = sum(args.subscribers - len(received.get(v, ())) for v in sent)
+        rtt = np.array(round_trips) * 1000
+        print(f"{dataset['sales_rows']:,} sales rows, {args.subscribers} subscribers, "
+              f"{args.events} POSTs of {args.batch} event(s)")
+        print(f"POST /live/events   p50 {np.percentile(rtt, 50):7.2f} ms   p99 {np.percentile(rtt, 99):7.2f} ms")
+        print(f"delivery (all subs) p50 {np.percentile(latency, 50):7.2f} ms   p99 {np.percentile(latency, 99):7.2f} ms"
+              f"   max {latency.max():7.2f} ms   missing {missing}")
+        print(f"server RSS: {rss_connected:.0f} MiB with subscribers connected, {rss_end:.0f} MiB at the end")
+
+        # the refetched bundle must equal the first one plus the increments
+        after = _bundle(server.port)
+        hourly = {r["hour"]: r["revenue"] for r in before["hourly_data"]}
+        for d in deltas:
+            for change in d["changes"]:
+                for cell in change.get("hourly", []):
+                    hourly[cell["hour"]] = hourly.get(cell["hour"], 0.0) + cell["revenue"]
+        ok = all(abs(hourly.get(r["hour"], 0.0) - r["revenue"]) < 0.01 for r in after["hourly_data"])
+        print(f"bundle after = bundle before + deltas: {ok}")
+    finally:
+        if server is not None:
+            server.stop()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=200)
+    parser.add_argument("--events", type=int, default=50, help="POSTs to send")
+    parser.add_argument("--batch", type=int, default=1, help="sale events per POST")
+    run(parser.parse_args())
@@ -0,0 +1,262 @@
+"""Latency and throughput of the API under concurrent load.
+
+For each dataset size the data generator writes a fresh DATA/ directory, the
+app is served from it by uvicorn in a child process (so RSS is the app's
+alone), and every endpoint is driven in turn by --clients threads on
+keep-alive connections for --duration seconds. Reports p50/p95/p99 latency,
+requests per second and the server's RSS per endpoint, and writes it all to
+a JSON file; --compare diffs two such files (e.g. from two commits).
+
+Run from BACKEND/:
+    python -m benchmarks.bench_load [stores:years ...] [--clients 8] [--duration 10] [--no-cache] [--out FILE]
+    python -m benchmarks.bench_load --compare BASE.json NEW.json
+(default sizes: 1 store x the default date range, 10 stores x 1 year, 50 stores x 2 years; years 0 = default range)
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import data_generator as gen
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = [
+    "/kpi/",
+    "/kpi/?window=30",
+    "/dashboard-data",
+    "/dashboard/bundle?period=30d",
+    "/dashboard/bundle?period=30d&category=Coffee",
+    "/revenue-trends",
+    "/product-analytics",
+    "/hourly-analysis",
+    "/heatmap",
+    "/heatmap?start_date={month_ago}&end_date={last_day}",
+    "/feedback-summary",
+    "/inventory",
+    "/mba/rules",
+    "/mba/rules?min_support=0.005&min_confidence=0.3",
+]
+
+
+def make_dataset(root: str, stores: int, years: float, seed: int) -> dict:
+    end = gen.START_DATE + timedelta(days=round(365.25 * years)) if years else gen.END_DATE
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        gen.save_datasets(os.path.join(root, "DATA"), gen.START_DATE, end, stores, seed, os.cpu_count() or 1)
+    sales = os.path.join(root, "DATA", "sales.csv")
+    with open(sales, "rb") as f:
+        rows = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 24), b"")) - 1
+    return {"stores": stores, "years": years or round(gen.DAYS / 365.25, 2), "sales_rows": rows,
+            "csv_mib": round(os.path.getsize(sales) / 2**20, 1), "generate_s": round(time.perf_counter() - t0, 2),
+            "last_day": (end - timedelta(days=1)).strftime("%Y-%m-%d")}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_mib(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+class Server:
+    """uvicorn serving main:app from `root` (which holds DATA/) in a child process."""
+
+    def __init__(self, root: str, env: dict, args=()):
+        self.port = _free_port()
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND, "--port", str(self.port),
+             "--log-level", "warning", "--no-access-log", *args],
+            cwd=root, env={**os.environ, **env})
+
+    def wait_ready(self, timeout: float = 600) -> float:
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < timeout:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"server exited with {self.proc.returncode}")
+            try:
+                status, _ = get(http.client.HTTPConnection("127.0.0.1", self.port, timeout=5), "/")
+                if status == 200:
+                    return time.perf_counter() - t0
+            except OSError:
+                time.sleep(0.2)
+        raise TimeoutError("server did not start")
+
+    def stop(self):
+        self.proc.terminate()
+        try:
+            self.proc.wait(10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+def get(conn: http.client.HTTPConnection, path: str):
+    conn.request("GET", path)
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def drive(port: int, path: str, clients: int, duration: float, pid: int) -> dict:
+    """`clients` threads requesting `path` back to back for `duration` seconds."""
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+    start = threading.Barrier(clients + 1)
+    stop_at = [0.0]
+
+    def client(k):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        start.wait()
+        while time.perf_counter() < stop_at[0]:
+            t0 = time.perf_counter()
+            try:
+                status, _ = get(conn, path)
+            except (OSError, http.client.HTTPException):
+                status = 0
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            latencies[k].append(time.perf_counter() - t0)
+            errors[k] += status != 200
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(clients)]
+    for t in threads:
+        t.start()
+    peak = rss_mib(pid)
+    stop_at[0] = time.perf_counter() + duration
+    t0 = time.perf_counter()
+    start.wait()
+    while any(t.is_alive() for t in threads):
+        peak = max(peak, rss_mib(pid))
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - t0
+
+    ms = np.concatenate([np.asarray(v) for v in latencies]) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (np.nan,) * 3
+    return {"requests": int(len(ms)), "errors": int(sum(errors)), "throughput_rps": round(len(ms) / elapsed, 1),
+            "p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2), "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(ms.max()), 2) if len(ms) else None, "rss_peak_mib": round(peak, 1)}
+
+
+def run(stores: int, years: float, args) -> dict:
+    root = tempfile.mkdtemp(prefix="bipa-load-")
+    try:
+        dataset = make_dataset(root, stores, years, args.seed)
+        print(f"\n{stores} store(s) x {dataset['years']} years: {dataset['sales_rows']:,} sales rows, "
+              f"{dataset['csv_mib']:.0f} MiB csv (generated in {dataset['generate_s']:.0f} s)")
+        env = {"DATA_RELOAD_SECONDS": "0"}
+        if args.no_cache:
+            env["RESPONSE_CACHE_SIZE"] = "0"
+        server = Server(root, env)
+        try:
+            dataset["boot_s"] = round(server.wait_ready(), 2)
+            dataset["rss_idle_mib"] = round(rss_mib(server.proc.pid), 1)
+            last_day = pd.Timestamp(dataset["last_day"])
+            values = {"last_day": f"{last_day:%Y-%m-%d}", "month_ago": f"{last_day - pd.Timedelta(days=29):%Y-%m-%d}"}
+            print(f"{'endpoint':<48}{'first ms':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'RSS MiB':>9}{'err':>5}")
+            results = {}
+            for template in args.endpoints:
+                path = template.format(**values)
+                conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=600)
+                t0 = time.perf_counter()
+                get(conn, path)
+                first = (time.perf_counter() - t0) * 1000
+                conn.close()
+                r = {"first_ms": round(first, 2), **drive(server.port, path, args.clients, args.duration, server.proc.pid)}
+                results[template] = r
+                print(f"{template[:47]:<48}{first:>10.1f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+                      f"{r['throughput_rps']:>9.0f}{r['rss_peak_mib']:>9.0f}{r['errors']:>5}")
+            dataset["rss_end_mib"] = round(rss_mib(server.proc.pid), 1)
+            dataset["endpoints"] = results
+        finally:
+            server.stop()
+        return dataset
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(base_path: str, new_path: str):
+    """Print p95 and throughput of NEW relative to BASE for every dataset/endpoint they share."""
+    base, new = (json.load(open(p)) for p in (base_path, new_path))
+    print(f"{base.get('commit') or base_path} -> {new.get('commit') or new_path}")
+    old = {(d["stores"], d["years"]): d for d in base["datasets"]}
+    for d in new["datasets"]:
+        b = old.get((d["stores"], d["years"]))
+        if b is None:
+            continue
+        print(f"\n{d['stores']} store(s) x {d['years']} years   RSS idle {b['rss_idle_mib']:.0f} -> {d['rss_idle_mib']:.0f} MiB")
+        print(f"{'endpoint':<48}{'p95 ms':>18}{'change':>9}{'req/s':>16}{'change':>9}")
+        for path, r in d["endpoints"].items():
+            o = b["endpoints"].get(path)
+            if o is None:
+                continue
+            p95 = (r["p95_ms"] / o["p95_ms"] - 1) * 100 if o["p95_ms"] else float("nan")
+            rps = (r["throughput_rps"] / o["throughput_rps"] - 1) * 100 if o["throughput_rps"] else float("nan")
+            print(f"{path[:47]:<48}{o['p95_ms']:>8.2f} ->{r['p95_ms']:>7.2f}{p95:>+8.0f}%"
+                  f"{o['throughput_rps']:>7.0f} ->{r['throughput_rps']:>6.0f}{rps:>+8.0f}%")
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sizes", nargs="*", default=["1:0", "10:1", "50:2"], help="stores:years per dataset")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent clients (default 8)")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per endpoint (default 10)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache (RESPONSE_CACHE_SIZE=0)")
+    parser.add_argument("--endpoint", dest="endpoints", action="append", help="only these endpoints (repeatable)")
+    parser.add_argument("--out", default=None, help="results file (default bench_load-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="diff two results files and exit")
+    args = parser.parse_args(argv)
+    args.endpoints = args.endpoints or ENDPOINTS
+    return args
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.compare:
+        compare(*args.compare)
+        sys.exit()
+    commit = _commit()
+    report = {
+        "commit": commit,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": {"clients": args.clients, "duration_s": args.duration, "seed": args.seed,
+                   "response_cache": not args.no_cache},
+        "datasets": [],
+    }
+    for size in args.sizes:
+        stores, years = size.split(":")
+        report["datasets"].append(run(int(stores), float(years), args))
+    out = args.out or f"bench_load-{commit or 'local'}.json"
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {out}")
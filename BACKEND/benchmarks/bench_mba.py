@@ -0,0 +1,46 @@
+"""Market-basket mining time: first request (encode + mine), slider changes and cache hits.
+
+Run from BACKEND/:  python -m benchmarks.bench_mba [baskets ...]
+(default sizes: 1M and 3M baskets of 1-4 lines)
+"""
+import sys
+
+import numpy as np
+
+from benchmarks.synth import make_sales, timeit
+from datastore import prepare_sales
+from mba import BasketMiner, encode_baskets
+
+
+def make_baskets(n_baskets: int, seed: int = 0):
+    """Typed sales lines grouped into baskets: each basket's lines share the date, time and staff of its first line."""
+    rng = np.random.default_rng(seed)
+    sizes = rng.choice([1, 2, 3, 4], n_baskets, p=[0.4, 0.3, 0.2, 0.1])
+    sales = make_sales(int(sizes.sum()), days=730, seed=seed)
+    first = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    for col in ["date", "time", "staff_name"]:
+        sales[col] = sales[col].to_numpy()[first]
+    return prepare_sales(sales)
+
+
+def run(n_baskets: int):
+    lines = make_baskets(n_baskets)
+    encode_ms = timeit(lambda: encode_baskets(lines), repeat=1)
+    miner = BasketMiner(floor=0.001)
+    first_ms = timeit(lambda: miner.rules("v1", lambda: lines, 0.01, 0.1), repeat=1)
+    out = miner.rules("v1", lambda: lines, 0.01, 0.1)
+    print(f"\n{len(lines):,} lines -> {out['baskets']:,} baskets; {len(miner._mined.itemsets):,} itemsets "
+          f"and {len(miner._mined.rules.both):,} candidate rules at support >= 0.001")
+    print(f"  encode baskets          {encode_ms:>9.1f} ms")
+    print(f"  first request (mine)    {first_ms:>9.1f} ms")
+    thresholds = [(s, c) for s in (0.002, 0.005, 0.02, 0.05) for c in (0.05, 0.2, 0.4)]
+    slide_ms = max(timeit(lambda: miner.rules("v1", lambda: lines, s, c), repeat=1) for s, c in thresholds)
+    print(f"  new threshold (worst)   {slide_ms:>9.2f} ms")
+    hit_ms = timeit(lambda: miner.rules("v1", lambda: lines, 0.02, 0.2))
+    print(f"  cached threshold        {hit_ms:>9.3f} ms")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000_000, 3_000_000]
+    for n in sizes:
+        run(n)
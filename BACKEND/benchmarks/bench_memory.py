@@ -0,0 +1,39 @@
+"""In-memory footprint of sales rows per million: plain read_csv dtypes vs the typed schema.
+
+Run from BACKEND/:  python -m benchmarks.bench_memory [rows]   (default 1M)
+"""
+import io
+import sys
+
+import pandas as pd
+
+from benchmarks.synth import make_sales
+from datastore import prepare_sales
+
+
+def per_million(frame: pd.DataFrame, n_rows: int) -> pd.Series:
+    usage = frame.memory_usage(deep=True, index=True)
+    return usage / 2**20 * (1_000_000 / n_rows)
+
+
+def run(n_rows: int):
+    buf = io.StringIO()
+    make_sales(n_rows, days=730).to_csv(buf, index=False, date_format="%Y-%m-%d")
+
+    buf.seek(0)
+    before = pd.read_csv(buf, parse_dates=["date"])
+    before["hour"] = before["time"].astype(str).str.split(":").str[0].astype(int)
+
+    buf.seek(0)
+    after = prepare_sales(pd.read_csv(buf)).reset_index()   # date index back to a column to line up
+
+    b, a = per_million(before, n_rows), per_million(after, n_rows)
+    print(f"\nMiB per 1M sales rows (measured on {n_rows:,})")
+    print(f"{'column':<16}{'before':>18}{'':>8}{'after':>22}")
+    for col in b.index.drop("Index"):
+        print(f"{col:<16}{str(before[col].dtype):>18}{b[col]:>8.1f}{str(after[col].dtype):>22}{a[col]:>8.1f}")
+    print(f"{'total':<16}{'':>18}{b.sum():>8.1f}{'':>22}{a.sum():>8.1f}   ({b.sum() / a.sum():.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,62 @@
+"""One-week queries against month-partitioned sales vs the in-memory rollup, as history grows.
+
+For each size the data generator writes a DATA/ directory; the partitions
+are built once (timed), then the 7-day peak-hour totals and the 7-day
+heatmap grid are timed on a fresh view per call, the way requests see them.
+"cold" drops the open-partition cache first, so it includes mapping the files.
+
+Run from BACKEND/:  python -m benchmarks.bench_partitions [stores:years ...]   (default 1:1 1:10 10:1)
+"""
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import data_generator as gen
+from benchmarks.synth import timeit
+from datastore import DataStore
+from repository import FrameView
+
+
+def run(stores: int, years: int):
+    root = tempfile.mkdtemp(prefix="bipa-parts-")
+    try:
+        end = gen.START_DATE + timedelta(days=round(365.25 * years))
+        with contextlib.redirect_stdout(io.StringIO()):
+            gen.save_datasets(root, gen.START_DATE, end, stores, 0, 1)
+        memory = DataStore(root, cache_dir="")
+        snap = memory.current()
+        t0 = time.perf_counter()
+        parted = DataStore(root, cache_dir="", partitioned=True).current()
+        build = time.perf_counter() - t0
+
+        last = snap.daily.index[-1].date()
+        week = (last - timedelta(days=6), last)
+        opened = len(parted.partitions.select(*week))
+        print(f"\n{stores} store(s) x {years} years: {len(snap.rollup):,} rollup cells, "
+              f"{len(parted.partitions.partitions)} partitions (built in {build:.1f} s), a week opens {opened}")
+        print(f"{'query':<22}{'in-memory ms':>14}{'partitioned ms':>16}{'cold ms':>10}")
+        queries = {
+            "7-day hour totals": lambda s: FrameView(s).totals("hour", *week),
+            "7-day heatmap": lambda s: FrameView(s).weekday_hour(*week),
+        }
+        for name, query in queries.items():
+            mem = timeit(lambda: query(snap))
+            part = timeit(lambda: query(parted))
+
+            def cold():
+                parted.partitions._open.clear()
+                return query(parted)
+
+            print(f"{name:<22}{mem:>14.2f}{part:>16.2f}{timeit(cold):>10.2f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    for size in sys.argv[1:] or ["1:1", "1:10", "10:1"]:
+        stores, years = size.split(":")
+        run(int(stores), int(years))
@@ -0,0 +1,61 @@
+"""Per-request latency of the analytics endpoints: raw sales groupby vs the rollup cube.
+
+Run from BACKEND/:  python -m benchmarks.bench_rollup [rows ...]
+(default sizes: 1M and 10M rows)
+"""
+import sys
+from dataclasses import replace
+from datetime import timedelta
+
+import main
+from benchmarks.synth import make_sales, timeit
+from rollup import build_rollup
+
+
+def raw_requests(sales, end_d):
+    """The per-request work the endpoints did before the rollup existed."""
+    s = sales
+    return {
+        "/product-analytics": lambda: s.groupby("item_name").agg({"quantity": "sum", "total": "sum"}),
+        "/hourly-analysis": lambda: s.groupby("hour").agg({"quantity": "sum", "total": "sum"}),
+        "/heatmap": lambda: s.assign(weekday=s["date"].dt.day_name()).groupby(["weekday", "hour"]).agg(
+            {"quantity": "sum", "total": "sum"}),
+        "/dashboard-data": lambda: (
+            s.groupby("item_name").agg({"quantity": "sum", "total": "sum"}),
+            s.groupby("payment_method").agg({"total": "sum", "quantity": "sum"}),
+            s[(s["date"] >= end_d - timedelta(days=6)) & (s["date"] <= end_d)].groupby("hour").agg(
+                {"quantity": "sum", "total": "sum"}),
+        ),
+    }
+
+
+def rollup_requests():
+    return {
+        "/product-analytics": main.product_analytics.__wrapped__,
+        "/hourly-analysis": main.hourly_analysis.__wrapped__,
+        "/heatmap": main.heatmap.__wrapped__,
+        "/dashboard-data": main.dashboard_data.__wrapped__,
+    }
+
+
+def run(n_rows: int):
+    sales = make_sales(n_rows, days=730)
+    sales["hour"] = sales["time"].str.slice(0, 2).astype(int)
+    end_d = sales["date"].max()
+
+    cube_ms = timeit(lambda: build_rollup(sales), repeat=1)
+    snap = replace(main.store.current(), sales=sales, rollup=build_rollup(sales))
+    main.store.publish(snap)
+    print(f"\n{n_rows:,} raw rows -> {len(snap.rollup):,} cube rows (build {cube_ms:.0f} ms, once at startup)")
+    print(f"{'endpoint':<20}{'raw ms':>10}{'rollup ms':>12}{'speedup':>10}")
+    raw = raw_requests(sales, end_d)
+    for name, fn in rollup_requests().items():
+        r = timeit(raw[name], repeat=3)
+        c = timeit(fn, repeat=3)
+        print(f"{name:<20}{r:>10.1f}{c:>12.1f}{r / c:>9.1f}x")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000_000, 10_000_000]
+    for n in sizes:
+        run(n)
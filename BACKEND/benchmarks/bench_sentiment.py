@@ -0,0 +1,66 @@
+"""Feedback sentiment: per-row keyword scan vs column scoring, and incremental appends.
+
+Run from BACKEND/:  python -m benchmarks.bench_sentiment [rows ...]   (default 100k and 1M reviews)
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synth import timeit
+from sentiment import NEGATIVE_WORDS, POSITIVE_WORDS, build_table, score_text, update_table
+
+FILLER = ["coffee", "staff", "service", "wait", "price", "table", "music", "okay", "pastry", "latte"]
+
+
+def make_feedback(n_rows: int, seed: int = 0, distinct: int = 50_000) -> pd.DataFrame:
+    """Reviews of 4-12 words drawn from `distinct` phrasings, with the sentiment words mixed in."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array(FILLER * 4 + POSITIVE_WORDS + NEGATIVE_WORDS, dtype=object)
+    phrases = np.array([" ".join(rng.choice(vocab, rng.integers(4, 13))).capitalize() for _ in range(distinct)],
+                       dtype=object)
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 730, n_rows)), unit="D")
+    return pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "comment": phrases[rng.integers(0, distinct, n_rows)]})
+
+
+def per_row(text: pd.Series):
+    """The scan /feedback-summary used to run on every request."""
+    def _sent(s):
+        s = str(s).lower()
+        if any(w in s for w in POSITIVE_WORDS):
+            return 1
+        if any(w in s for w in NEGATIVE_WORDS):
+            return -1
+        return 0
+    return text.apply(_sent)
+
+
+def run(n_rows: int):
+    fb = make_feedback(n_rows)
+    assert (per_row(fb["comment"]).to_numpy() == score_text(fb["comment"])).all()
+    print(f"\n{n_rows:,} reviews")
+    print(f"  per-row apply            {timeit(lambda: per_row(fb['comment']), repeat=1):>9.1f} ms")
+    print(f"  score_text (vectorized)  {timeit(lambda: score_text(fb['comment']), repeat=3):>9.1f} ms")
+
+    data_dir = tempfile.mkdtemp(prefix="bipa-sent-")
+    try:
+        path = os.path.join(data_dir, "feedback.csv")
+        fb.to_csv(path, index=False)
+        print(f"  build table (read+score) {timeit(lambda: build_table(path), repeat=1):>9.1f} ms")
+        table = build_table(path)
+        more = make_feedback(1_000, seed=1)
+        more.to_csv(path, mode="a", header=False, index=False)
+        print(f"  append 1k rows: update   {timeit(lambda: update_table(path, table), repeat=3):>9.1f} ms")
+        print(f"  append 1k rows: rebuild  {timeit(lambda: build_table(path), repeat=1):>9.1f} ms")
+        table = update_table(path, table)
+        print(f"  weekly series            {timeit(lambda: table.series('week')):>9.2f} ms")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    for n in [int(a) for a in sys.argv[1:]] or [100_000, 1_000_000]:
+        run(n)
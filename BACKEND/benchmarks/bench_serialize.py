@@ -0,0 +1,42 @@
+"""Response serialization for a 5-year daily revenue trend: iterrows + jsonable_encoder vs bulk columns + orjson.
+
+Run from BACKEND/:  python -m benchmarks.bench_serialize [years]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.synth import timeit
+from serialize import FastJSONResponse, layout
+
+
+def old_path(df: pd.DataFrame) -> bytes:
+    out = []
+    for d, row in df.iterrows():
+        out.append({'date': d.date().isoformat(), 'total_revenue': float(row['total_revenue'])})
+    return JSONResponse(jsonable_encoder({'period': 'daily', 'data': out})).body
+
+
+def new_path(df: pd.DataFrame, shape: str) -> bytes:
+    cols = {'date': df.index, 'total_revenue': df['total_revenue']}
+    return FastJSONResponse({'period': 'daily', 'data': layout(cols, shape)}).body
+
+
+def run(years: int):
+    rng = np.random.default_rng(0)
+    print(f"{'series':<28}{'iterrows+encoder ms':>21}{'records ms':>12}{'columns ms':>12}{'bytes rec/col':>18}")
+    for label, freq, periods in [("daily", "D", 365 * years), ("hourly", "h", 365 * 24 * years)]:
+        idx = pd.date_range("2020-01-01", periods=periods, freq=freq, name="date")
+        df = pd.DataFrame({"total_revenue": np.round(rng.uniform(800, 2500, periods), 2)}, index=idx)
+        old = timeit(lambda: old_path(df), repeat=3)
+        rec = timeit(lambda: new_path(df, "records"), repeat=3)
+        col = timeit(lambda: new_path(df, "columns"), repeat=3)
+        sizes = f"{len(new_path(df, 'records')):,}/{len(new_path(df, 'columns')):,}"
+        print(f"{f'{years}y {label} ({periods:,} pts)':<28}{old:>21.2f}{rec:>12.2f}{col:>12.2f}{sizes:>18}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
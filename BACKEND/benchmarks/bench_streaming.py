@@ -0,0 +1,87 @@
+"""Peak memory and load time of sales.csv: eager parse vs streaming into the rollup.
+
+Writes a synthetic sales.csv (in 1M-row chunks, so the generator stays small
+too), then loads it in a fresh process per mode and reports wall time and
+peak RSS. Eager loads are skipped above --eager-max rows, where they would
+not fit in memory.
+
+Run from BACKEND/:  python -m benchmarks.bench_streaming [rows ...] [--eager-max N]
+(default sizes: 1M, 10M and 50M rows; eager up to 10M)
+"""
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synth import make_sales
+
+CHUNK = 1_000_000
+ROWS_PER_DAY = 30_000
+
+
+def write_csv(data_dir: str, n_rows: int):
+    path = os.path.join(data_dir, "sales.csv")
+    start = pd.Timestamp("2020-01-01")
+    with open(path, "w", newline="") as f:
+        for i, offset in enumerate(range(0, n_rows, CHUNK)):
+            n = min(CHUNK, n_rows - offset)
+            days = max(1, n // ROWS_PER_DAY)
+            chunk = make_sales(n, days=days, seed=i, start=str(start.date()))
+            chunk.to_csv(f, index=False, header=i == 0, date_format="%Y-%m-%d")
+            start += pd.Timedelta(days=days)
+    # the store also wants daily stats
+    pd.DataFrame({"date": [str(start.date())], "total_customers": [0], "total_revenue": [0.0],
+                  "avg_order_value": [0.0]}).to_csv(os.path.join(data_dir, "daily_stats.csv"), index=False)
+    return os.path.getsize(path)
+
+
+def child(mode: str, data_dir: str):
+    from datastore import DataStore
+    t0 = time.perf_counter()
+    snap = DataStore(data_dir, cache_dir="", streaming=mode == "streaming").current()
+    elapsed = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.1f} {peak:.0f} {len(snap.rollup)}")
+
+
+def measure(mode: str, data_dir: str):
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_streaming", "--child", mode, data_dir],
+                         capture_output=True, text=True, check=True)
+    elapsed, peak, cells = out.stdout.split()
+    return float(elapsed), float(peak), int(cells)
+
+
+def run(n_rows: int, eager_max: int):
+    data_dir = tempfile.mkdtemp(prefix="bipa-stream-")
+    try:
+        t0 = time.perf_counter()
+        size = write_csv(data_dir, n_rows)
+        print(f"\n{n_rows:,} rows, {size / 2**30:.2f} GiB CSV (written in {time.perf_counter() - t0:.0f} s)")
+        print(f"{'mode':<12}{'load s':>10}{'peak RSS MiB':>15}{'cube rows':>12}")
+        for mode in ("eager", "streaming"):
+            if mode == "eager" and n_rows > eager_max:
+                print(f"{mode:<12}{'skipped':>10}")
+                continue
+            elapsed, peak, cells = measure(mode, data_dir)
+            print(f"{mode:<12}{elapsed:>10.1f}{peak:>15.0f}{cells:>12,}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["--child"]:
+        child(args[1], args[2])
+        sys.exit()
+    eager_max = 10_000_000
+    if "--eager-max" in args:
+        i = args.index("--eager-max")
+        eager_max = int(args[i + 1])
+        del args[i:i + 2]
+    for n in [int(a) for a in args] or [1_000_000, 10_000_000, 50_000_000]:
+        run(n, eager_max)
@@ -0,0 +1,110 @@
+"""Memory per uvicorn worker with per-process frames vs one shared, memory-mapped copy.
+
+Generates a dataset (as bench_load does), then for each worker count serves
+it with `uvicorn --workers N`, once as before (every worker parses and holds
+its own frames) and once with DATA_SHARED=1 (one process writes a shared
+generation, every worker maps it). Once all workers have loaded and their
+memory has settled, reports per worker:
+
+    RSS   resident pages, shared ones counted in full in every worker
+    anon  the private (heap) part of RSS, i.e. what each worker adds
+    PSS   RSS with every shared page divided between the processes mapping it
+
+and the sum of PSS over the workers, which is what the workers cost the
+machine together. Startup time is until every worker has settled.
+
+Run from BACKEND/:  python -m benchmarks.bench_workers [--workers 1 4 16] [--stores 10] [--years 2]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.bench_load import Server, make_dataset
+
+
+def workers_of(pid: int):
+    """uvicorn worker processes started by master `pid`."""
+    found = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        if ppid == pid and b"spawn_main" in cmdline:
+            found.append(int(entry))
+    return found
+
+
+def memory(pid: int) -> dict:
+    """RSS / anon / PSS of `pid` in MiB."""
+    out = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss", "Anonymous"):
+                out[key] = int(rest.split()[0]) / 1024
+    return {"rss": out["Rss"], "anon": out["Anonymous"], "pss": out["Pss"]}
+
+
+def settle(server: Server, n: int, timeout: float = 900):
+    """Wait until `n` workers are up and their RSS stopped changing; returns their pids."""
+    t0 = time.perf_counter()
+    last, steady = None, 0
+    while time.perf_counter() - t0 < timeout:
+        if server.proc.poll() is not None:
+            raise RuntimeError(f"server exited with {server.proc.returncode}")
+        # a single worker is served by the uvicorn process itself
+        pids = sorted(workers_of(server.proc.pid)) if n > 1 else [server.proc.pid]
+        try:
+            sizes = [round(memory(p)["rss"]) for p in pids]
+        except OSError:
+            sizes = None
+        steady = steady + 1 if len(pids) == n and sizes == last else 0
+        if steady >= 4:
+            return pids
+        last = sizes
+        time.sleep(0.5)
+    raise TimeoutError("workers did not settle")
+
+
+def run(args):
+    root = tempfile.mkdtemp(prefix="bipa-workers-")
+    try:
+        dataset = make_dataset(root, args.stores, args.years, 0)
+        print(f"{dataset['sales_rows']:,} sales rows ({dataset['csv_mib']} MiB of CSV)")
+        print(f"{'mode':<10}{'workers':>8}{'start s':>9}{'RSS/worker':>12}{'anon/worker':>13}"
+              f"{'PSS/worker':>12}{'PSS total':>11}")
+        for n in args.workers:
+            for mode, env in [("copies", {"DATA_SHARED": "0"}), ("shared", {"DATA_SHARED": "1"})]:
+                # start from the CSVs every time: no column cache, no shared generation
+                for d in (".cache", ".shared"):
+                    shutil.rmtree(os.path.join(root, "DATA", d), ignore_errors=True)
+                t0 = time.perf_counter()
+                server = Server(root, {**env, "DATA_RELOAD_SECONDS": "0"}, ["--workers", str(n)])
+                try:
+                    server.wait_ready()
+                    pids = settle(server, n)
+                    started = time.perf_counter() - t0
+                    mem = [memory(p) for p in pids]
+                finally:
+                    server.stop()
+                avg = {k: sum(m[k] for m in mem) / n for k in mem[0]}
+                print(f"{mode:<10}{n:>8}{started:>9.1f}{avg['rss']:>12.0f}{avg['anon']:>13.0f}"
+                      f"{avg['pss']:>12.0f}{avg['pss'] * n:>11.0f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--stores", type=int, default=10)
+    parser.add_argument("--years", type=float, default=2)
+    run(parser.parse_args())
@@ -0,0 +1,101 @@
+"""Check the SQL backend against the in-memory (pandas) path, and time both.
+
+Imports DATA/ into a throwaway SQLite file, calls each endpoint once per
+backend and compares the payloads (floats to 1e-6). Exits 1 if any payload
+differs or an endpoint raises on either backend.
+
+Run from BACKEND/:  python -m benchmarks.sql_parity [database url]
+(default: a temporary SQLite database)
+"""
+import json
+import math
+import os
+import sys
+import tempfile
+
+import main
+from benchmarks.synth import timeit
+from repository import FrameRepository, SqlRepository, load_csvs, make_engine
+
+
+def _forecast():
+    main.forecaster._fit = None   # fit from this backend, not incrementally from the other one's
+    return main.forecast.__wrapped__(7, None)
+
+
+CALLS = {
+    "/kpi/": lambda: main.get_kpi.__wrapped__(None, 5),
+    "/kpi/?query_date=2024-05-10&window=12": lambda: main.get_kpi.__wrapped__("2024-05-10", 12),
+    "/dashboard-data": lambda: main.dashboard_data.__wrapped__("7d"),
+    "/revenue-trends?start_date=2024-03-01&end_date=2024-03-20":
+        lambda: main.revenue_trends.__wrapped__("daily", "2024-03-01", "2024-03-20", "records"),
+    "/revenue-trends?period=weekly&start_date=2024-03-06&by=category":
+        lambda: main.revenue_trends.__wrapped__("weekly", "2024-03-06", None, "records", "category"),
+    "/revenue-trends?period=monthly&by=category&shape=columns":
+        lambda: main.revenue_trends.__wrapped__("monthly", None, None, "columns", "category"),
+    "/product-analytics": lambda: main.product_analytics.__wrapped__(10),
+    "/hourly-analysis": lambda: main.hourly_analysis.__wrapped__("records"),
+    "/heatmap": lambda: main.heatmap.__wrapped__(),
+    "/heatmap?start_date=2024-06-01&end_date=2024-06-30&category=food":
+        lambda: main.heatmap.__wrapped__("2024-06-01", "2024-06-30", "food"),
+    "/heatmap?payment_method=card&item=latte": lambda: main.heatmap.__wrapped__(None, None, None, "latte", "card"),
+    "/dashboard/bundle?period=30d&category=beverages":
+        lambda: main.dashboard_bundle.__wrapped__("30d", None, None, "beverages", 5),
+    "/forecast": _forecast,
+    "/inventory/projection?window=28": lambda: main.inventory_projection.__wrapped__(28),
+}
+# backend-specific fields, not compared
+SKIP_KEYS = {"live_version"}
+
+
+def payload(resp):
+    return json.loads(resp.body) if hasattr(resp, "body") else json.loads(json.dumps(resp))
+
+
+def diff(a, b, path=""):
+    """First difference between two decoded payloads, or None."""
+    if isinstance(a, float) or isinstance(b, float):
+        ok = isinstance(a, (int, float)) and isinstance(b, (int, float)) and math.isclose(a, b, rel_tol=1e-6, abs_tol=1e-6)
+        return None if ok else f"{path}: {a!r} != {b!r}"
+    if isinstance(a, dict) and isinstance(b, dict):
+        a, b = ({k: v for k, v in x.items() if k not in SKIP_KEYS} for x in (a, b))
+        if set(a) != set(b):
+            return f"{path}: keys {sorted(set(a) ^ set(b))}"
+        return next((d for k in a for d in [diff(a[k], b[k], f"{path}.{k}")] if d), None)
+    if isinstance(a, list) and isinstance(b, list):
+        if len(a) != len(b):
+            return f"{path}: {len(a)} != {len(b)} items"
+        return next((d for i, (u, v) in enumerate(zip(a, b)) for d in [diff(u, v, f"{path}[{i}]")] if d), None)
+    return None if a == b else f"{path}: {a!r} != {b!r}"
+
+
+def main_():
+    url = sys.argv[1] if len(sys.argv) > 1 else None
+    if url is None:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bipa.sqlite')}"
+    engine = make_engine(url)
+    print(f"imported {load_csvs(engine, main.store.data_dir):,} sales rows into {engine.url.get_backend_name()}")
+
+    frames, sql = FrameRepository(main.store), SqlRepository(engine)
+    failed = 0
+    print(f"{'endpoint':<66}{'pandas ms':>10}{'sql ms':>10}  result")
+    for name, call in CALLS.items():
+        t_frames = t_sql = math.nan
+        try:
+            main.repo = frames
+            expected, t_frames = payload(call()), timeit(call, repeat=3)
+            main.repo = sql
+            got, t_sql = payload(call()), timeit(call, repeat=3)
+            problem = diff(expected, got)
+        except Exception as e:
+            problem = f"raised {e!r}"
+        failed += problem is not None
+        print(f"{name:<66}{t_frames:>10.1f}{t_sql:>10.1f}  {problem or 'ok'}")
+    engine.dispose()
+    if failed:
+        print(f"{failed} of {len(CALLS)} endpoints differ")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_())
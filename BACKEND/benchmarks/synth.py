@@ -0,0 +1,46 @@
+"""Synthetic sales frames for the benchmarks (shaped like DATA/sales.csv)."""
+import numpy as np
+import pandas as pd
+
+from data_generator import HOUR_WEIGHTS, MENU_ITEMS, PAYMENT_METHODS, STAFF_NAMES
+
+
+def make_sales(n_rows: int, days: int = 365, seed: int = 0, start: str = "2024-01-01") -> pd.DataFrame:
+    """Return n_rows random sales lines spread over `days` days, sorted by date/time."""
+    rng = np.random.default_rng(seed)
+    items = [(name, cat, d["price"]) for cat, group in MENU_ITEMS.items() for name, d in group.items()]
+    names = np.array([i[0] for i in items], dtype=object)
+    cats = np.array([i[1] for i in items], dtype=object)
+    prices = np.array([i[2] for i in items])
+
+    hw = np.asarray(HOUR_WEIGHTS, dtype=float)
+    day = np.sort(rng.integers(0, days, n_rows))
+    hour = rng.choice(24, n_rows, p=hw / hw.sum())
+    minute = rng.integers(0, 60, n_rows)
+    item = rng.integers(0, len(items), n_rows)
+    qty = np.where(rng.random(n_rows) < 0.85, 1, 2)
+
+    dates = pd.Timestamp(start) + pd.to_timedelta(day, unit="D")
+    times = pd.Series(hour * 100 + minute).map(lambda v: f"{v // 100:02d}:{v % 100:02d}")
+    return pd.DataFrame({
+        "date": dates,
+        "time": times.to_numpy(),
+        "item_name": names[item],
+        "category": cats[item],
+        "quantity": qty,
+        "price": prices[item],
+        "total": np.round(qty * prices[item], 2),
+        "payment_method": np.asarray(PAYMENT_METHODS, dtype=object)[rng.integers(0, len(PAYMENT_METHODS), n_rows)],
+        "staff_name": np.asarray(STAFF_NAMES, dtype=object)[rng.integers(0, len(STAFF_NAMES), n_rows)],
+    })
+
+
+def timeit(fn, repeat: int = 5) -> float:
+    """Best-of-`repeat` wall time of fn() in milliseconds."""
+    import time
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
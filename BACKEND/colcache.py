@@ -0,0 +1,95 @@
+"""Columnar on-disk cache of the parsed CSVs (Arrow IPC / Feather).
+
+The first boot parses the CSVs as before and writes the typed frames
+(categoricals, int8 hour, datetime64 index) next to them. Later boots
+memory-map those files instead of re-parsing. Each cache file records the
+source CSV's mtime/size/offset in its schema metadata so the data store can
+tell whether the cache is current, merely behind an appended tail, or stale.
+
+pyarrow is optional: without it every boot parses the CSVs.
+
+One-time conversion from BACKEND/:  python colcache.py [DATA]
+"""
+import json
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - the cache is only an optimisation
+    pa = feather = None
+
+logger = logging.getLogger(__name__)
+
+META_KEY = b"bipa.source"
+FORMAT_VERSION = 2
+
+
+def available() -> bool:
+    return feather is not None
+
+
+def cache_file(cache_dir: str, source: str, part: str) -> str:
+    stem = os.path.splitext(source)[0]
+    return os.path.join(cache_dir, f"{stem}.{part}.feather")
+
+
+def write(cache_dir: str, source: str, frames: Dict[str, pd.DataFrame], state: dict) -> bool:
+    """Store `frames` for CSV `source` along with the source `state` they were built from."""
+    if not available() or not cache_dir:
+        return False
+    meta = json.dumps({"format": FORMAT_VERSION, **state}).encode()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for part, frame in frames.items():
+            table = pa.Table.from_pandas(frame, preserve_index=True)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), META_KEY: meta})
+            path = cache_file(cache_dir, source, part)
+            tmp = f"{path}.{os.getpid()}.tmp"   # workers booting together each write their own
+            # uncompressed and in one record batch, so every column is a single buffer that
+            # to_pandas can use straight from the mapping instead of concatenating chunks
+            feather.write_feather(table.combine_chunks(), tmp, compression="uncompressed",
+                                  chunksize=max(1, table.num_rows))
+            os.replace(tmp, path)
+        return True
+    except Exception:
+        logger.warning("could not write column cache for %s", source, exc_info=True)
+        return False
+
+
+def read(cache_dir: str, source: str, parts) -> Optional[Tuple[Dict[str, pd.DataFrame], dict]]:
+    """Memory-map the cached `parts` of `source`; None unless all exist and agree on their source state."""
+    if not available() or not cache_dir:
+        return None
+    frames, state = {}, None
+    try:
+        for part in parts:
+            path = cache_file(cache_dir, source, part)
+            if not os.path.exists(path):
+                return None
+            table = feather.read_table(path, memory_map=True)
+            meta = json.loads((table.schema.metadata or {}).get(META_KEY, b"{}"))
+            if meta.get("format") != FORMAT_VERSION or (state is not None and meta != state):
+                return None
+            state = meta
+            frames[part] = table.to_pandas(split_blocks=True)
+    except Exception:
+        logger.warning("ignoring unreadable column cache for %s", source, exc_info=True)
+        return None
+    state = dict(state)
+    state.pop("format", None)
+    return frames, state
+
+
+if __name__ == "__main__":
+    import sys
+    from datastore import DataStore
+
+    logging.basicConfig(level=logging.INFO)
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "DATA"
+    snap = DataStore(data_dir).current()
+    print(f"cached {len(snap.sales):,} sales rows and {len(snap.daily):,} daily rows under {data_dir}/.cache")
@@ -0,0 +1,139 @@
+"""Bounded executor for the pandas work behind the endpoints.
+
+Sync FastAPI handlers all share Starlette's anonymous threadpool, so a burst
+of expensive requests (heatmaps over long ranges, say) can occupy every
+thread and queue cheap ones like /kpi/ behind them. Here handlers are
+wrapped with `ComputePool.offload`: the event loop awaits a slot from a
+per-endpoint semaphore, then runs the handler on a dedicated pool of
+`workers` threads. An endpoint can hold at most its limit of those threads,
+leaving room for the rest.
+
+A thread pool rather than a process pool: the heavy numpy/pandas kernels
+(groupby sums, bincount, searchsorted) release the GIL, and threads read the
+data snapshot without copying it.
+
+Waiting for a slot longer than `timeout` gives 503; a handler still running
+after `timeout` gives 504. The thread can't be cancelled, so its slot is only
+released when the work really finishes.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from metrics import in_request_context
+
+
+@dataclass
+class EndpointStats:
+    limit: int
+    queued: int = 0        # waiting for a slot right now
+    running: int = 0       # holding a slot right now
+    completed: int = 0
+    rejected: int = 0      # gave up waiting for a slot (503)
+    timed_out: int = 0     # ran past the timeout (504)
+    wait_seconds: float = 0.0
+    run_seconds: float = 0.0
+
+
+def parse_limits(spec: str) -> Dict[str, int]:
+    """'heatmap=2,dashboard_bundle=3' -> {'heatmap': 2, 'dashboard_bundle': 3}"""
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.partition("=")
+        limits[name.strip()] = max(1, int(value))
+    return limits
+
+
+class ComputePool:
+    def __init__(self, workers: Optional[int] = None, limits: Optional[Dict[str, int]] = None,
+                 default_limit: Optional[int] = None, timeout: float = 30.0):
+        self.workers = workers or min(8, (os.cpu_count() or 1) + 2)
+        # by default one endpoint may use at most half of the pool
+        self.default_limit = default_limit or max(1, self.workers // 2)
+        self.limits = dict(limits or {})
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="compute")
+        # asyncio primitives belong to one event loop, so semaphores are kept per loop
+        self._semaphores: Dict[Tuple[int, str], asyncio.Semaphore] = {}
+        self._stats: Dict[str, EndpointStats] = {}
+
+    @classmethod
+    def from_env(cls) -> "ComputePool":
+        workers = int(os.environ.get("COMPUTE_WORKERS", "0")) or None
+        default_limit = int(os.environ.get("COMPUTE_ENDPOINT_LIMIT", "0")) or None
+        return cls(workers, parse_limits(os.environ.get("COMPUTE_LIMITS", "")), default_limit,
+                   float(os.environ.get("COMPUTE_TIMEOUT", "30")))
+
+    def _slot(self, name: str):
+        key = (id(asyncio.get_running_loop()), name)
+        if key not in self._semaphores:
+            limit = min(self.limits.get(name, self.default_limit), self.workers)
+            self._semaphores[key] = asyncio.Semaphore(limit)
+            self._stats.setdefault(name, EndpointStats(limit))
+        return self._semaphores[key], self._stats[name]
+
+    async def run(self, name: str, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the pool under endpoint `name`'s concurrency limit."""
+        sem, st = self._slot(name)
+        deadline = time.monotonic() + self.timeout
+        st.queued += 1
+        t0 = time.monotonic()
+        try:
+            await asyncio.wait_for(sem.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            st.rejected += 1
+            raise HTTPException(status_code=503, detail=f"{name} is busy, try again",
+                                headers={"Retry-After": "1"})
+        finally:
+            st.queued -= 1
+            st.wait_seconds += time.monotonic() - t0
+
+        st.running += 1
+        started = time.monotonic()
+
+        def _done(_):
+            st.running -= 1
+            st.completed += 1
+            st.run_seconds += time.monotonic() - started
+            sem.release()
+
+        # in a copy of the request's context, so stage timings and profiling follow the work
+        call = functools.partial(contextvars.copy_context().run, in_request_context, fn, *args, **kwargs)
+        fut = asyncio.get_running_loop().run_in_executor(self.executor, call)
+        fut.add_done_callback(_done)
+        try:
+            # shield: a timeout must not cancel the future, its callback frees the slot
+            return await asyncio.wait_for(asyncio.shield(fut), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            st.timed_out += 1
+            raise HTTPException(status_code=504, detail=f"{name} took longer than {self.timeout:g}s")
+
+    def offload(self, name: Optional[str] = None):
+        """Decorator turning a sync handler into an async one that runs on this pool.
+
+        functools.wraps keeps the original signature, so FastAPI still sees the
+        query parameters. The undecorated function stays available as
+        `handler.__wrapped__`.
+        """
+        def deco(fn):
+            key = name or fn.__name__
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                return await self.run(key, fn, *args, **kwargs)
+            return wrapper
+        return deco
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "timeout": self.timeout,
+            "endpoints": {name: asdict(st) for name, st in sorted(self._stats.items())},
+        }
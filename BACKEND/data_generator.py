@@ -1,12 +1,35 @@
-import pandas as pd
-import numpy as np
+"""Synthetic café dataset: sales, daily stats, feedback, inventory and menu.
+
+Sales are drawn with NumPy for a whole block of days at once (customers per
+day, then transactions, then line items), using the hour weights, weekend /
+seasonal multipliers and menu logic below. Blocks are generated in worker
+processes, each from its own child of one seed, and written to CSV as they
+finish, so any size fits in memory and the output only depends on the seed.
+daily_stats is derived from the generated sales.
+
+Usage (from BACKEND/):
+    python data_generator.py                                  # 2024-01-01 .. 2024-09-21, one store
+    python data_generator.py --stores 5 --years 3 --seed 7 --out DATA --workers 4
+
+With more than one store, sales rows get a store_id column and daily_stats
+holds the totals over all stores.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-import random
-from faker import Faker
-import csv
+from typing import Optional
+
+import numpy as np
+import pandas as pd
 
-# Initialize faker for generating realistic names and data
-fake = Faker()
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pandas' writer is ~5x slower, but works
+    pa = None
 
 # Configuration
 START_DATE = datetime(2024, 1, 1)
@@ -55,109 +78,219 @@ INVENTORY_ITEMS = [
     {'name': 'Chocolate', 'category': 'Baking', 'unit_cost': 6.80, 'reorder_level': 2}
 ]
 
-def generate_sales_data():
-    """Generate realistic sales transaction data"""
-    sales_data = []
-    
-    for day in range(DAYS):
-        current_date = START_DATE + timedelta(days=day)
-        
-        # Weekend boost (20% more customers)
-        is_weekend = current_date.weekday() >= 5
-        base_customers = random.randint(80, 150)
-        if is_weekend:
-            daily_customers = int(base_customers * 1.2)
+# Bill of materials: inventory used per menu item sold, in the inventory's stock units
+# (Coffee Beans, Sugar, Cheese, Vegetables, Flour, Chocolate in kg, Milk in gallons, Bread in loaves)
+RECIPES = {
+    'Cappuccino': {'Coffee Beans': 0.018, 'Milk': 0.04, 'Sugar': 0.005},
+    'Latte': {'Coffee Beans': 0.018, 'Milk': 0.066, 'Sugar': 0.005},
+    'Americano': {'Coffee Beans': 0.018, 'Sugar': 0.005},
+    'Espresso': {'Coffee Beans': 0.009, 'Sugar': 0.005},
+    'Mocha': {'Coffee Beans': 0.018, 'Milk': 0.05, 'Chocolate': 0.03, 'Sugar': 0.005},
+    'Cold Brew': {'Coffee Beans': 0.03, 'Sugar': 0.005},
+    'Croissant': {'Flour': 0.06},
+    'Sandwich': {'Bread': 0.2, 'Cheese': 0.03, 'Vegetables': 0.05},
+    'Muffin': {'Flour': 0.05, 'Sugar': 0.02, 'Milk': 0.005},
+    'Bagel': {'Flour': 0.09, 'Cheese': 0.02},
+    'Cake Slice': {'Flour': 0.04, 'Sugar': 0.03, 'Chocolate': 0.02, 'Milk': 0.005},
+    'Salad': {'Vegetables': 0.25, 'Cheese': 0.03},
+    'Fresh Juice': {'Vegetables': 0.3},
+    'Smoothie': {'Milk': 0.05, 'Vegetables': 0.15, 'Sugar': 0.01},
+    'Tea': {'Milk': 0.008, 'Sugar': 0.005},
+    'Hot Chocolate': {'Milk': 0.066, 'Chocolate': 0.04, 'Sugar': 0.01}
+}
+
+# Realistic time distribution (peak hours)
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 1, 8, 12, 10, 6, 4, 8, 12, 8, 6, 4, 6, 8, 6, 4, 2, 2, 1, 1]
+# 1-3 items per transaction
+ITEMS_PER_ORDER = {1: 60, 2: 30, 3: 10}
+# Coffee / Food / Beverages mix: morning (before 11), lunch (before 15), afternoon/evening
+CATEGORY_WEIGHTS = [[70, 25, 5], [40, 50, 10], [50, 30, 20]]
+# Winter coffee orders lean to hot drinks, summer ones to cold brew
+WINTER_COFFEE = ['Cappuccino', 'Latte', 'Mocha', 'Hot Chocolate']
+SUMMER_COFFEE_WEIGHTS = [15, 15, 10, 5, 10, 45]
+WINTER_MONTHS, SUMMER_MONTHS = [12, 1, 2], [6, 7, 8]
+
+SALES_COLUMNS = ['date', 'time', 'item_name', 'category', 'quantity', 'price', 'total',
+                 'payment_method', 'staff_name']
+# sales lines per generated block; a block is at least one day
+LINES_PER_BLOCK = 1_000_000
+LINES_PER_STORE_DAY = 180
+
+CATEGORIES = list(MENU_ITEMS)
+ITEM_NAMES = np.array([name for group in MENU_ITEMS.values() for name in group], dtype=object)
+ITEM_CATEGORIES = np.array([cat for cat, group in MENU_ITEMS.items() for _ in group], dtype=object)
+ITEM_PRICES = np.array([d['price'] for group in MENU_ITEMS.values() for d in group.values()])
+CATEGORY_START = np.cumsum([0] + [len(g) for g in MENU_ITEMS.values()])[:-1]
+CATEGORY_SIZE = np.array([len(g) for g in MENU_ITEMS.values()])
+TIMES = np.array([f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)], dtype=object)
+
+
+def _p(weights) -> np.ndarray:
+    w = np.asarray(weights, dtype=float)
+    return w / w.sum()
+
+
+def _daily_customers(rng: np.random.Generator, dates: pd.DatetimeIndex, stores: int) -> np.ndarray:
+    """(stores, days) customer counts: 80-150, +20% at weekends, +10% in winter and +5% in summer."""
+    customers = rng.integers(80, 151, size=(stores, len(dates))).astype(float)
+    # Weekend boost (20% more customers)
+    customers = np.where(np.asarray(dates.dayofweek >= 5), np.floor(customers * 1.2), customers)
+    # Seasonal adjustments
+    month = np.asarray(dates.month)
+    seasonal = np.select([np.isin(month, WINTER_MONTHS), np.isin(month, SUMMER_MONTHS)], [1.1, 1.05], 1.0)
+    return np.floor(customers * seasonal).astype(np.int64)
+
+
+def _pick_items(rng: np.random.Generator, hour: np.ndarray, month: np.ndarray) -> np.ndarray:
+    """Menu item index for each line, given the hour and month it was sold in."""
+    n = len(hour)
+    # Choose category based on time of day
+    band = (hour >= 11).astype(np.int64) + (hour >= 15)
+    cum = np.cumsum([_p(w) for w in CATEGORY_WEIGHTS], axis=1)
+    u = rng.random(n)
+    category = (u >= cum[band, 0]).astype(np.int64) + (u >= cum[band, 1])
+
+    item = CATEGORY_START[category] + (rng.random(n) * CATEGORY_SIZE[category]).astype(np.int64)
+    # Seasonal item preferences (a winter 'coffee' may be Hot Chocolate, which is a Beverage)
+    coffee = category == CATEGORIES.index('Coffee')
+    winter = coffee & np.isin(month, WINTER_MONTHS)
+    winter_items = np.array([list(ITEM_NAMES).index(name) for name in WINTER_COFFEE])
+    item[winter] = winter_items[rng.integers(0, len(winter_items), int(winter.sum()))]
+    summer = coffee & np.isin(month, SUMMER_MONTHS)
+    item[summer] = CATEGORY_START[0] + rng.choice(len(SUMMER_COFFEE_WEIGHTS), int(summer.sum()),
+                                                  p=_p(SUMMER_COFFEE_WEIGHTS))
+    return item
+
+
+def generate_block(dates: pd.DatetimeIndex, stores: int = 1, seed=None):
+    """Sales lines for `dates` x `stores`, sorted by date and time, and the daily stats derived from them."""
+    rng = np.random.default_rng(seed)
+    customers = _daily_customers(rng, dates, stores)
+
+    # one entry per transaction: a customer with one staff member and one payment method
+    counts = customers.ravel()
+    store = np.repeat(np.repeat(np.arange(stores), len(dates)), counts)
+    day = np.repeat(np.tile(np.arange(len(dates)), stores), counts)
+    n = len(day)
+    hour = rng.choice(24, n, p=_p(HOUR_WEIGHTS))
+    minute = hour * 60 + rng.integers(0, 60, n)
+    staff = rng.integers(0, len(STAFF_NAMES), n)
+    payment = rng.integers(0, len(PAYMENT_METHODS), n)
+    n_items = rng.choice(list(ITEMS_PER_ORDER), n, p=_p(list(ITEMS_PER_ORDER.values())))
+
+    # one entry per line item, ordered by date and time (a transaction's lines stay together)
+    tx = np.repeat(np.arange(n), n_items)
+    tx = tx[np.lexsort((minute[tx], day[tx]))]
+    item = _pick_items(rng, hour[tx], np.asarray(dates.month)[day[tx]])
+    quantity = np.where(rng.random(len(tx)) < 0.15, 2, 1)
+    price = ITEM_PRICES[item]
+    total = np.round(quantity * price, 2)
+
+    sales = pd.DataFrame({
+        'date': np.asarray(dates.strftime('%Y-%m-%d'), dtype=object)[day[tx]],
+        'time': TIMES[minute[tx]],
+        'item_name': ITEM_NAMES[item],
+        'category': ITEM_CATEGORIES[item],
+        'quantity': quantity,
+        'price': price,
+        'total': total,
+        'payment_method': np.asarray(PAYMENT_METHODS, dtype=object)[payment[tx]],
+        'staff_name': np.asarray(STAFF_NAMES, dtype=object)[staff[tx]],
+    })
+    if stores > 1:
+        sales['store_id'] = np.array([f"store_{s + 1:02d}" for s in range(stores)], dtype=object)[store[tx]]
+
+    # daily stats over all stores, from the sales above
+    total_customers = customers.sum(axis=0)
+    total_revenue = np.round(np.bincount(day[tx], weights=total, minlength=len(dates)), 2)
+    busiest = np.bincount(day * 24 + hour, minlength=len(dates) * 24).reshape(len(dates), 24).argmax(axis=1)
+    daily = pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d'),
+        'total_customers': total_customers,
+        'total_revenue': total_revenue,
+        'avg_order_value': np.round(total_revenue / np.maximum(total_customers, 1), 2),
+        'weather': np.asarray(WEATHER_CONDITIONS, dtype=object)[rng.integers(0, len(WEATHER_CONDITIONS), len(dates))],
+        'peak_hour': [f"{h:02d}:00" for h in busiest],
+    })
+    return sales, daily
+
+
+def _write_rows(frame: pd.DataFrame, path: str):
+    """CSV rows without a header; no value contains a comma or a quote, so nothing is quoted."""
+    if pa is None:
+        frame.to_csv(path, index=False, header=False)
+        return
+    options = pa_csv.WriteOptions(include_header=False, quoting_style="none")
+    pa_csv.write_csv(pa.Table.from_pandas(frame, preserve_index=False), path, options)
+
+
+def _write_block(job):
+    """Worker: generate one block and write its sales rows (no header) to `path`."""
+    dates, stores, seed, path = job
+    sales, daily = generate_block(dates, stores, seed)
+    _write_rows(sales, path)
+    return daily, len(sales)
+
+
+def generate_sales_files(out_dir: str = '.', start: datetime = START_DATE, end: datetime = END_DATE,
+                         stores: int = 1, seed=None, workers: int = 1):
+    """Write sales.csv and daily_stats.csv for [start, end) to out_dir; returns (sales rows, daily stats).
+
+    `seed` is an int or a np.random.SeedSequence.
+    """
+    dates = pd.date_range(start, end - timedelta(days=1), freq='D')
+    per_block = max(1, LINES_PER_BLOCK // (LINES_PER_STORE_DAY * stores))
+    blocks = [dates[i:i + per_block] for i in range(0, len(dates), per_block)]
+    # one child seed per block: the output doesn't depend on the number of workers
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    seeds = seed.spawn(len(blocks))
+    os.makedirs(out_dir, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix='.sales-', dir=out_dir)
+    jobs = [(block, stores, s, os.path.join(tmp, f'part-{k:05d}.csv')) for k, (block, s) in enumerate(zip(blocks, seeds))]
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_write_block, jobs))
         else:
-            daily_customers = base_customers
-            
-        # Seasonal adjustments
-        month = current_date.month
-        seasonal_multiplier = 1.0
-        if month in [12, 1, 2]:  # Winter - more hot drinks
-            seasonal_multiplier = 1.1
-        elif month in [6, 7, 8]:  # Summer - more cold drinks
-            seasonal_multiplier = 1.05
-            
-        daily_customers = int(daily_customers * seasonal_multiplier)
-        
-        for _ in range(daily_customers):
-            # Generate realistic time distribution (peak hours)
-            hour_weights = [1, 1, 1, 1, 1, 1, 8, 12, 10, 6, 4, 8, 12, 8, 6, 4, 6, 8, 6, 4, 2, 2, 1, 1]
-            hour = random.choices(range(24), weights=hour_weights)[0]
-            minute = random.randint(0, 59)
-            time_str = f"{hour:02d}:{minute:02d}"
-            
-            # Select items (1-3 items per transaction)
-            num_items = random.choices([1, 2, 3], weights=[60, 30, 10])[0]
-            
-            for _ in range(num_items):
-                # Choose category based on time of day
-                if hour < 11:  # Morning - more coffee
-                    category = random.choices(['Coffee', 'Food', 'Beverages'], weights=[70, 25, 5])[0]
-                elif hour < 15:  # Lunch - more food
-                    category = random.choices(['Coffee', 'Food', 'Beverages'], weights=[40, 50, 10])[0]
-                else:  # Afternoon/Evening - balanced
-                    category = random.choices(['Coffee', 'Food', 'Beverages'], weights=[50, 30, 20])[0]
-                
-                # Seasonal item preferences
-                if month in [12, 1, 2] and category == 'Coffee':
-                    # Winter: prefer hot drinks
-                    item_name = random.choice(['Cappuccino', 'Latte', 'Mocha', 'Hot Chocolate'])
-                elif month in [6, 7, 8] and category == 'Coffee':
-                    # Summer: more cold brew
-                    item_name = random.choices(list(MENU_ITEMS[category].keys()), 
-                                             weights=[15, 15, 10, 5, 10, 45])[0]
-                else:
-                    item_name = random.choice(list(MENU_ITEMS[category].keys()))
-                
-                quantity = random.choices([1, 2], weights=[85, 15])[0]
-                # Ensure the item's actual category is used for lookup. Some seasonal choices
-                # (e.g. 'Hot Chocolate') live in a different category than the one selected
-                # earlier. Find the real category to avoid KeyError.
-                actual_category = None
-                for cat, items in MENU_ITEMS.items():
-                    if item_name in items:
-                        actual_category = cat
-                        break
-                if actual_category is None:
-                    # Fallback: keep chosen category (this shouldn't normally happen)
-                    actual_category = category
-
-                price = MENU_ITEMS[actual_category][item_name]['price']
-                total = round(quantity * price, 2)
-                
-                sales_data.append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'time': time_str,
-                    'item_name': item_name,
-                    'category': actual_category,
-                    'quantity': quantity,
-                    'price': price,
-                    'total': total,
-                    'payment_method': random.choice(PAYMENT_METHODS),
-                    'staff_name': random.choice(STAFF_NAMES)
-                })
-    
-    return pd.DataFrame(sales_data)
-
-def generate_feedback_data():
+            results = [_write_block(job) for job in jobs]
+
+        # stitch the blocks together in date order
+        columns = SALES_COLUMNS + (['store_id'] if stores > 1 else [])
+        target = os.path.join(out_dir, 'sales.csv')
+        with open(target + '.tmp', 'w', newline='') as out:
+            out.write(','.join(columns) + '\n')
+            for _, _, _, path in jobs:
+                with open(path) as part:
+                    shutil.copyfileobj(part, out, 1 << 20)
+        os.replace(target + '.tmp', target)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    daily = pd.concat([d for d, _ in results], ignore_index=True)
+    daily.to_csv(os.path.join(out_dir, 'daily_stats.csv'), index=False)
+    return sum(n for _, n in results), daily
+
+
+def generate_feedback_data(rng: np.random.Generator, start: datetime = START_DATE, end: datetime = END_DATE):
     """Generate customer feedback data"""
     feedback_data = []
-    
+    days = (end - start).days
+
     # Generate 3-5 feedback entries per week
-    for week in range(0, DAYS, 7):
-        num_feedback = random.randint(3, 5)
-        
+    for week in range(0, days, 7):
+        num_feedback = int(rng.integers(3, 6))
+
         for _ in range(num_feedback):
-            feedback_date = START_DATE + timedelta(days=week + random.randint(0, 6))
-            
+            feedback_date = start + timedelta(days=week + int(rng.integers(0, 7)))
+
             # Generate correlated ratings
-            overall_sentiment = random.choices(['positive', 'neutral', 'negative'], weights=[60, 25, 15])[0]
-            
+            overall_sentiment = rng.choice(['positive', 'neutral', 'negative'], p=_p([60, 25, 15]))
+
             if overall_sentiment == 'positive':
-                rating = random.randint(4, 5)
-                service_rating = random.randint(4, 5)
-                food_rating = random.randint(4, 5)
+                rating = int(rng.integers(4, 6))
+                service_rating = int(rng.integers(4, 6))
+                food_rating = int(rng.integers(4, 6))
                 reviews = [
                     "Great coffee and friendly staff!",
                     "Love this place, always consistent quality",
@@ -166,9 +299,9 @@ def generate_feedback_data():
                     "Perfect spot for morning coffee"
                 ]
             elif overall_sentiment == 'negative':
-                rating = random.randint(1, 2)
-                service_rating = random.randint(1, 3)
-                food_rating = random.randint(1, 3)
+                rating = int(rng.integers(1, 3))
+                service_rating = int(rng.integers(1, 4))
+                food_rating = int(rng.integers(1, 4))
                 reviews = [
                     "Coffee was cold when served",
                     "Long wait time and average food",
@@ -178,8 +311,8 @@ def generate_feedback_data():
                 ]
             else:  # neutral
                 rating = 3
-                service_rating = random.randint(2, 4)
-                food_rating = random.randint(2, 4)
+                service_rating = int(rng.integers(2, 5))
+                food_rating = int(rng.integers(2, 5))
                 reviews = [
                     "Decent coffee, nothing special",
                     "Average café experience",
@@ -187,40 +320,42 @@ def generate_feedback_data():
                     "Fair prices, standard quality",
                     "It's okay, might come back"
                 ]
-            
+
             feedback_data.append({
                 'date': feedback_date.strftime('%Y-%m-%d'),
                 'rating': rating,
-                'review': random.choice(reviews),
+                'review': reviews[int(rng.integers(0, len(reviews)))],
                 'service_rating': service_rating,
                 'food_rating': food_rating
             })
-    
+
     return pd.DataFrame(feedback_data)
 
-def generate_inventory_data():
+
+def generate_inventory_data(rng: np.random.Generator, end: datetime = END_DATE):
     """Generate current inventory snapshot"""
     inventory_data = []
-    
+
     for item in INVENTORY_ITEMS:
         # Random current stock (between reorder level and 3x reorder level)
-        current_stock = random.randint(item['reorder_level'], item['reorder_level'] * 3)
-        
+        current_stock = int(rng.integers(item['reorder_level'], item['reorder_level'] * 3 + 1))
+
         inventory_data.append({
             'item_name': item['name'],
             'category': item['category'],
             'current_stock': current_stock,
             'reorder_level': item['reorder_level'],
             'unit_cost': item['unit_cost'],
-            'last_updated': (END_DATE - timedelta(days=random.randint(0, 7))).strftime('%Y-%m-%d')
+            'last_updated': (end - timedelta(days=int(rng.integers(0, 8)))).strftime('%Y-%m-%d')
         })
-    
+
     return pd.DataFrame(inventory_data)
 
+
 def generate_menu_data():
     """Generate menu items with pricing"""
     menu_data = []
-    
+
     for category, items in MENU_ITEMS.items():
         for item_name, details in items.items():
             menu_data.append({
@@ -230,87 +365,82 @@ def generate_menu_data():
                 'cost_to_make': details['cost'],
                 'prep_time_mins': details['prep_time']
             })
-    
+
     return pd.DataFrame(menu_data)
 
-def generate_daily_stats():
-    """Generate daily operational statistics"""
-    daily_stats = []
-    
-    for day in range(DAYS):
-        current_date = START_DATE + timedelta(days=day)
-        
-        # Calculate from sales data patterns
-        is_weekend = current_date.weekday() >= 5
-        base_customers = random.randint(80, 150)
-        if is_weekend:
-            total_customers = int(base_customers * 1.2)
-        else:
-            total_customers = base_customers
-        
-        # Revenue calculation (average order value: $12-18)
-        avg_order_value = random.uniform(12, 18)
-        total_revenue = round(total_customers * avg_order_value, 2)
-        
-        # Peak hour
-        peak_hours = ['08:00', '09:00', '10:00', '11:00', '12:00', '13:00', '17:00']
-        peak_hour = random.choice(peak_hours)
-        
-        daily_stats.append({
-            'date': current_date.strftime('%Y-%m-%d'),
-            'total_customers': total_customers,
-            'total_revenue': total_revenue,
-            'avg_order_value': round(avg_order_value, 2),
-            'weather': random.choice(WEATHER_CONDITIONS),
-            'peak_hour': peak_hour
-        })
-    
-    return pd.DataFrame(daily_stats)
 
-def save_datasets():
+def generate_recipe_data():
+    """Generate the menu item -> inventory item bill of materials"""
+    return pd.DataFrame([
+        {'menu_item': item_name, 'ingredient': ingredient, 'quantity': quantity}
+        for item_name, ingredients in RECIPES.items()
+        for ingredient, quantity in ingredients.items()
+    ])
+
+
+def save_datasets(out_dir: str = '.', start: datetime = START_DATE, end: datetime = END_DATE,
+                  stores: int = 1, seed: Optional[int] = None, workers: int = 1):
     """Generate and save all datasets as CSV files"""
     print("Generating synthetic café analytics dataset...")
-    
-    # Generate all datasets
-    sales_df = generate_sales_data()
-    feedback_df = generate_feedback_data()
-    inventory_df = generate_inventory_data()
+
+    # the small tables draw from their own stream so they don't shift with the sales size
+    sales_seed, other_seed = np.random.SeedSequence(seed).spawn(2)
+    n_sales, daily_stats_df = generate_sales_files(out_dir, start, end, stores, sales_seed, workers)
+    rng = np.random.default_rng(other_seed)
+    feedback_df = generate_feedback_data(rng, start, end)
+    inventory_df = generate_inventory_data(rng, end)
     menu_df = generate_menu_data()
-    daily_stats_df = generate_daily_stats()
-    
+    recipes_df = generate_recipe_data()
+
     # Save to CSV files
-    sales_df.to_csv('sales.csv', index=False)
-    feedback_df.to_csv('feedback.csv', index=False)
-    inventory_df.to_csv('inventory.csv', index=False)
-    menu_df.to_csv('menu.csv', index=False)
-    daily_stats_df.to_csv('daily_stats.csv', index=False)
-    
-    print(f"✅ Generated datasets:")
-    print(f"   - sales.csv: {len(sales_df)} transactions")
+    feedback_df.to_csv(os.path.join(out_dir, 'feedback.csv'), index=False)
+    inventory_df.to_csv(os.path.join(out_dir, 'inventory.csv'), index=False)
+    menu_df.to_csv(os.path.join(out_dir, 'menu.csv'), index=False)
+    recipes_df.to_csv(os.path.join(out_dir, 'recipes.csv'), index=False)
+
+    print(f"✅ Generated datasets in {os.path.abspath(out_dir)}:")
+    print(f"   - sales.csv: {n_sales} line items from {stores} store(s)")
     print(f"   - feedback.csv: {len(feedback_df)} reviews")
     print(f"   - inventory.csv: {len(inventory_df)} items")
     print(f"   - menu.csv: {len(menu_df)} menu items")
+    print(f"   - recipes.csv: {len(recipes_df)} ingredient lines")
     print(f"   - daily_stats.csv: {len(daily_stats_df)} days")
-    
+
     return {
-        'sales': sales_df,
         'feedback': feedback_df,
         'inventory': inventory_df,
         'menu': menu_df,
+        'recipes': recipes_df,
         'daily_stats': daily_stats_df
     }
 
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the synthetic café dataset.")
+    parser.add_argument('--out', default='.', help="output directory (default: current directory)")
+    parser.add_argument('--stores', type=int, default=1, help="number of stores (default 1)")
+    parser.add_argument('--years', type=float, default=None,
+                        help=f"years of history from --start (default {START_DATE:%Y-%m-%d} to {END_DATE:%Y-%m-%d})")
+    parser.add_argument('--start', default=START_DATE.strftime('%Y-%m-%d'), help="first day, YYYY-MM-DD")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for a reproducible dataset")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="generator processes")
+    return parser.parse_args(argv)
+
+
 # Run the data generation
 if __name__ == "__main__":
-    datasets = save_datasets()
-    
+    args = _parse_args()
+    start = datetime.strptime(args.start, '%Y-%m-%d')
+    end = start + timedelta(days=round(365.25 * args.years)) if args.years else END_DATE
+    datasets = save_datasets(args.out, start, end, max(1, args.stores), args.seed, max(1, args.workers))
+
     # Display sample data
     print("\n📊 Sample Data Preview:")
     print("\nSales Data (first 5 rows):")
-    print(datasets['sales'].head())
-    
+    print(pd.read_csv(os.path.join(args.out, 'sales.csv'), nrows=5))
+
     print("\nFeedback Data (first 3 rows):")
     print(datasets['feedback'].head(3))
-    
+
     print("\nInventory Data:")
     print(datasets['inventory'])
\ No newline at end of file
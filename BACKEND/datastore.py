@@ -0,0 +1,575 @@
+"""In-memory data layer with hot reload.
+
+All the frames the endpoints read live in one immutable `Snapshot`. A
+`DataStore` builds the first snapshot, then polls `DATA/*.csv` by mtime and
+size. When sales.csv only grew, just the appended bytes are parsed and folded
+into the previous frames; any other change reloads that file. Each refresh
+builds a complete new snapshot and publishes it with a single reference
+assignment, so a request that already grabbed a snapshot keeps a consistent
+view and readers never wait on a reload.
+
+In streaming mode (for sales files bigger than the memory budget) sales.csv
+is parsed in chunks that are folded into the rollup one at a time, and the
+snapshot keeps no raw sales rows. Peak memory is one chunk plus the rollup,
+whatever the file size. Anything that needs raw lines reads them back with
+`iter_sales`.
+
+In partitioned mode sales.csv is split into month (x store) partitions on
+disk (see partitions.py) and the snapshot holds their manifest instead of
+rows or a rollup; a query opens only the partitions its date range touches.
+Appended rows rewrite just the partitions they land in. Writes happen under
+a file lock, so of several worker processes one writes and the others pick
+up its manifest.
+
+In shared mode (for several worker processes) the snapshot frames are kept
+in memory-mapped files under DATA/.shared (see generations.py). Whichever
+process first sees a change loads it under a lock shared by all of them and
+writes a new generation; every process maps the newest generation, so the
+workers hold one copy of the data between them instead of one each.
+"""
+import glob
+import hashlib
+import io
+import logging
+import os
+import threading
+from contextlib import nullcontext
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+import colcache
+import generations
+import partitions
+from metrics import stage
+from partitions import PartitionSet, PartitionWriter
+from rollup import build_rollup, category_by_day, merge_rollups
+from schema import apply_sales_schema, concat_sales
+from timeindex import DailyPrefix, index_by_date
+
+logger = logging.getLogger(__name__)
+
+SALES_COLUMNS = ["date", "time", "item_name", "category", "quantity", "price", "total"]
+# what the rollup needs; streaming skips parsing the rest
+ROLLUP_COLUMNS = ["date", "time", "item_name", "category", "quantity", "total", "payment_method"]
+# snapshot frames a shared generation holds, and the CSV each is built from
+SHARED_FRAMES = {"daily": "daily_stats.csv", "sales": "sales.csv", "rollup": "sales.csv"}
+
+
+@dataclass(frozen=True)
+class FileState:
+    """What we knew about a CSV the last time it was read."""
+    mtime: float
+    size: int
+    offset: int = 0      # bytes consumed (sales.csv only)
+    tail: bytes = b""    # the bytes just before `offset`, to detect rewrites
+    columns: tuple = ()  # header row, reused to parse appended rows
+
+    def to_meta(self) -> dict:
+        return {"mtime": self.mtime, "size": self.size, "offset": self.offset,
+                "tail": self.tail.hex(), "columns": list(self.columns)}
+
+    @classmethod
+    def from_meta(cls, meta: dict) -> "FileState":
+        return cls(meta["mtime"], meta["size"], meta.get("offset", 0),
+                   bytes.fromhex(meta.get("tail", "")), tuple(meta.get("columns", ())))
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One consistent, read-only generation of everything the endpoints use."""
+    version: int
+    daily: pd.DataFrame
+    sales: pd.DataFrame
+    rollup: pd.DataFrame
+    files: Dict[str, FileState] = field(default_factory=dict)
+    streamed: bool = False   # sales rows were folded into the rollup, not kept
+    partitions: Optional[PartitionSet] = None   # partitioned mode: sales live on disk, not in `rollup`
+
+    @cached_property
+    def tag(self) -> str:
+        """Identifies the data behind this snapshot, stable across restarts for unchanged files."""
+        h = hashlib.sha1(str(self.version).encode())
+        for name in sorted(self.files):
+            f = self.files[name]
+            h.update(f"{name}:{f.mtime}:{f.size}:{f.offset}".encode())
+        return h.hexdigest()[:16]
+
+    @cached_property
+    def daily_prefix(self) -> DailyPrefix:
+        """Day offsets and running revenue / customer totals of `daily`, for KPI windows."""
+        return DailyPrefix(self.daily, ["total_revenue", "total_customers"])
+
+    @cached_property
+    def category_prefix(self) -> DailyPrefix:
+        """Running sales total per category and day, from the rollup, for split revenue trends."""
+        if self.rollup.empty:
+            return DailyPrefix(pd.DataFrame(index=pd.DatetimeIndex([], name="date")), [])
+        by_day = category_by_day(self.rollup)
+        return DailyPrefix(by_day, list(by_day.columns))
+
+
+def read_csv_bytes(path: str, start: int, end: int, names=None) -> pd.DataFrame:
+    """Parse bytes [start, end) of a CSV; `names` means the range has no header row."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    if not data.strip():
+        return pd.DataFrame(columns=names or [])
+    if names is None:
+        return pd.read_csv(io.BytesIO(data))
+    return pd.read_csv(io.BytesIO(data), header=None, names=names)
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of bytes [start, end) of an open binary file."""
+
+    def __init__(self, f, start: int, end: int):
+        self.f, self.end = f, end
+        f.seek(start)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), self.end - self.f.tell())
+        if n <= 0:
+            return 0
+        data = self.f.read(n)
+        b[:len(data)] = data
+        return len(data)
+
+
+def iter_csv_chunks(path: str, start: int, end: int, chunksize: int, names=None, usecols=None):
+    """Yield frames of at most `chunksize` rows parsed from bytes [start, end) of a CSV.
+
+    `names` means the range has no header row. Only `usecols` are parsed when given.
+    """
+    if end <= start:
+        return
+    with open(path, "rb") as f:
+        reader = pd.read_csv(io.BufferedReader(_ByteRange(f, start, end), 1 << 20),
+                             header=None if names else "infer", names=names, usecols=usecols,
+                             chunksize=chunksize)
+        with reader:
+            yield from reader
+
+
+def complete_lines_end(path: str, start: int, size: int, block: int = 1 << 16) -> int:
+    """Offset just past the last newline in [start, size), i.e. skip a half-written row."""
+    with open(path, "rb") as f:
+        # scan backwards so a large range is never read whole
+        end = size
+        while end > start:
+            begin = max(start, end - block)
+            f.seek(begin)
+            cut = f.read(end - begin).rfind(b"\n")
+            if cut >= 0:
+                return begin + cut + 1
+            end = begin
+    return start
+
+
+def tail_bytes(path: str, offset: int, n: int = 64) -> bytes:
+    """The `n` bytes before `offset`; if they are unchanged, the file was appended to, not rewritten."""
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - n))
+        return f.read(min(n, offset))
+
+
+def prepare_daily(frame: pd.DataFrame) -> pd.DataFrame:
+    """Type and index daily_stats rows."""
+    # guard: make numeric conversions safe
+    frame["total_revenue"] = pd.to_numeric(frame["total_revenue"], errors="coerce").fillna(0.0)
+    frame["total_customers"] = pd.to_numeric(frame["total_customers"], errors="coerce").fillna(0).astype(int)
+    frame["avg_order_value"] = pd.to_numeric(frame["avg_order_value"], errors="coerce").fillna(0.0)
+    # index by day (datetime64, sorted) so date windows are binary searches
+    return index_by_date(frame)
+
+
+def prepare_sales(frame: pd.DataFrame) -> pd.DataFrame:
+    """Apply the typed sales schema and index rows by date."""
+    return index_by_date(apply_sales_schema(frame))
+
+
+class DataStore:
+    """Owns the current Snapshot and keeps it in sync with the CSVs in `data_dir`."""
+
+    def __init__(self, data_dir: str = "DATA", cache_dir: Optional[str] = None,
+                 streaming: bool = False, chunksize: int = 1_000_000, partitioned: bool = False,
+                 shared: bool = False):
+        self.data_dir = data_dir
+        # typed column cache; "" disables it
+        self.cache_dir = os.path.join(data_dir, ".cache") if cache_dir is None else cache_dir
+        # fold sales.csv into the rollup `chunksize` rows at a time instead of keeping the rows
+        self.streaming = streaming
+        self.chunksize = chunksize
+        # month (x store) partitions under DATA/.partitions instead of sales in memory
+        self.partitioned = partitioned and colcache.available()
+        if partitioned and not self.partitioned:
+            logger.warning("partitioned sales need pyarrow; keeping sales in memory")
+        self.partition_dir = os.path.join(data_dir, ".partitions")
+        # snapshot frames memory-mapped from DATA/.shared, one copy for every worker process
+        self.shared = shared and generations.available()
+        if shared and not self.shared:
+            logger.warning("shared snapshots need pyarrow and POSIX file locks; each process keeps its own")
+        self.shared_dir = os.path.join(data_dir, ".shared")
+        if self.shared:
+            self.cache_dir = ""   # the generations are the cache
+        # called as fn(old, new, sales_change) after each refresh publishes; sales_change is
+        # "append" (rows were added to sales.csv), "reload" (it was read again) or None
+        self.listeners: List[Callable[[Snapshot, Snapshot, Optional[str]], None]] = []
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = threading.Lock()   # serialises loaders; readers never take it
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.data_dir, name)
+
+    # -- readers ---------------------------------------------------------
+
+    def current(self) -> Snapshot:
+        """The latest published snapshot (loads on first use)."""
+        snap = self._snapshot
+        if snap is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self.publish(self._sync_shared(None) if self.shared else self._load_all())
+            snap = self._snapshot
+        return snap
+
+    # -- loading ---------------------------------------------------------
+
+    def _stat(self, name: str) -> Optional[os.stat_result]:
+        try:
+            return os.stat(self.path(name))
+        except OSError:
+            return None
+
+    def _load_daily(self, files: Dict[str, FileState]) -> pd.DataFrame:
+        st = self._stat("daily_stats.csv")
+        cached = colcache.read(self.cache_dir, "daily_stats.csv", ["daily"])
+        if cached is not None:
+            frames, meta = cached
+            state = FileState.from_meta(meta)
+            if (state.mtime, state.size) == (st.st_mtime, st.st_size):
+                files["daily_stats.csv"] = state
+                return frames["daily"]
+
+        daily = prepare_daily(read_csv_bytes(self.path("daily_stats.csv"), 0, st.st_size))
+        state = FileState(st.st_mtime, st.st_size, st.st_size)
+        colcache.write(self.cache_dir, "daily_stats.csv", {"daily": daily}, state.to_meta())
+        files["daily_stats.csv"] = state
+        return daily
+
+    def _read_appended(self, state: Optional[FileState], st: os.stat_result):
+        """(start, end, new state) for the complete rows appended to sales.csv since `state`;
+        None if the file was rewritten instead. start == end when only a partial line was added.
+        """
+        path = self.path("sales.csv")
+        if state is None or not state.columns or st.st_size < state.offset \
+                or tail_bytes(path, state.offset) != state.tail:
+            return None
+        end = complete_lines_end(path, state.offset, st.st_size)
+        new_state = replace(state, mtime=st.st_mtime, size=st.st_size, offset=end, tail=tail_bytes(path, end))
+        return state.offset, end, new_state
+
+    def _fold(self, sales: pd.DataFrame, rollup: pd.DataFrame, start: int, end: int, columns=None):
+        """Parse sales.csv bytes [start, end) and fold the rows into (sales, rollup).
+
+        `columns` means the range has no header row. Streaming folds the rows
+        into the rollup chunk by chunk and leaves `sales` as it is.
+        """
+        path = self.path("sales.csv")
+        names = list(columns) if columns else None
+        if self.streaming:
+            n = 0
+            for chunk in iter_csv_chunks(path, start, end, self.chunksize, names, lambda c: c in ROLLUP_COLUMNS):
+                rollup = merge_rollups(rollup, build_rollup(prepare_sales(chunk)))
+                n += len(chunk)
+            logger.info("sales.csv: folded %d rows into the rollup", n)
+            return sales, rollup
+        new = prepare_sales(read_csv_bytes(path, start, end, names=names))
+        logger.info("sales.csv: read %d appended rows", len(new))
+        sales = concat_sales([sales, new])
+        if not sales.index.is_monotonic_increasing:
+            sales = sales.sort_index(kind="stable")
+        return sales, merge_rollups(rollup, build_rollup(new))
+
+    def _write_sales_cache(self, sales: pd.DataFrame, rollup: pd.DataFrame, state: FileState):
+        # a streamed cache has no rows, so only streaming loads may use it
+        meta = {**state.to_meta(), "streamed": self.streaming}
+        colcache.write(self.cache_dir, "sales.csv", {"sales": sales, "rollup": rollup}, meta)
+
+    def _load_sales(self, files: Dict[str, FileState]):
+        """Return (sales, rollup): from the column cache when it is current or only
+        behind an appended tail, otherwise by parsing sales.csv."""
+        path = self.path("sales.csv")
+        st = self._stat("sales.csv")
+        empty = prepare_sales(pd.DataFrame(columns=SALES_COLUMNS))
+        if st is None:
+            # fallback to empty DataFrame with expected columns
+            return empty, build_rollup(empty)
+
+        cached = colcache.read(self.cache_dir, "sales.csv", ["sales", "rollup"])
+        if cached is not None and cached[1].get("streamed", False) and not self.streaming:
+            cached = None
+        if cached is not None:
+            frames, meta = cached
+            state = FileState.from_meta(meta)
+            sales, rollup = frames["sales"], frames["rollup"]
+            if self.streaming:
+                sales = sales.iloc[:0]
+            if (state.mtime, state.size) != (st.st_mtime, st.st_size):
+                appended = self._read_appended(state, st)
+                if appended is None:
+                    cached = None
+                else:
+                    start, end, state = appended
+                    if end > start:
+                        sales, rollup = self._fold(sales, rollup, start, end, state.columns)
+                    # keep the cache close to the CSV so the tail stays short
+                    self._write_sales_cache(sales, rollup, state)
+
+        if cached is None:
+            try:
+                end = complete_lines_end(path, 0, st.st_size)
+                if self.streaming:
+                    columns = tuple(pd.read_csv(path, nrows=0).columns)
+                    sales, rollup = self._fold(empty, build_rollup(empty), 0, end)
+                else:
+                    raw = read_csv_bytes(path, 0, end)
+                    columns = tuple(raw.columns)
+                    sales = prepare_sales(raw)
+                    rollup = build_rollup(sales)
+                state = FileState(st.st_mtime, st.st_size, end, tail_bytes(path, end), columns)
+            except Exception:
+                logger.exception("could not parse sales.csv")
+                sales, rollup = empty, build_rollup(empty)
+                state = FileState(st.st_mtime, st.st_size)
+            self._write_sales_cache(sales, rollup, state)
+
+        files["sales.csv"] = state
+        return sales, rollup
+
+    def _load_partitions(self, files: Dict[str, FileState], parts: Optional[PartitionSet]) -> Optional[PartitionSet]:
+        """Partitions matching sales.csv: `parts` or the manifest on disk when current, extended by
+        any appended rows, otherwise rebuilt from the whole file."""
+        # other workers write the same directory; whoever holds the lock builds, the rest adopt it
+        lock = generations.locked(self.partition_dir) if generations.available() else nullcontext()
+        with lock:
+            return self._update_partitions(files, parts)
+
+    def _update_partitions(self, files: Dict[str, FileState], parts: Optional[PartitionSet]) -> Optional[PartitionSet]:
+        path = self.path("sales.csv")
+        st = self._stat("sales.csv")
+        if st is None:
+            return None
+        on_disk = partitions.load(self.partition_dir)
+        if parts is not None and (on_disk is None or on_disk.generation == parts.generation):
+            on_disk = parts   # still the newest: keep the partitions this process has open
+        if on_disk is not None:
+            state = FileState.from_meta(on_disk.source)
+            if (state.mtime, state.size) == (st.st_mtime, st.st_size):
+                files["sales.csv"] = state
+                return on_disk
+            appended = self._read_appended(state, st)
+            if appended is not None:
+                start, end, state = appended
+                writer = PartitionWriter(self.partition_dir, base=on_disk)
+                for chunk in iter_csv_chunks(path, start, end, self.chunksize, list(state.columns)):
+                    writer.add(prepare_sales(chunk))
+                files["sales.csv"] = state
+                logger.info("sales.csv: appended %d bytes to the partitions", end - start)
+                return writer.close(state.to_meta())
+
+        end = complete_lines_end(path, 0, st.st_size)
+        columns = tuple(pd.read_csv(path, nrows=0).columns) if end else ()
+        writer = PartitionWriter(self.partition_dir, previous=on_disk)
+        for chunk in iter_csv_chunks(path, 0, end, self.chunksize):
+            writer.add(prepare_sales(chunk))
+        state = FileState(st.st_mtime, st.st_size, end, tail_bytes(path, end), columns)
+        files["sales.csv"] = state
+        parts = writer.close(state.to_meta())
+        logger.info("sales.csv: wrote %d rows into %d partitions", parts.rows, len(parts.partitions))
+        return parts
+
+    def iter_sales(self, snap: Snapshot, columns, chunksize: Optional[int] = None):
+        """Yield typed chunks of the sales rows behind `snap`, parsing only `columns`.
+
+        For streamed snapshots, which keep no rows in memory.
+        """
+        state = snap.files.get("sales.csv")
+        if state is None or not state.offset:
+            return
+        wanted = set(columns)
+        for chunk in iter_csv_chunks(self.path("sales.csv"), 0, state.offset, chunksize or self.chunksize,
+                                     usecols=lambda c: c in wanted):
+            yield prepare_sales(chunk)
+
+    def _load_all(self) -> Snapshot:
+        files: Dict[str, FileState] = {}
+        with stage("load"):
+            daily = self._load_daily(files)
+            parts = None
+            if self.partitioned:
+                sales = prepare_sales(pd.DataFrame(columns=SALES_COLUMNS))
+                rollup = build_rollup(sales)
+                parts = self._load_partitions(files, None)
+            else:
+                sales, rollup = self._load_sales(files)
+        for p in glob.glob(self.path("*.csv")):
+            name = os.path.basename(p)
+            if name not in files:
+                st = os.stat(p)
+                files[name] = FileState(st.st_mtime, st.st_size)
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        return Snapshot(version, daily, sales, rollup, files, streamed=self.streaming, partitions=parts)
+
+    def _append_sales(self, snap: Snapshot, st: os.stat_result, files: Dict[str, FileState]) -> Optional[Snapshot]:
+        """Fold rows appended to sales.csv into `snap`; None if the file was rewritten instead."""
+        appended = self._read_appended(snap.files.get("sales.csv"), st)
+        if appended is None:
+            return None
+        start, end, files["sales.csv"] = appended
+        if end == start:
+            return replace(snap, files=files)
+        sales, rollup = self._fold(snap.sales, snap.rollup, start, end, files["sales.csv"].columns)
+        return replace(snap, sales=sales, rollup=rollup, files=files)
+
+    def _next(self, snap: Snapshot) -> Optional[Snapshot]:
+        """`snap` with the CSV changes since it folded in; None if there are none."""
+        files = dict(snap.files)
+        changed = False
+        nxt = snap
+        for p in sorted(glob.glob(self.path("*.csv"))):
+            name = os.path.basename(p)
+            st = self._stat(name)
+            old = files.get(name)
+            if st is None or (old and old.mtime == st.st_mtime and old.size == st.st_size):
+                continue
+            changed = True
+            with stage("load"):
+                if name == "sales.csv" and self.partitioned:
+                    nxt = replace(nxt, partitions=self._load_partitions(files, nxt.partitions))
+                elif name == "sales.csv":
+                    appended = self._append_sales(nxt, st, files)
+                    if appended is not None:
+                        nxt = appended
+                    else:
+                        sales, rollup = self._load_sales(files)
+                        nxt = replace(nxt, sales=sales, rollup=rollup)
+                elif name == "daily_stats.csv":
+                    nxt = replace(nxt, daily=self._load_daily(files))
+                else:
+                    files[name] = FileState(st.st_mtime, st.st_size)
+
+        if not changed:
+            return None
+        return replace(nxt, version=snap.version + 1, files=files)
+
+    # -- shared generations ------------------------------------------------
+
+    def _attach(self, gen: generations.Generation, prev: Optional[Snapshot]) -> Optional[Snapshot]:
+        """Snapshot of shared generation `gen`; frames whose CSV is unchanged since `prev` are reused."""
+        files = {name: FileState.from_meta(meta) for name, meta in gen.files.items()}
+        frames = {part: getattr(prev, part) for part, src in SHARED_FRAMES.items()
+                  if prev is not None and prev.files.get(src) == files.get(src)}
+        mapped = generations.attach(self.shared_dir, gen, [p for p in SHARED_FRAMES if p not in frames])
+        if mapped is None:
+            logger.warning("shared generation %d is incomplete", gen.number)
+            return None
+        frames.update(mapped)
+        parts = None
+        if self.partitioned:
+            same = prev is not None and prev.files.get("sales.csv") == files.get("sales.csv")
+            parts = prev.partitions if same else partitions.load(self.partition_dir)
+        return Snapshot(gen.number, files=files, streamed=gen.streamed, partitions=parts, **frames)
+
+    def _sync_shared(self, snap: Optional[Snapshot]) -> Optional[Snapshot]:
+        """Shared mode: move to the newest generation any process published, then publish the
+        CSV changes it doesn't have yet as the next one. None if `snap` is still current."""
+        with generations.locked(self.shared_dir):
+            latest = generations.current(self.shared_dir)
+            base = snap
+            if latest is not None and (snap is None or latest.number != snap.version):
+                base = self._attach(latest, snap)
+                if base is None:
+                    base, latest = snap, None
+            nxt = self._load_all() if base is None else self._next(base)
+            if nxt is not None:
+                number = max(nxt.version, latest.number + 1 if latest else 1)
+                changed = {part: getattr(nxt, part) for part, src in SHARED_FRAMES.items()
+                           if latest is None or base is None or nxt.files.get(src) != base.files.get(src)}
+                with stage("load"):
+                    latest = generations.write(self.shared_dir, number, changed,
+                                               {name: f.to_meta() for name, f in nxt.files.items()},
+                                               self.streaming, latest)
+                    # map what was just written, so this process drops its private copy too
+                    base = self._attach(latest, base) or replace(nxt, version=number)
+                logger.info("published shared generation %d", number)
+            return None if base is snap else base
+
+    def _sales_change(self, old: Optional[FileState], new: Optional[FileState]) -> Optional[str]:
+        """"append" if `new` only adds rows to `old`, "reload" for any other change, None for none."""
+        if old == new:
+            return None
+        if old is not None and new is not None and old.columns and old.columns == new.columns \
+                and new.offset >= old.offset and tail_bytes(self.path("sales.csv"), old.offset) == old.tail:
+            return "append"
+        return "reload"
+
+    def refresh(self) -> bool:
+        """Pick up CSV changes; returns True when a new snapshot was published."""
+        with self._lock:
+            snap = self._snapshot
+            if self.shared:
+                nxt = self._sync_shared(snap)
+            elif snap is None:
+                nxt = self._load_all()
+            else:
+                nxt = self._next(snap)
+            if nxt is None:
+                return False
+            self.publish(nxt)
+            if snap is not None:
+                # still under the lock, so listeners see the generations in order
+                sales_change = self._sales_change(snap.files.get("sales.csv"), nxt.files.get("sales.csv"))
+                for listener in self.listeners:
+                    try:
+                        listener(snap, nxt, sales_change)
+                    except Exception:
+                        logger.exception("snapshot listener failed")
+            return True
+
+    def publish(self, snap: Snapshot):
+        """Make `snap` the current generation."""
+        # a single attribute store: readers see either the old or the new generation
+        self._snapshot = snap
+
+    # -- background polling ------------------------------------------------
+
+    def start_watcher(self, interval: float = 5.0):
+        """Poll the data directory every `interval` seconds in a daemon thread."""
+        if interval <= 0 or self._thread is not None:
+            return
+
+        def _run():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception:
+                    logger.exception("data refresh failed; keeping previous snapshot")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=_run, name="datastore-watcher", daemon=True)
+        self._thread.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
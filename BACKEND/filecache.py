@@ -0,0 +1,58 @@
+"""Small side files (feedback, inventory) parsed once and kept until they change.
+
+`FileCache.get(name, build)` stats DATA/<name> and returns what `build(path)`
+produced for it last time, unless the file's mtime or size has changed since;
+then it builds again. A request costs one stat() instead of a CSV parse, and
+whatever `build` derives (scores, summaries, encoded payloads) is computed
+once per file version and shared by every request.
+
+Several builders may read the same file; each keeps its own entry. A missing
+file raises FileNotFoundError from get(), and a build that fails is not cached.
+
+When the file changes, an `update(path, previous)` function, if given, is
+tried before a full build: it can fold in just what was appended, or return
+None to fall back to build().
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from metrics import stage
+
+
+class FileCache:
+    def __init__(self, data_dir: str = "DATA"):
+        self.data_dir = data_dir
+        self._entries: Dict[Tuple[str, Callable], Tuple[Tuple[int, int], Any]] = {}
+        self._lock = threading.Lock()
+        self._building: Dict[Tuple[str, Callable], threading.Lock] = {}
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.data_dir, name)
+
+    def get(self, name: str, build: Callable[[str], Any], update: Optional[Callable[[str, Any], Any]] = None):
+        """build(path) for the current version of DATA/<name>."""
+        path = self.path(name)
+        key = (name, build)
+        st = os.stat(path)
+        state = (st.st_mtime_ns, st.st_size)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == state:
+            return entry[1]
+
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        # one build per file version, however many requests arrive while it runs
+        with building:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == state:
+                return entry[1]
+            with stage("load"):
+                value = update(path, entry[1]) if entry is not None and update is not None else None
+                if value is None:
+                    value = build(path)
+            self._entries[key] = (state, value)
+            return value
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,217 @@
+"""Demand forecast per item and hour, fitted for every item at once.
+
+For each item the expected quantity sold on a day in a given hour is
+
+    level(day) * weekday[dow(day)] * share[dow(day), hour]
+
+fitted over the trailing `window` days of sales (8 weeks by default):
+
+    weekday   the item's mean daily quantity on that weekday over its mean day
+    share     how a weekday's quantity spreads over the hours, shrunk towards the item's
+              all-week hour profile so thin cells don't forecast hard zeros
+    level     a least-squares line through the daily totals with the weekday effect divided
+              out, weighted towards recent days (half-life TREND_HALF_LIFE days)
+
+Everything is an array with an item axis. The window is one
+items x days x 24 quantity array filled by a single bincount; weekday factors
+and shares are sums along its axes, and the trend lines of all items come out
+of one matrix product with the weighted pseudo-inverse of the (1, day)
+design, which is the same for every item. Nothing loops over items.
+
+The fitted window is kept. When new days arrive only the days from the last
+fitted one on (it may have been partial) are aggregated, the rest of the
+window shifts along and the cheap fit is redone. A rewrite of sales.csv
+(`on_publish` with "reload"), or appended rows dated before the last fitted
+day, drop the window so the next request starts over.
+"""
+import os
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from live import appended_rows
+from metrics import stage
+
+PRIOR_WEIGHT = 20.0     # pseudo-units of the all-week hour profile mixed into each weekday's shares
+TREND_HALF_LIFE = 7.0   # days; recent days pull the trend line harder (backtests better than a flat fit)
+
+
+@dataclass(frozen=True)
+class Fit:
+    tag: str
+    end: object                # last day of the window (a date)
+    items: List[str]
+    cube: np.ndarray           # items x window days x 24 quantities, oldest day first
+    weekday: np.ndarray        # items x 7, Monday first
+    share: np.ndarray          # items x 7 x 24, each row sums to 1
+    level: np.ndarray          # items x 2: daily level on the window's first day, change per day
+
+    @property
+    def start(self):
+        return self.end - timedelta(days=self.cube.shape[1] - 1)
+
+
+def window_cube(cells: pd.DataFrame, items: List[str], start, days: int) -> np.ndarray:
+    """items x days x 24 quantities from (date, hour, item_name, quantity) cells starting at `start`."""
+    if cells.empty:
+        return np.zeros((len(items), days, 24))
+    names = cells["item_name"]
+    if isinstance(names.dtype, pd.CategoricalDtype):
+        # look each category up once, not every cell; code -1 (missing) picks the appended -1
+        item = np.append(pd.Index(items).get_indexer(names.cat.categories.astype(str)), -1)[names.cat.codes]
+    else:
+        item = pd.Index(items).get_indexer(names.astype(str))
+    dates = cells["date"]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    day = (dates.to_numpy().astype("datetime64[D]") - np.datetime64(start, "D")).astype("int64")
+    hour = pd.to_numeric(cells["hour"], errors="coerce").to_numpy(dtype="float64")
+    ok = (item >= 0) & (day >= 0) & (day < days) & (hour >= 0) & (hour < 24)
+    flat = (item[ok] * days + day[ok]) * 24 + hour[ok].astype("int64")
+    weights = cells["quantity"].to_numpy(dtype="float64")[ok]
+    return np.bincount(flat, weights=weights, minlength=len(items) * days * 24).reshape(len(items), days, 24)
+
+
+def fit_models(cube: np.ndarray, start) -> tuple:
+    """(weekday, share, level) for every item of a window that begins on `start`."""
+    n_items, days, _ = cube.shape
+    dow = (start.weekday() + np.arange(days)) % 7
+    onehot = np.eye(7)[dow]                                   # days x 7
+    daily = cube.sum(axis=2)                                  # items x days
+
+    per_dow = onehot.sum(axis=0)
+    mean_dow = daily @ onehot / np.maximum(per_dow, 1)
+    mean_day = daily.mean(axis=1, keepdims=True)
+    weekday = np.divide(mean_dow, mean_day, out=np.ones_like(mean_dow), where=mean_day > 0)
+    weekday[:, per_dow == 0] = 1.0                            # a window shorter than a week
+
+    by_dow = np.einsum("idh,dw->iwh", cube, onehot)           # items x 7 x 24
+    hours = cube.sum(axis=1)
+    profile = np.divide(hours, hours.sum(axis=1, keepdims=True), out=np.full_like(hours, 1 / 24),
+                        where=hours.sum(axis=1, keepdims=True) > 0)
+    share = (by_dow + PRIOR_WEIGHT * profile[:, None, :]) / (by_dow.sum(axis=2, keepdims=True) + PRIOR_WEIGHT)
+
+    # days on a weekday the item never sells on count as an average day for the trend
+    factor = weekday[:, dow]
+    level_days = np.divide(daily, factor, out=np.broadcast_to(mean_day, daily.shape).copy(), where=factor > 0)
+    design = np.column_stack([np.ones(days), np.arange(days)])
+    root_w = np.sqrt(0.5 ** ((days - 1 - np.arange(days)) / TREND_HALF_LIFE))
+    solve = np.linalg.pinv(design * root_w[:, None]) * root_w  # 2 x days, weighted least squares
+    level = level_days @ solve.T                              # items x 2
+    return weekday, share, level
+
+
+def predict(fit: Fit, days: int) -> np.ndarray:
+    """items x days x 24 expected quantities for the `days` after the window."""
+    window = fit.cube.shape[1]
+    t = np.arange(window, window + days)
+    dow = ((fit.end + timedelta(days=1)).weekday() + np.arange(days)) % 7
+    level = np.maximum(fit.level[:, :1] + fit.level[:, 1:] * t, 0.0)
+    daily = level * fit.weekday[:, dow]
+    return daily[:, :, None] * fit.share[:, dow, :]
+
+
+def _align(cube: np.ndarray, old: List[str], new: List[str]) -> np.ndarray:
+    """`cube` with its item axis re-ordered to `new`; items it didn't have get zeros."""
+    if old == new:
+        return cube
+    out = np.zeros((len(new),) + cube.shape[1:])
+    pos = pd.Index(new).get_indexer(old)
+    out[pos] = cube
+    return out
+
+
+class Forecaster:
+    """Keeps the latest fitted window and answers forecasts from it."""
+
+    def __init__(self, window: int = 56, sales_path: Optional[str] = None):
+        self.window = window
+        self.sales_path = sales_path
+        self._fit: Optional[Fit] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, sales_path: Optional[str] = None) -> "Forecaster":
+        return cls(int(os.environ.get("FORECAST_WINDOW_DAYS", "56")), sales_path)
+
+    def on_publish(self, old, new, sales_change: Optional[str]):
+        """DataStore listener: sales appended for the last fitted day or later keep the window;
+        a rewritten file, or rows backdated into days already fitted, drop it."""
+        if sales_change == "reload":
+            with self._lock:
+                self._fit = None
+        elif sales_change == "append" and self._fit is not None:
+            if self.sales_path is None:
+                first = None   # can't tell where the rows landed: refit everything
+            else:
+                first = appended_rows(self.sales_path, old, new).index.min()
+                if pd.isna(first):
+                    return
+                first = first.date()
+            with self._lock:
+                # the refit only re-reads from fit.end on; anything earlier needs the whole window
+                if self._fit is not None and (first is None or first < self._fit.end):
+                    self._fit = None
+
+    def fitted(self, tag: str, view) -> Optional[Fit]:
+        """The models for data version `tag`, refitting from `view` when it changed."""
+        fit = self._fit
+        if fit is not None and fit.tag == tag:
+            return fit
+        with self._lock:
+            fit = self._fit
+            if fit is not None and fit.tag == tag:
+                return fit
+            end = view.last_sale_day()
+            if end is None:
+                return None
+            start = end - timedelta(days=self.window - 1)
+            shift = None if fit is None else (end - fit.end).days
+            incremental = shift is not None and 0 <= shift < self.window
+            with stage("load"):
+                # incrementally, re-read from the last fitted day on; older days shift along unchanged
+                cells = view.item_hours(fit.end if incremental else start, end)
+            with stage("aggregate"):
+                items = sorted(set(cells["item_name"].astype(str)) | set(fit.items if incremental else ()))
+                if incremental:
+                    kept = _align(fit.cube, fit.items, items)[:, shift:-1]
+                    cube = np.concatenate([kept, window_cube(cells, items, fit.end, shift + 1)], axis=1)
+                else:
+                    cube = window_cube(cells, items, start, self.window)
+                # items without a sale in the window have nothing to forecast
+                sold = cube.any(axis=(1, 2))
+                items, cube = [i for i, k in zip(items, sold) if k], cube[sold]
+                fit = Fit(tag, end, items, cube, *fit_models(cube, start))
+            self._fit = fit
+        return fit
+
+    def forecast(self, tag: str, view, days: int = 7, item: Optional[str] = None) -> dict:
+        """Expected quantity per item, day and hour for the `days` after the last day of data."""
+        fit = self.fitted(tag, view)
+        if fit is None:
+            return {"start_date": None, "end_date": None, "days": days, "window_days": self.window,
+                    "fitted_through": None, "items": []}
+        with stage("aggregate"):
+            hourly = predict(fit, days)
+            daily = hourly.sum(axis=2)
+            total = daily.sum(axis=1)
+            order = np.argsort(-total, kind="stable")
+            if item is not None and item.strip().lower() not in ("", "all"):
+                order = [i for i in order if fit.items[i].lower() == item.strip().lower()]
+        first = fit.end + timedelta(days=1)
+        dates = [(first + timedelta(days=k)).isoformat() for k in range(days)]
+        with stage("serialize"):
+            hourly, daily = np.round(hourly, 2), np.round(daily, 2)
+            rows = [{
+                "item_name": fit.items[i],
+                "quantity": round(float(total[i]), 2),
+                "trend_per_day": round(float(fit.level[i, 1]), 3),
+                "daily": [{"date": d, "quantity": q, "hourly": h}
+                          for d, q, h in zip(dates, daily[i].tolist(), hourly[i].tolist())],
+            } for i in order]
+        return {"start_date": dates[0], "end_date": dates[-1], "days": days, "window_days": self.window,
+                "fitted_through": fit.end.isoformat(), "items": rows}
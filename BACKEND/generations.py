@@ -0,0 +1,119 @@
+"""Snapshot frames shared by every worker process through memory-mapped files.
+
+Without this, each uvicorn worker that imports main.py parses the CSVs and
+holds its own copy of every frame, so memory grows with the worker count.
+With it, one copy lives in the page cache and every worker maps it:
+
+    DATA/.shared/current.json       the generation to use: its number, the generation whose
+                                    file holds each frame, and the CSV states it was built from
+    DATA/.shared/g7.daily.feather   a frame written by generation 7 (Arrow IPC, uncompressed)
+    DATA/.shared/g7.sales.feather
+    DATA/.shared/g5.rollup.feather  ... frames a generation didn't change stay in older files
+    DATA/.shared/lock               flock()ed by the process that is loading
+
+One process at a time holds the lock, parses what changed, writes just the
+changed frames and swaps current.json to the new generation with a rename.
+Every process, the writer included, then memory-maps those files read-only;
+the numeric columns, categorical codes and date index come back as views of
+the mapping, so N workers share one copy. Attaching happens under the lock
+too, which is what makes deleting the files no generation uses safe (a
+worker still on an older mapping keeps reading it after the unlink).
+
+Needs pyarrow (through colcache) and POSIX file locks.
+"""
+import json
+import logging
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import pandas as pd
+
+import colcache
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: every worker keeps its own frames
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+POINTER = "current.json"
+
+
+def available() -> bool:
+    return fcntl is not None and colcache.available()
+
+
+@dataclass(frozen=True)
+class Generation:
+    number: int
+    parts: Dict[str, int]     # frame name -> generation whose file holds it
+    files: Dict[str, dict]    # FileState meta per CSV
+    streamed: bool = False
+
+    def source(self, part: str) -> str:
+        return f"g{self.parts[part]}.csv"
+
+
+@contextmanager
+def locked(root: str):
+    """Hold the inter-process loader lock for `root`."""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, "lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def current(root: str) -> Optional[Generation]:
+    """The generation current.json points at, or None if there is none."""
+    try:
+        with open(os.path.join(root, POINTER)) as f:
+            return Generation(**json.load(f))
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("ignoring unreadable %s in %s", POINTER, root, exc_info=True)
+        return None
+
+
+def write(root: str, number: int, frames: Dict[str, pd.DataFrame], files: Dict[str, dict],
+          streamed: bool, previous: Optional[Generation] = None) -> Generation:
+    """Write `frames` as generation `number` and point current.json at it.
+
+    Frames missing from `frames` are taken over from `previous`. Call with the lock held.
+    """
+    parts = dict(previous.parts) if previous else {}
+    for part, frame in frames.items():
+        if not colcache.write(root, f"g{number}.csv", {part: frame}, {"generation": number}):
+            raise OSError(f"could not write {part} for generation {number}")
+        parts[part] = number
+    gen = Generation(number, parts, files, streamed)
+    tmp = os.path.join(root, POINTER + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(vars(gen), f)
+    os.replace(tmp, os.path.join(root, POINTER))
+    _remove_unused(root, gen)
+    return gen
+
+
+def attach(root: str, gen: Generation, parts) -> Optional[Dict[str, pd.DataFrame]]:
+    """Memory-map `parts` of `gen`; None if any of them is missing. Call with the lock held."""
+    frames = {}
+    for part in parts:
+        cached = colcache.read(root, gen.source(part), [part])
+        if cached is None:
+            return None
+        frames[part] = cached[0][part]
+    return frames
+
+
+def _remove_unused(root: str, gen: Generation):
+    keep = {os.path.basename(colcache.cache_file(root, gen.source(p), p)) for p in gen.parts}
+    for name in os.listdir(root):
+        if name.endswith(".feather") and name not in keep:
+            os.remove(os.path.join(root, name))
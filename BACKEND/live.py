@@ -0,0 +1,210 @@
+"""Live dashboard updates: new sales folded into per-cell increments and pushed over SSE.
+
+New sale lines reach sales.csv either through POST /live/events (which
+appends them and refreshes the data store straight away) or from whatever
+else appends to the file (picked up by the store's watcher). Either way the
+store hands each new snapshot to `LiveBoard.on_publish`, which reads back
+only the appended bytes and folds those rows into increments per date and
+category:
+
+    kpi       revenue / items / lines
+    hourly    quantity / revenue per hour
+    heatmap   value (quantity) / revenue per weekday x hour
+    products  quantity / revenue per item
+    payments  revenue per payment method
+
+Only the cells the new rows touch are sent, and only as increments, so a
+dashboard adds them to whatever window it shows if the change's date is in
+it (and its category matches the filter). Work per event is constant: nothing
+is recomputed from history.
+
+Each message is encoded once and the same bytes are queued for every
+subscriber, so the cost of a message is one queue append per dashboard. A
+subscriber that falls more than `queue_size` messages behind gets a `reset`
+instead of a gap, as does everyone when sales.csv is rewritten or daily stats
+change; a reset means "refetch the bundle".
+
+Stream format (text/event-stream):
+
+    event: hello   data: {"version": 7}
+    event: delta   data: {"version": 8, "changes": [{"date", "category", "kpi", "hourly", ...}]}
+    event: reset   data: {"version": 9}
+
+`version` is the data snapshot version; /dashboard/bundle reports the one
+it was computed from as `live_version`, and deltas at or below it are
+already included in it.
+"""
+import asyncio
+import csv
+import io
+import os
+import threading
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from datastore import prepare_sales, read_csv_bytes
+from metrics import stage
+from serialize import dumps
+
+HEARTBEAT_SECONDS = 15.0
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def _frame(event: str, payload: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + dumps(payload) + b"\n\n"
+
+
+class Hub:
+    """Fans encoded SSE messages out to every connected stream."""
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._queues = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.messages = self.resets = 0
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._queues)
+
+    def publish(self, event: str, payload: dict):
+        """Send to every subscriber; callable from any thread."""
+        loop = self._loop
+        if loop is None or not self._queues:
+            return
+        with stage("serialize"):
+            frame = _frame(event, payload)
+        try:
+            loop.call_soon_threadsafe(self._deliver, frame, payload.get("version"))
+        except RuntimeError:   # the loop has closed
+            pass
+
+    def _deliver(self, frame: bytes, version):
+        self.messages += 1
+        for q in list(self._queues):
+            try:
+                q.put_nowait(frame)
+            except asyncio.QueueFull:
+                # a dashboard that can't keep up refetches rather than silently missing cells
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(_frame("reset", {"version": version}))
+                self.resets += 1
+
+    async def stream(self, hello: dict, is_disconnected):
+        """The SSE body for one subscriber: hello, then queued messages, with heartbeats."""
+        self._loop = asyncio.get_running_loop()
+        q: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._queues.add(q)
+        try:
+            yield b"retry: 3000\n" + _frame("hello", hello)
+            while True:
+                try:
+                    frame = await asyncio.wait_for(q.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        break
+                    frame = b": keep-alive\n\n"
+                yield frame
+        finally:
+            self._queues.discard(q)
+
+
+def appended_rows(path: str, old, new) -> pd.DataFrame:
+    """Typed sales rows between the sales.csv offsets of two snapshots (an append)."""
+    before, after = old.files.get("sales.csv"), new.files.get("sales.csv")
+    if before is None or after is None or after.offset <= before.offset:
+        return prepare_sales(pd.DataFrame(columns=list(before.columns if before else ())))
+    return prepare_sales(read_csv_bytes(path, before.offset, after.offset, names=list(before.columns)))
+
+
+def fold(rows: pd.DataFrame) -> list:
+    """Increments per (date, category) for the panels a dashboard shows."""
+    if rows.empty:
+        return []
+    dates = rows.index.normalize()
+    frame = pd.DataFrame({
+        "date": dates.strftime("%Y-%m-%d"),
+        "day": np.asarray(WEEKDAYS, dtype=object)[dates.dayofweek],
+        "category": rows["category"].astype(str).to_numpy(),
+        "item_name": rows["item_name"].astype(str).to_numpy(),
+        "payment_method": rows["payment_method"].astype(str).to_numpy() if "payment_method" in rows else "",
+        "hour": rows["hour"].astype("int64").to_numpy(),
+        "quantity": np.asarray(rows["quantity"], dtype="int64"),
+        "revenue": np.round(np.asarray(rows["total"], dtype="float64"), 2),
+    })
+    kpi = frame.groupby(["date", "category"], sort=True).agg(
+        revenue=("revenue", "sum"), items=("quantity", "sum"), lines=("quantity", "size"))
+    changes = {
+        key: {"date": key[0], "category": key[1],
+              "kpi": {"revenue": round(float(r.revenue), 2), "items": int(r.items), "lines": int(r.lines)}}
+        for key, r in zip(kpi.index, kpi.itertuples(index=False))
+    }
+
+    def cells(keys):
+        sums = frame.groupby(["date", "category"] + keys, sort=True)[["quantity", "revenue"]].sum()
+        for key, quantity, revenue in zip(sums.index, sums["quantity"], sums["revenue"]):
+            yield changes[key[:2]], key[2:], int(quantity), round(float(revenue), 2)
+
+    for change, (hour,), quantity, revenue in cells(["hour"]):
+        change.setdefault("hourly", []).append({"hour": int(hour), "quantity": quantity, "revenue": revenue})
+    for change, (day, hour), quantity, revenue in cells(["day", "hour"]):
+        change.setdefault("heatmap", []).append({"day": day, "hour": int(hour), "value": quantity, "revenue": revenue})
+    for change, (item,), quantity, revenue in cells(["item_name"]):
+        change.setdefault("products", []).append({"item_name": item, "quantity": quantity, "revenue": revenue})
+    for change, (method,), _, revenue in cells(["payment_method"]):
+        change.setdefault("payments", []).append({"method": method, "revenue": revenue})
+    return list(changes.values())
+
+
+class LiveBoard:
+    """Turns published snapshots into delta / reset messages on a Hub."""
+
+    def __init__(self, hub: Hub, sales_path: str):
+        self.hub = hub
+        self.sales_path = sales_path
+        self.version = 0
+        self.rows = 0
+
+    def on_publish(self, old, new, sales_change: Optional[str]):
+        """DataStore listener."""
+        self.version = new.version
+        if sales_change == "reload" or new.daily is not old.daily:
+            self.hub.publish("reset", {"version": new.version})
+        elif sales_change == "append":
+            if not self.hub.subscribers:
+                return
+            with stage("aggregate"):
+                rows = appended_rows(self.sales_path, old, new)
+                changes = fold(rows)
+            self.rows += len(rows)
+            if changes:
+                self.hub.publish("delta", {"version": new.version, "changes": changes})
+
+
+_append_lock = threading.Lock()
+
+
+def append_sales(path: str, columns: Iterable[str], events: Iterable[dict]) -> int:
+    """Append `events` to sales.csv as complete lines in the file's column order; returns how many."""
+    columns = list(columns)
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    n = 0
+    for e in events:
+        writer.writerow(["" if e.get(c) is None else e[c] for c in columns])
+        n += 1
+    with _append_lock, open(path, "ab") as f:
+        # never glue our first row onto a line someone left unterminated
+        if f.tell() and not _ends_with_newline(path):
+            f.write(b"\n")
+        f.write(buf.getvalue().encode())
+    return n
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
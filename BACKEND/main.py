@@ -1,10 +1,50 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 import pandas as pd
 from datetime import datetime, timedelta, date
 from typing import Optional, List
 import uvicorn
-app = FastAPI()
+import os
+from contextlib import asynccontextmanager
+from compute import ComputePool
+from datastore import DataStore
+from filecache import FileCache
+from forecast import Forecaster
+from live import Hub, LiveBoard, append_sales
+from mba import BasketMiner
+import metrics
+from metrics import MetricsMiddleware
+from repository import FrameRepository, open_repository
+from sentiment import LABELS, build_table, update_table
+from response_cache import ResponseCache, ResponseCacheMiddleware
+from serialize import FastJSONResponse, columnar, dumps, layout, records
+from stock import load_recipes, load_stock, project
+
+
+@asynccontextmanager
+async def lifespan(app):
+    repo.start(float(os.environ.get("DATA_RELOAD_SECONDS", "5")))
+    yield
+    repo.stop()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Cache GET analytics responses per data snapshot; repeat loads revalidate with ETag -> 304.
+# Added before CORS so CORS stays the outer layer and decorates cached / 304 responses too.
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get("RESPONSE_CACHE_SIZE", "256")),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", "300")),
+)
+app.add_middleware(
+    ResponseCacheMiddleware,
+    cache=response_cache,
+    version=lambda: repo.version(),
+    paths=["/kpi/", "/dashboard-data", "/dashboard/bundle", "/revenue-trends", "/product-analytics",
+           "/hourly-analysis", "/heatmap", "/feedback-summary", "/feedback/sentiment", "/inventory", "/mba/rules",
+           "/forecast", "/inventory/projection"],
+)
 
 # Allow frontend to talk to backend
 app.add_middleware(
@@ -13,61 +53,125 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
+)
+
+# Request and stage timings for /metrics; outermost, so cache hits and CORS are timed too.
+# PROFILING_ENABLED=1 lets a request ask for a sampled profile with an X-Profile header.
+app.add_middleware(
+    MetricsMiddleware,
+    routes=lambda: [getattr(r, "path", "") for r in app.routes],
+    profiling=os.environ.get("PROFILING_ENABLED", "0") == "1",
+    profile_interval=float(os.environ.get("PROFILE_INTERVAL_MS", "1")) / 1000,
 )
 
 @app.get("/")
 def read_root():
     return {"message": "FastAPI is running"}
 
-df = pd.read_csv("DATA/daily_stats.csv", parse_dates=["date"])
 
-# ensure date column is plain date (no time)
-df["date"] = pd.to_datetime(df["date"]).dt.date
+@app.get("/compute-stats")
+def compute_stats():
+    """Executor size plus per-endpoint queue depth, running count and timings."""
+    return compute.stats()
 
-# guard: make numeric conversions safe
-df["total_revenue"] = pd.to_numeric(df["total_revenue"], errors="coerce").fillna(0.0)
-df["total_customers"] = pd.to_numeric(df["total_customers"], errors="coerce").fillna(0).astype(int)
-df["avg_order_value"] = pd.to_numeric(df["avg_order_value"], errors="coerce").fillna(0.0)
 
-# Load sales data for product / hourly analysis (used by several endpoints)
-try:
-    sales_df = pd.read_csv("DATA/sales.csv", parse_dates=["date"]) if True else pd.DataFrame()
-except Exception:
-    # fallback to empty DataFrame with expected columns
-    sales_df = pd.DataFrame(columns=["date", "time", "item_name", "category", "quantity", "price", "total"])
+@app.get("/metrics")
+def prometheus_metrics():
+    """Request / stage latency histograms, response cache and compute pool counters."""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
 
-if "time" in sales_df.columns:
-    # normalize hour column for grouping
-    try:
-        sales_df["hour"] = sales_df["time"].astype(str).str.split(":").str[0].astype(int)
-    except Exception:
-        sales_df["hour"] = None
+
+def _cache_metrics():
+    c = response_cache
+    yield ("bipa_response_cache_requests_total", "counter", "Cached-path GET requests by outcome.",
+           [({"outcome": "hit"}, c.hits), ({"outcome": "miss"}, c.misses),
+            ({"outcome": "not_modified"}, c.not_modified)])
+    yield "bipa_response_cache_entries", "gauge", "Responses held in the cache.", [({}, len(c))]
+
+
+def _compute_metrics():
+    endpoints = compute.stats()["endpoints"]
+    for field, kind, doc in [("queued", "gauge", "Requests waiting for a compute slot."),
+                             ("running", "gauge", "Requests running on the compute pool."),
+                             ("completed", "counter", "Requests finished on the compute pool."),
+                             ("rejected", "counter", "Requests that gave up waiting for a slot (503)."),
+                             ("timed_out", "counter", "Requests that ran past the timeout (504).")]:
+        name = f"bipa_compute_{field}" + ("_total" if kind == "counter" else "")
+        yield name, kind, doc, [({"endpoint": e}, st[field]) for e, st in endpoints.items()]
+
+
+def _live_metrics():
+    yield "bipa_live_subscribers", "gauge", "Dashboards connected to /live/stream.", [({}, hub.subscribers)]
+    yield "bipa_live_messages_total", "counter", "Messages pushed to /live/stream.", [({}, hub.messages)]
+    yield "bipa_live_resets_total", "counter", "Subscribers told to refetch after falling behind.", [({}, hub.resets)]
+    yield "bipa_live_rows_total", "counter", "Appended sales rows folded into live deltas.", [({}, live_board.rows)]
+
+
+metrics.registry.collectors += [_cache_metrics, _compute_metrics, _live_metrics]
+
+# daily stats, sales and the sales rollup, reloaded in the background when DATA/*.csv change;
+# SALES_STREAMING=1 folds sales.csv into the rollup in chunks and keeps no raw rows;
+# SALES_PARTITIONED=1 keeps sales in month (x store) partitions on disk instead;
+# DATA_SHARED=1 memory-maps one copy of the frames for all workers (uvicorn --workers N)
+store = DataStore("DATA", streaming=os.environ.get("SALES_STREAMING", "0") == "1",
+                  chunksize=int(os.environ.get("SALES_CHUNK_ROWS", "1000000")),
+                  partitioned=os.environ.get("SALES_PARTITIONED", "0") == "1",
+                  shared=os.environ.get("DATA_SHARED", "0") == "1")
+
+# where the aggregates come from: the store above, or a SQL database when DATABASE_URL is set
+repo = open_repository(store)
+
+# sales appended to sales.csv, pushed to connected dashboards as increments (see live.py)
+hub = Hub(queue_size=int(os.environ.get("LIVE_QUEUE_SIZE", "256")))
+live_board = LiveBoard(hub, store.path("sales.csv"))
+store.listeners.append(live_board.on_publish)
+
+# feedback.csv / inventory.csv, parsed and summarised once per file version
+side_files = FileCache("DATA")
+
+# pandas work runs here, with a per-endpoint cap so one slow endpoint can't take every thread
+compute = ComputePool.from_env()
+
+# frequent itemsets mined once per data version; slider changes only re-filter them
+miner = BasketMiner.from_env()
+
+# per item x weekday x hour demand models over the trailing FORECAST_WINDOW_DAYS, refit as days arrive
+forecaster = Forecaster.from_env(store.path("sales.csv"))
+store.listeners.append(forecaster.on_publish)
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
 @app.get("/kpi/")
+@compute.offload()
 def get_kpi(
     query_date: Optional[str] = Query(None, description="Date in YYYY-MM-DD format (default: today)"),
     window: int = Query(5, ge=1, le=30, description="Number of days to aggregate (default 5)")
 ):
+    view = repo.view()
     if query_date is None:
-        end_date = df["date"].max()   # use the most recent date in CSV
+        end_date = view.last_day()   # use the most recent date in the data
     else:
         try:
             end_date = datetime.strptime(query_date, "%Y-%m-%d").date()
         except ValueError:
             raise HTTPException(status_code=400, detail="Date must be in YYYY-MM-DD format")
 
+    return _kpi(view, end_date, window)
+
+
+def _kpi(view, end_date: date, window: int):
+    """Revenue / transactions / avg order value over the `window` days ending at end_date."""
     start_date = end_date - timedelta(days=window - 1)
-    ...
 
-    # select rows in the date range
-    mask = (df["date"] >= start_date) & (df["date"] <= end_date)
-    selected = df.loc[mask]
+    # sum the rows in the date range
+    selected = view.daily_totals(start_date, end_date)
 
-    if selected.empty:
+    if not selected["days"]:
         raise HTTPException(status_code=404, detail=f"No data found between {start_date} and {end_date}")
 
-    total_revenue = float(selected["total_revenue"].sum())
-    total_transactions = int(selected["total_customers"].sum())
+    total_revenue = selected["revenue"]
+    total_transactions = selected["customers"]
 
     # weighted average order value: total_revenue / total_transactions
     avg_order_value = round((total_revenue / total_transactions) if total_transactions else 0.0, 2)
@@ -79,49 +183,112 @@ def get_kpi(
         "display_as_date": end_date.isoformat(),   # the date you asked (displayed as 'today')
         "start_date": start_date.isoformat(),
         "end_date": end_date.isoformat(),
-        "days_aggregated": int(selected.shape[0]),
+        "days_aggregated": selected["days"],
         "total_revenue": total_revenue,
         "total_transactions": total_transactions,
         "avg_order_value": avg_order_value
     }
 
 
+def _no_kpi():
+    return {"total_revenue": 0, "total_transactions": 0, "avg_order_value": 0, "display_as_date": None}
+
+
+def _product_rows(prod: pd.DataFrame, top: int):
+    """Top `top` items of per-item totals by revenue."""
+    prod = prod.sort_values('total', ascending=False).head(top)
+    return records({'item_name': prod['item_name'], 'quantity': prod['quantity'], 'revenue': prod['total']})
+
+
+def _hourly_rows(hr: pd.DataFrame, shape: str = 'records'):
+    return layout({'hour': hr['hour'], 'quantity': hr['quantity'], 'revenue': hr['total']}, shape)
+
+
+def _payment_rows(pay: pd.DataFrame):
+    """Revenue per payment method and its share of the total."""
+    if pay.empty:
+        return []
+    total_rev = float(pay['total'].sum())
+    rows = records({'method': pay['payment_method'], 'revenue': pay['total']})
+    for r in rows:
+        r['pct'] = round(r['revenue'] / total_rev * 100 if total_rev else 0, 1)
+    return rows
+
+
+def _peak_hour(hr: pd.DataFrame):
+    """(hour, revenue) of the busiest hour by quantity, or (None, None)."""
+    if hr.empty:
+        return None, None
+    top = hr.sort_values('quantity', ascending=False).iloc[0]
+    peak_hour = int(top['hour']) if pd.notna(top['hour']) else None
+    peak_hour_revenue = float(top['total']) if pd.notna(top['total']) else None
+    return peak_hour, peak_hour_revenue
+
+
+def _avg_order_delta(df: pd.DataFrame):
+    """% change of the last day's avg_order_value vs the day before."""
+    recent_two = df['avg_order_value'].to_numpy()[-2:]
+    if len(recent_two) == 2:
+        prev, last = float(recent_two[0]), float(recent_two[1])
+        if prev:
+            return round((last - prev) / prev * 100, 1)
+    return None
+
+
+def _trend_rows(df: pd.DataFrame, shape: str = 'records'):
+    return layout({'date': df.index, 'total_revenue': df['total_revenue']}, shape)
+
+
+def _split_trend_rows(df: pd.DataFrame, split: pd.DataFrame, shape: str = 'records'):
+    """Trend points with each category's total for the same date under 'by_category'."""
+    rows = _trend_rows(df, shape)
+    per_category = {name: split[name] for name in split.columns}
+    if shape == 'columns':
+        rows['by_category'] = columnar(per_category)
+    else:
+        for point, totals in zip(rows, records(per_category) if per_category else [{}] * len(rows)):
+            point['by_category'] = totals
+    return rows
+
+
+def _heatmap_cells(qty, rev):
+    return [{'day': day, 'hour': hour, 'value': int(qty[d, hour]), 'revenue': float(rev[d, hour])}
+            for d, day in enumerate(WEEKDAYS) for hour in range(24)]
+
+
+def _enrich_kpi(kpi_resp: dict, peak_hour, peak_hour_revenue, avg_order_delta):
+    kpi_resp['peak_hour'] = f"{peak_hour}:00" if peak_hour is not None else None
+    kpi_resp['peak_hour_revenue'] = round(peak_hour_revenue, 2) if peak_hour_revenue is not None else None
+    kpi_resp['avg_order_delta'] = avg_order_delta
+    return kpi_resp
+
+
 @app.get("/dashboard-data")
+@compute.offload()
 def dashboard_data(period: Optional[str] = Query('7d')):
     """Return a compact payload used by the frontend dashboard: kpis, top products, small revenue trend."""
+    view = repo.view()
+    last_day = view.last_day()
+
     # use kpi for last 7 days
     try:
-        kpi_resp = get_kpi(window=7)
+        kpi_resp = _kpi(view, last_day, 7)
     except Exception:
-        kpi_resp = {"total_revenue": 0, "total_transactions": 0, "avg_order_value": 0, "display_as_date": None}
+        kpi_resp = _no_kpi()
 
     # top products by revenue
-    top_products = []
-    if not sales_df.empty:
-        prod = sales_df.groupby('item_name').agg({'quantity': 'sum', 'total': 'sum'}).reset_index()
-        prod = prod.sort_values('total', ascending=False).head(10)
-        top_products = prod.to_dict(orient='records')
+    prod = view.totals('item_name').sort_values('total', ascending=False).head(10)
+    top_products = records({'item_name': prod['item_name'], 'quantity': prod['quantity'], 'total': prod['total']})
 
     # payment distribution (counts and revenue)
-    payment_distribution = []
-    if not sales_df.empty and 'payment_method' in sales_df.columns:
-        pay = sales_df.groupby('payment_method').agg({'total': 'sum', 'quantity': 'sum'}).reset_index()
-        total_rev = pay['total'].sum() if not pay.empty else 0
-        for _, r in pay.iterrows():
-            pct = float(r['total']) / total_rev * 100 if total_rev else 0
-            payment_distribution.append({'method': r['payment_method'], 'revenue': float(r['total']), 'pct': round(pct, 1)})
-
-    # small revenue trend (last 14 days) from daily stats
+    payment_distribution = _payment_rows(view.totals('payment_method'))
+
+    # small revenue trend (last 14 days) from daily stats; its last two days give the avg order delta
     trend = []
+    recent = None
     try:
-        recent = df.sort_values('date').tail(14)
-        trend = recent[['date', 'total_revenue']].to_dict(orient='records')
-        # convert dates to isoformat
-        for r in trend:
-            if hasattr(r['date'], 'date'):
-                r['date'] = r['date'].date().isoformat()
-            elif hasattr(r['date'], 'isoformat'):
-                r['date'] = r['date'].isoformat()
+        recent = view.daily(last=14)
+        trend = _trend_rows(recent)
     except Exception:
         trend = []
 
@@ -129,249 +296,332 @@ def dashboard_data(period: Optional[str] = Query('7d')):
     peak_hour = None
     peak_hour_revenue = None
     try:
-        if not sales_df.empty:
-            # consider same period as kpi (last 7 days)
-            end_d = df['date'].max()
-            start_d = end_d - timedelta(days=6)
-            s = sales_df.copy()
-            try:
-                s['date'] = pd.to_datetime(s['date']).dt.date
-            except Exception:
-                pass
-            mask = (s['date'] >= start_d) & (s['date'] <= end_d)
-            s = s.loc[mask]
-            if 'hour' not in s.columns and 'time' in s.columns:
-                try:
-                    s['hour'] = s['time'].astype(str).str.split(':').str[0].astype(int)
-                except Exception:
-                    s['hour'] = 0
-
-            grp_h = s.groupby('hour').agg({'quantity': 'sum', 'total': 'sum'}).reset_index()
-            if not grp_h.empty:
-                top = grp_h.sort_values('quantity', ascending=False).iloc[0]
-                peak_hour = int(top['hour']) if pd.notna(top['hour']) else None
-                peak_hour_revenue = float(top['total']) if pd.notna(top['total']) else None
+        # consider same period as kpi (last 7 days)
+        peak_hour, peak_hour_revenue = _peak_hour(view.totals('hour', last_day - timedelta(days=6), last_day))
     except Exception:
         peak_hour = None
         peak_hour_revenue = None
 
     # average order delta: compare latest day avg_order_value vs previous day
-    avg_order_delta = None
     try:
-        recent_two = df.sort_values('date').tail(2)
-        if recent_two.shape[0] == 2:
-            last = float(recent_two.iloc[-1]['avg_order_value'])
-            prev = float(recent_two.iloc[-2]['avg_order_value'])
-            if prev:
-                avg_order_delta = round((last - prev) / prev * 100, 1)
+        avg_order_delta = _avg_order_delta(recent if recent is not None else view.daily(last=2))
     except Exception:
         avg_order_delta = None
 
     # attach enrichments to kpi_resp
     try:
-        kpi_resp['peak_hour'] = f"{peak_hour}:00" if peak_hour is not None else None
-        kpi_resp['peak_hour_revenue'] = round(peak_hour_revenue, 2) if peak_hour_revenue is not None else None
-        kpi_resp['avg_order_delta'] = avg_order_delta
+        _enrich_kpi(kpi_resp, peak_hour, peak_hour_revenue, avg_order_delta)
     except Exception:
         pass
 
-    return {
+    return FastJSONResponse({
         'kpi': kpi_resp,
         'top_products': top_products,
         'revenue_trend': trend,
         'payment_distribution': payment_distribution
-    }
+    })
 
 
 @app.get("/revenue-trends")
-def revenue_trends(period: str = 'daily', start_date: Optional[str] = None, end_date: Optional[str] = None):
-    """Return time series revenue data from daily_stats.csv"""
-    data = df.copy()
+@compute.offload()
+def revenue_trends(period: str = Query('daily', pattern='^(daily|weekly|monthly|quarterly)$'),
+                   start_date: Optional[str] = None, end_date: Optional[str] = None,
+                   shape: str = Query('records', pattern='^(records|columns)$'),
+                   by: Optional[str] = Query(None, pattern='^category$')):
+    """Return revenue per day, week (Monday-start), month or quarter from daily_stats.csv
+
+    Points are dated by the first day of their bucket; buckets cut by start_date/end_date
+    only count the days inside. by=category adds each category's sales total per point.
+    shape=columns returns {"date": [...], "total_revenue": [...]} instead of a list of points.
+    """
+    sd = ed = None
     if start_date:
         try:
             sd = datetime.strptime(start_date, "%Y-%m-%d").date()
-            data = data[data['date'] >= sd]
         except Exception:
             pass
     if end_date:
         try:
             ed = datetime.strptime(end_date, "%Y-%m-%d").date()
-            data = data[data['date'] <= ed]
         except Exception:
             pass
-
-    # For now only support daily
-    results = data[['date', 'total_revenue']].sort_values('date')
-    out = []
-    for _, row in results.iterrows():
-        d = row['date']
-        try:
-            out.append({'date': d.isoformat(), 'total_revenue': float(row['total_revenue'])})
-        except Exception:
-            out.append({'date': str(d), 'total_revenue': float(row['total_revenue'])})
-
-    return {'period': period, 'data': out}
+    view = repo.view()
+    data = view.revenue(period, sd, ed)
+    if by == 'category':
+        split = view.category_revenue(period, sd, ed).reindex(data.index, fill_value=0.0)
+        return FastJSONResponse({'period': period, 'categories': list(split.columns),
+                                 'data': _split_trend_rows(data, split, shape)})
+    return FastJSONResponse({'period': period, 'data': _trend_rows(data, shape)})
 
 
 @app.get("/product-analytics")
+@compute.offload()
 def product_analytics(top: int = 10):
     """Return top products by revenue/quantity from sales.csv"""
-    if sales_df.empty:
+    prod = repo.view().totals('item_name')
+    if prod.empty:
         return {'top_products': []}
 
-    prod = sales_df.groupby('item_name').agg({'quantity': 'sum', 'total': 'sum'}).reset_index()
-    prod = prod.sort_values('total', ascending=False).head(top)
-    # convert dtypes
-    prod_list = []
-    for _, r in prod.iterrows():
-        prod_list.append({'item_name': r['item_name'], 'quantity': int(r['quantity']), 'revenue': float(r['total'])})
-
-    return {'top_products': prod_list}
+    return FastJSONResponse({'top_products': _product_rows(prod, top)})
 
 
 @app.get("/hourly-analysis")
-def hourly_analysis():
+@compute.offload()
+def hourly_analysis(shape: str = Query('records', pattern='^(records|columns)$')):
     """Return hourly transaction counts and revenue buckets"""
-    if sales_df.empty or 'hour' not in sales_df.columns:
+    hr = repo.view().totals('hour')
+    if hr.empty:
         return {'hourly_data': []}
 
-    hr = sales_df.groupby('hour').agg({'quantity': 'sum', 'total': 'sum'}).reset_index().sort_values('hour')
-    out = []
-    for _, r in hr.iterrows():
-        hour = int(r['hour']) if pd.notna(r['hour']) else None
-        out.append({'hour': hour, 'quantity': int(r['quantity']), 'revenue': float(r['total'])})
-
-    return {'hourly_data': out}
+    return FastJSONResponse({'hourly_data': _hourly_rows(hr, shape)})
 
 
 @app.get("/heatmap")
-def heatmap(start_date: Optional[str] = None, end_date: Optional[str] = None):
+@compute.offload()
+def heatmap(start_date: Optional[str] = None, end_date: Optional[str] = None,
+            category: Optional[str] = None, item: Optional[str] = None,
+            payment_method: Optional[str] = None):
     """Return a day x hour heatmap (quantity and revenue) aggregated from sales.csv"""
-    if sales_df.empty:
+    view = repo.view()
+    if not view.has_sales():
         return {'heatmap': []}
 
-    data = sales_df.copy()
     # filter by date range if provided
+    sd = ed = None
     if start_date:
         try:
             sd = datetime.strptime(start_date, "%Y-%m-%d").date()
-            data = data[pd.to_datetime(data['date']).dt.date >= sd]
         except Exception:
             pass
     if end_date:
         try:
             ed = datetime.strptime(end_date, "%Y-%m-%d").date()
-            data = data[pd.to_datetime(data['date']).dt.date <= ed]
         except Exception:
             pass
+    grid = view.weekday_hour(sd, ed, category=category, item_name=item, payment_method=payment_method)
+    return FastJSONResponse({'heatmap': _heatmap_cells(*grid)})
+
 
-    # ensure date and hour columns exist
+def _parse_day(value: str) -> date:
     try:
-        data['date'] = pd.to_datetime(data['date'])
-    except Exception:
-        pass
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Date must be in YYYY-MM-DD format")
 
-    if 'hour' not in data.columns and 'time' in data.columns:
-        try:
-            data['hour'] = data['time'].astype(str).str.split(':').str[0].astype(int)
-        except Exception:
-            data['hour'] = 0
 
-    data['weekday'] = data['date'].dt.day_name()
+def _latest_day(view):
+    """The last day in daily stats or, when live sales have gone past it, the last day with sales."""
+    days = [d for d in (view.last_day(), view.last_sale_day()) if d is not None]
+    return max(days) if days else None
 
-    grp = data.groupby(['weekday', 'hour']).agg({'quantity': 'sum', 'total': 'sum'}).reset_index()
 
-    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    out = []
-    for day in days:
-        for hour in range(24):
-            row = grp[(grp['weekday'] == day) & (grp['hour'] == hour)]
-            if not row.empty:
-                qty = int(row['quantity'].iloc[0]) if pd.notna(row['quantity'].iloc[0]) else 0
-                rev = float(row['total'].iloc[0]) if pd.notna(row['total'].iloc[0]) else 0.0
-            else:
-                qty = 0
-                rev = 0.0
-            out.append({'day': day, 'hour': int(hour), 'value': qty, 'revenue': rev})
+def _period_bounds(view, period: Optional[str], start_date: Optional[str], end_date: Optional[str]):
+    """Resolve the dashboard filter (start/end dates, or a period like '7d') to a date range.
+
+    A bound the data can't supply (no daily stats or sales yet) comes back as None.
+    """
+    if start_date or end_date:
+        sd = _parse_day(start_date) if start_date else view.first_day()
+        ed = _parse_day(end_date) if end_date else _latest_day(view)
+        if sd is not None and ed is not None and sd > ed:
+            raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+        return sd, ed
+    try:
+        days = int(str(period or '7d').lower().rstrip('d'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="period must look like '7d'")
+    ed = _latest_day(view)
+    if ed is None:
+        return None, None
+    return ed - timedelta(days=max(days, 1) - 1), ed
+
+
+@app.get("/dashboard/bundle")
+@compute.offload()
+def dashboard_bundle(period: Optional[str] = '7d', start_date: Optional[str] = None,
+                     end_date: Optional[str] = None, category: Optional[str] = None, top: int = 10):
+    """Every panel of the dashboard page in one response.
+
+    Products, hourly, heatmap and payment split all aggregate the date range
+    filtered by category (the in-memory view slices the rollup for it once).
+    KPIs and the trend come from daily stats, which have no category split.
+    """
+    view = repo.view()
+    sd, ed = _period_bounds(view, period, start_date, end_date)
+    if sd is None or ed is None:
+        # no data to take the window from yet
+        return FastJSONResponse({
+            'start_date': None, 'end_date': None, 'category': category or 'all', 'kpi': _no_kpi(),
+            'top_products': [], 'revenue_trend': [], 'hourly_data': [], 'heatmap': [],
+            'payment_distribution': [], 'feedback': _feedback_summary(), 'live_version': view.version,
+        })
+
+    try:
+        kpi_resp = _kpi(view, ed, (ed - sd).days + 1)
+    except HTTPException:
+        kpi_resp = _no_kpi()
+
+    hr = view.totals('hour', sd, ed, category=category)
+    daily = view.daily(sd, ed)
+    _enrich_kpi(kpi_resp, *_peak_hour(hr), _avg_order_delta(daily))
+
+    return FastJSONResponse({
+        'start_date': sd.isoformat(),
+        'end_date': ed.isoformat(),
+        'category': category or 'all',
+        'kpi': kpi_resp,
+        'top_products': _product_rows(view.totals('item_name', sd, ed, category=category), top),
+        'revenue_trend': _trend_rows(daily),
+        'hourly_data': _hourly_rows(hr),
+        'heatmap': _heatmap_cells(*view.weekday_hour(sd, ed, category=category)),
+        'payment_distribution': _payment_rows(view.totals('payment_method', sd, ed, category=category)),
+        'feedback': _feedback_summary(),
+        'live_version': view.version,
+    })
 
-    return {'heatmap': out}
+
+@app.get("/mba/rules")
+@compute.offload()
+def mba_rules(min_support: float = Query(0.01, gt=0, le=1), min_confidence: float = Query(0.1, ge=0, le=1),
+              limit: int = Query(100, ge=1, le=1000)):
+    """Association rules between items bought together (same date, time and staff member), highest lift first."""
+    return FastJSONResponse(miner.rules(repo.version(), lambda: repo.view().basket_lines(),
+                                        min_support, min_confidence, limit))
+
+
+@app.get("/forecast")
+@compute.offload()
+def forecast(days: int = Query(7, ge=1, le=28), item: Optional[str] = None):
+    """Expected quantity per item, day and hour for the `days` after the last day of data, busiest item first."""
+    return FastJSONResponse(forecaster.forecast(repo.version(), repo.view(), days, item))
 
 
 @app.get('/feedback-summary')
+@compute.offload()
 def feedback_summary():
     """Return a simple feedback summary (positive %). Uses rating if present, otherwise basic keyword sentiment on text."""
+    return FastJSONResponse(_feedback_summary())
+
+
+def _feedback_summary():
     try:
-        fb = pd.read_csv('DATA/feedback.csv')
-    except FileNotFoundError:
-        return {'positive_pct': None, 'count': 0}
+        return _sentiment_table().summary()
     except Exception:
+        # missing or unreadable file
         return {'positive_pct': None, 'count': 0}
 
-    # If structured ratings exist
-    if 'rating' in fb.columns:
-        fb['rating'] = pd.to_numeric(fb['rating'], errors='coerce')
-        total = int(fb['rating'].count())
-        if total == 0:
-            return {'positive_pct': None, 'count': 0}
-        positive = int(fb[fb['rating'] >= 4]['rating'].count())
-        pct = round(positive / total * 100, 1)
-        return {'positive_pct': pct, 'count': total}
-
-    # Otherwise do a lightweight keyword sentiment on text column
-    text_col = None
-    for c in ['text', 'feedback', 'comment']:
-        if c in fb.columns:
-            text_col = c
-            break
-
-    if text_col is None:
-        return {'positive_pct': None, 'count': fb.shape[0]}
-
-    pos_words = ['good', 'great', 'love', 'excellent', 'amazing', 'delicious', 'nice', 'happy']
-    neg_words = ['bad', 'slow', 'terrible', 'awful', 'disappoint', 'cold', 'stale', 'angry']
-
-    def _sent(s: str):
-        s = str(s).lower()
-        if any(w in s for w in pos_words):
-            return 1
-        if any(w in s for w in neg_words):
-            return -1
-        return 0
-
-    fb['s'] = fb[text_col].apply(_sent)
-    total = int(fb.shape[0])
-    if total == 0:
-        return {'positive_pct': None, 'count': 0}
-    positive = int((fb['s'] > 0).sum())
-    pct = round(positive / total * 100, 1)
-    return {'positive_pct': pct, 'count': total}
+
+def _sentiment_table():
+    # scored once, then only appended rows are scored as the file grows
+    return side_files.get('feedback.csv', build_table, update_table)
+
+
+@app.get('/feedback/sentiment')
+@compute.offload()
+def feedback_sentiment(freq: str = Query('day', pattern='^(day|week)$'), start_date: Optional[str] = None,
+                       end_date: Optional[str] = None):
+    """Positive / neutral / negative feedback counts and shares per day or week, plus totals."""
+    try:
+        table = _sentiment_table()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="feedback.csv not found")
+    sd = _parse_day(start_date) if start_date else None
+    ed = _parse_day(end_date) if end_date else None
+    counts = table.series(freq, sd, ed)
+    total = counts.sum(axis=1)
+    shares = {f'{label}_pct': (counts[label] / total.where(total > 0) * 100).round(1) for label in LABELS}
+    return FastJSONResponse({
+        'freq': freq,
+        'basis': table.basis,
+        'totals': table.totals,
+        'series': records({'date': counts.index, **{label: counts[label] for label in LABELS}, 'total': total,
+                           **shares}),
+    })
 
 
 @app.get("/inventory")
+@compute.offload()
 def inventory():
     """Return inventory rows from DATA/inventory.csv"""
     try:
-        inv = pd.read_csv("DATA/inventory.csv")
+        body = side_files.get("inventory.csv", _inventory_payload)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="inventory.csv not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return Response(body, media_type="application/json")
 
-    # fill NaNs and convert to native python types where possible
-    inv = inv.fillna("")
-    records = inv.to_dict(orient='records')
 
-    # helper to convert numpy scalars to python native types
-    def _to_native(v):
-        try:
-            if hasattr(v, 'item'):
-                return v.item()
-        except Exception:
-            pass
-        return v
+def _inventory_payload(path: str) -> bytes:
+    """The /inventory response body, encoded once per version of the file."""
+    # fill NaNs; whole columns convert to native python types at once
+    inv = pd.read_csv(path).fillna("")
+    return dumps({"inventory": records({c: inv[c] for c in inv.columns})})
+
+
+@app.get("/inventory/projection")
+@compute.offload()
+def inventory_projection(window: int = Query(14, ge=1, le=365)):
+    """Estimated stock, daily use and days until reorder per inventory item, from sales through recipes.csv.
+
+    Daily use is the mean over the trailing `window` days of data; soonest reorder first.
+    """
+    try:
+        recipes = side_files.get("recipes.csv", load_recipes)
+        inv = side_files.get("inventory.csv", load_stock)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"{os.path.basename(e.filename or '')} not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return FastJSONResponse(project(recipes, inv, repo.view(), window))
+
+
+class SaleEvent(BaseModel):
+    """One sales.csv line; total defaults to quantity x price."""
+    date: date
+    time: str = Field(pattern=r'^([01]?\d|2[0-3]):[0-5]\d$')
+    item_name: str
+    category: str
+    quantity: int = Field(1, ge=1)
+    price: float = Field(ge=0)
+    total: Optional[float] = None
+    payment_method: str
+    staff_name: str = ''
+    store_id: Optional[str] = None
+
+
+def _require_live():
+    if not isinstance(repo, FrameRepository):
+        raise HTTPException(status_code=503, detail="live updates follow the CSV data store, not DATABASE_URL")
+
+
+@app.get("/live/stream")
+async def live_stream(request: Request):
+    """Server-sent events with increments to the dashboard panels as sales arrive (see live.py)."""
+    _require_live()
+    return StreamingResponse(hub.stream({'version': store.current().version}, request.is_disconnected),
+                             media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.post("/live/events")
+@compute.offload()
+def live_events(events: List[SaleEvent]):
+    """Append sale events to sales.csv and push them to live dashboards right away."""
+    _require_live()
+    state = store.current().files.get("sales.csv")
+    if state is None or not state.columns:
+        raise HTTPException(status_code=409, detail="sales.csv has no header to append to")
+    rows = []
+    for e in events:
+        row = e.model_dump()
+        row['date'] = e.date.isoformat()
+        row['total'] = round(e.quantity * e.price, 2) if e.total is None else e.total
+        rows.append(row)
+    n = append_sales(store.path("sales.csv"), state.columns, rows)
+    store.refresh()
+    return {'accepted': n, 'version': store.current().version}
 
-    cleaned = [{k: _to_native(v) for k, v in row.items()} for row in records]
-    return {"inventory": cleaned}
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,251 @@
+"""Market-basket analysis: frequent itemsets and association rules.
+
+A basket is every sales line sharing (date, time, staff_name). Each item gets
+a bitset over the baskets, so the support of an itemset is the popcount of
+the AND of its items' bitsets. Itemsets are mined depth-first (Eclat): a
+prefix is extended by AND-ing its bitset with all remaining candidates at
+once, and only the extensions that stay frequent are explored further.
+
+Mining runs once per data version, at a support floor (MBA_MIN_SUPPORT,
+default 0.001, or lower if a request asks for less). Every rule that can be
+formed from the frequent itemsets is laid out in arrays along with its
+itemset / antecedent / consequent counts. Any subset of a frequent itemset
+is frequent too, so a request for higher thresholds is a mask over those
+arrays; moving a slider never re-mines. Results are also cached per
+(min_support, min_confidence).
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from metrics import stage
+
+
+@dataclass(frozen=True)
+class Baskets:
+    count: int
+    items: List[str]          # item id -> name
+    categories: List[str]     # item id -> category
+    bits: np.ndarray          # (items, words) uint64; bit b of row i: basket b contains item i
+
+
+def _ids(values, known: Dict[str, int]) -> np.ndarray:
+    """Ids for `values` that stay the same across chunks (first seen, first numbered); missing -> -1."""
+    cat = pd.Categorical(values)
+    lookup = np.array([known.setdefault(str(c), len(known)) for c in cat.categories] + [-1], dtype=np.int64)
+    return lookup[cat.codes]
+
+
+def encode_baskets(lines) -> Baskets:
+    """Group sales lines into basket bitsets.
+
+    `lines` is a frame, or an iterable of frames (chunks), with date (index or
+    column), time, staff_name, item_name and category. Chunks are reduced to
+    two integers per line, basket key and item id, as they arrive.
+    """
+    if isinstance(lines, pd.DataFrame):
+        lines = [lines]
+    times, staff, items = {}, {}, {}
+    categories: Dict[int, str] = {}
+    keys, item_ids = [], []
+    for chunk in lines:
+        if chunk.empty:
+            continue
+        dates = chunk["date"] if "date" in chunk.columns else chunk.index
+        days = np.asarray(dates, dtype="datetime64[D]").astype("int64")
+        # one integer per (date, time, staff) triple; the +1 keeps missing values (-1) apart
+        key = (days * (1 << 20) + _ids(chunk["time"], times) + 1) * (1 << 20) + _ids(chunk["staff_name"], staff) + 1
+        item = _ids(chunk["item_name"], items)
+        ok = item >= 0
+        keys.append(key[ok])
+        item_ids.append(item[ok].astype(np.int32))
+
+        # the category of each item's first line (reversed scatter: the earliest write wins)
+        rows = np.flatnonzero(ok)
+        first = np.full(len(items), -1, dtype=np.int64)
+        first[item[ok][::-1]] = rows[::-1]
+        new = [i for i in np.flatnonzero(first >= 0) if i not in categories]
+        if new:
+            for i, c in zip(new, chunk["category"].iloc[first[new]].tolist()):
+                categories[int(i)] = c
+
+    if not keys:
+        return Baskets(0, [], [], np.zeros((0, 0), dtype=np.uint64))
+    basket, _ = pd.factorize(np.concatenate(keys))
+    codes = np.concatenate(item_ids).astype(np.int64)
+    count = int(basket.max()) + 1 if len(basket) else 0
+    bits = np.zeros((len(items), (count + 63) // 64), dtype=np.uint64)
+    np.bitwise_or.at(bits, (codes, basket >> 6), np.left_shift(np.uint64(1), (basket & 63).astype(np.uint64)))
+    return Baskets(count, list(items), [categories.get(i) for i in range(len(items))], bits)
+
+
+def _support(bits: np.ndarray) -> np.ndarray:
+    return np.bitwise_count(bits).sum(axis=-1, dtype=np.int64)
+
+
+def mine_itemsets(baskets: Baskets, min_count: int, max_len: int = 4) -> Dict[Tuple[int, ...], int]:
+    """{sorted item ids: basket count} for every itemset in at least `min_count` baskets."""
+    counts = _support(baskets.bits)
+    # least frequent first keeps the candidate lists of deep prefixes short
+    order = [int(i) for i in np.argsort(counts, kind="stable") if counts[i] >= max(min_count, 1)]
+    found = {(i,): int(counts[i]) for i in order}
+
+    def extend(prefix, prefix_bits, candidates):
+        if not candidates:
+            return
+        joined = prefix_bits & baskets.bits[candidates]
+        support = _support(joined)
+        keep = [k for k in range(len(candidates)) if support[k] >= min_count]
+        for n, k in enumerate(keep):
+            itemset = prefix + (candidates[k],)
+            found[tuple(sorted(itemset))] = int(support[k])
+            if len(itemset) < max_len:
+                extend(itemset, joined[k], [candidates[m] for m in keep[n + 1:]])
+
+    if max_len > 1:
+        for n, i in enumerate(order):
+            extend((i,), baskets.bits[i], order[n + 1:])
+    return found
+
+
+@dataclass(frozen=True)
+class RuleTable:
+    """Every rule A -> C with A u C frequent at the mining floor."""
+    antecedents: List[Tuple[int, ...]]
+    consequents: List[Tuple[int, ...]]
+    both: np.ndarray           # baskets containing A u C
+    antecedent: np.ndarray     # baskets containing A
+    consequent: np.ndarray     # baskets containing C
+
+
+def rule_table(itemsets: Dict[Tuple[int, ...], int]) -> RuleTable:
+    ante, cons, both, a_count, c_count = [], [], [], [], []
+    for items, count in itemsets.items():
+        for r in range(1, len(items)):
+            for a in combinations(items, r):
+                c = tuple(i for i in items if i not in a)
+                ante.append(a)
+                cons.append(c)
+                both.append(count)
+                a_count.append(itemsets[a])
+                c_count.append(itemsets[c])
+    as_int = lambda v: np.asarray(v, dtype=np.int64)
+    return RuleTable(ante, cons, as_int(both), as_int(a_count), as_int(c_count))
+
+
+@dataclass(frozen=True)
+class _Mined:
+    tag: str
+    floor: float
+    baskets: Baskets
+    itemsets: Dict[Tuple[int, ...], int]
+    rules: RuleTable
+
+
+class BasketMiner:
+    """Mines once per data version and answers rule queries from the cached result."""
+
+    def __init__(self, floor: float = 0.001, max_len: int = 4, cache_size: int = 64):
+        self.floor = floor
+        self.max_len = max_len
+        self.cache_size = cache_size
+        self._mined = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "BasketMiner":
+        return cls(float(os.environ.get("MBA_MIN_SUPPORT", "0.001")), int(os.environ.get("MBA_MAX_ITEMS", "4")))
+
+    def _mine(self, tag: str, min_support: float, load_lines: Callable[[], pd.DataFrame]) -> _Mined:
+        mined = self._mined
+        if mined is not None and mined.tag == tag and mined.floor <= min_support:
+            return mined
+        with self._lock:
+            mined = self._mined
+            if mined is None or mined.tag != tag or mined.floor > min_support:
+                if mined is not None and mined.tag == tag:
+                    baskets = mined.baskets
+                else:
+                    # streamed lines are read while they are encoded
+                    with stage("load"):
+                        baskets = encode_baskets(load_lines())
+                floor = min(self.floor, min_support)
+                with stage("aggregate"):
+                    itemsets = mine_itemsets(baskets, _min_count(floor, baskets.count), self.max_len)
+                    mined = _Mined(tag, floor, baskets, itemsets, rule_table(itemsets))
+                self._mined = mined
+                self._cache.clear()
+        return mined
+
+    def rules(self, tag: str, load_lines: Callable[[], pd.DataFrame], min_support: float,
+              min_confidence: float, limit: int = 100) -> dict:
+        """Rules with support >= min_support and confidence >= min_confidence, highest lift first.
+
+        `tag` identifies the data version; `load_lines` is only called when it changes.
+        """
+        mined = self._mine(tag, min_support, load_lines)
+        key = (tag, round(min_support, 6), round(min_confidence, 6))
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+        if hit is None:
+            with stage("filter"):
+                hit = _select(mined, min_support, min_confidence)
+            with self._lock:
+                self._cache[key] = hit
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        payload, picked, metrics = hit
+        with stage("serialize"):
+            return {**payload, "rules": _rule_rows(mined, picked[:limit], *metrics)}
+
+
+def _select(mined: _Mined, min_support: float, min_confidence: float):
+    """Summary, rule positions ordered by lift then confidence, and per-rule metric arrays."""
+    t, n = mined.rules, mined.baskets.count
+    min_count = _min_count(min_support, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        support = t.both / n
+        confidence = t.both / t.antecedent
+        lift = confidence / (t.consequent / n)
+        conviction = (1 - t.consequent / n) / (1 - confidence)
+    picked = np.flatnonzero((t.both >= min_count) & (confidence >= min_confidence))
+    picked = picked[np.lexsort((-confidence[picked], -lift[picked]))]
+    b = mined.baskets
+    items = [{"item": b.items[i[0]], "category": b.categories[i[0]], "support": round(c / n, 6)}
+             for i, c in mined.itemsets.items() if len(i) == 1 and c >= min_count]
+    payload = {
+        "baskets": n,
+        "min_support": min_support,
+        "min_confidence": min_confidence,
+        "frequent_itemsets": sum(c >= min_count for c in mined.itemsets.values()),
+        "rule_count": len(picked),
+        "items": sorted(items, key=lambda r: -r["support"]),
+    }
+    return payload, picked, (support, confidence, lift, conviction)
+
+
+def _rule_rows(mined: _Mined, picked, support, confidence, lift, conviction) -> list:
+    t, names = mined.rules, mined.baskets.items
+    return [{
+        "antecedents": [names[i] for i in t.antecedents[r]],
+        "consequents": [names[i] for i in t.consequents[r]],
+        "support": round(float(support[r]), 6),
+        "confidence": round(float(confidence[r]), 6),
+        "lift": round(float(lift[r]), 6),
+        # a rule that always holds has infinite conviction
+        "conviction": round(float(conviction[r]), 6) if confidence[r] < 1 else None,
+    } for r in picked]
+
+
+def _min_count(support: float, n: int) -> int:
+    """Smallest basket count that reaches `support` (at least one basket)."""
+    return max(1, int(np.ceil(support * n - 1e-9)))
@@ -0,0 +1,282 @@
+"""Request and stage timings in Prometheus text format, plus an opt-in per-request profiler.
+
+`MetricsMiddleware` times every request by route and keeps the stage timings
+of the request in a context variable. Code on the request's path marks its
+stages with `stage(name)`:
+
+    load       reading CSVs / building snapshots
+    filter     slicing and filtering by date and dimension
+    aggregate  group-bys and other reductions (SQL queries included)
+    serialize  building the payload and encoding the JSON
+
+A request's time per stage is summed and observed once per request, and the
+same numbers go out in a Server-Timing header, so browser devtools show them
+too. Stages hit outside a request (background reloads) are observed under the
+endpoint "background". GET /metrics renders everything for Prometheus.
+
+With PROFILING_ENABLED=1, a request carrying `X-Profile: 1` runs under a
+sampling profiler: a thread reads the stacks of the threads working on that
+request every PROFILE_INTERVAL_MS (default 1) and the response body is
+replaced by the samples in folded-stack format (`frame;frame;frame count`),
+which flamegraph.pl, inferno and speedscope read directly. Such requests
+bypass the response cache, so the profile is of the real work.
+"""
+import bisect
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# stage name -> seconds, for the request being handled; None outside requests
+_stages: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("bipa_stages", default=None)
+_endpoint: contextvars.ContextVar[str] = contextvars.ContextVar("bipa_endpoint", default="background")
+_profile: contextvars.ContextVar[Optional["Sampler"]] = contextvars.ContextVar("bipa_profile", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, safe to observe from any thread."""
+
+    def __init__(self, name: str, doc: str, labels: Tuple[str, ...], buckets=BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}   # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((k, list(v)) for k, v in self._series.items())
+        for label_values, counts in series:
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            total = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                total += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {total}')
+            lines.append(f"{self.name}_sum{{{labels}}} {counts[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {total}")
+        return lines
+
+
+# a collector returns (name, type, help, [({label: value}, number), ...]) per metric
+Collector = Callable[[], Iterable[Tuple[str, str, str, list]]]
+
+
+class Registry:
+    def __init__(self):
+        self.histograms: List[Histogram] = []
+        self.collectors: List[Collector] = []
+
+    def histogram(self, name: str, doc: str, labels: Tuple[str, ...]) -> Histogram:
+        h = Histogram(name, doc, labels)
+        self.histograms.append(h)
+        return h
+
+    def render(self) -> str:
+        lines = []
+        for h in self.histograms:
+            lines += h.render()
+        for collect in self.collectors:
+            for name, kind, doc, samples in collect():
+                lines += [f"# HELP {name} {doc}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{text}}} {value}" if text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
+REQUESTS = registry.histogram("bipa_request_duration_seconds", "Time from request to the last body byte.",
+                              ("method", "endpoint", "status"))
+STAGES = registry.histogram("bipa_stage_duration_seconds", "Time per request spent in each stage.",
+                            ("endpoint", "stage"))
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as stage `name` of the current request."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        stages = _stages.get()
+        if stages is None:
+            STAGES.observe(elapsed, _endpoint.get(), name)
+        else:
+            stages[name] = stages.get(name, 0.0) + elapsed
+
+
+def in_request_context(fn, *args, **kwargs):
+    """Call fn on this (worker) thread as part of the request whose context is current.
+
+    Pair with contextvars.copy_context().run so stages land in that request;
+    a profiled request's sampler also follows the work to this thread.
+    """
+    sampler = _profile.get()
+    if sampler is None:
+        return fn(*args, **kwargs)
+    ident = threading.get_ident()
+    sampler.threads.add(ident)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        sampler.threads.discard(ident)
+
+
+# -- profiling -------------------------------------------------------------
+
+class Sampler:
+    """Samples the stacks of `threads` every `interval` seconds into folded-stack counts."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.threads = set()
+        self.loop = None   # the event loop thread: only sampled while it runs request code
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        self._thread.join()
+        return "".join(f"{stack} {n}\n" for stack, n in self.samples.most_common())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in list(self.threads) + [self.loop]:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = _fold(frame)
+                # an idle loop is in select(); awaiting coroutines have no frames on the stack
+                if ident != self.loop or _MIDDLEWARE in stack:
+                    self.samples[stack] += 1
+
+
+def _fold(frame) -> str:
+    """'outermost;...;innermost' frame names of a stack."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _wants_profile(scope) -> bool:
+    for k, v in scope.get("headers", []):
+        if k == b"x-profile":
+            return v.strip().lower() not in (b"", b"0", b"false")
+    return False
+
+
+# -- middleware ------------------------------------------------------------
+
+_MIDDLEWARE = f"__call__ ({os.path.basename(__file__)}:"
+
+
+class MetricsMiddleware:
+    """Time requests by route, collect their stage timings and serve profiles on request."""
+
+    def __init__(self, app, routes: Callable[[], Iterable[str]], profiling: bool = False,
+                 profile_interval: float = 0.001):
+        self.app = app
+        self.routes = routes
+        self.profiling = profiling
+        self.profile_interval = profile_interval
+        self._known = None
+
+    def _endpoint(self, path: str) -> str:
+        # route paths only, so unknown URLs can't blow up the label set
+        if self._known is None:
+            self._known = set(self.routes())
+        return path if path in self._known else "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self._endpoint(scope["path"])
+        stages: Dict[str, float] = {}
+        tokens = [(_stages, _stages.set(stages)), (_endpoint, _endpoint.set(endpoint))]
+        sampler = None
+        if self.profiling and _wants_profile(scope):
+            sampler = Sampler(self.profile_interval)
+            sampler.loop = threading.get_ident()
+            tokens.append((_profile, _profile.set(sampler)))
+            scope["bipa.no_cache"] = True
+            sampler.start()
+
+        status = 500
+        held: list = []
+        t0 = time.perf_counter()
+
+        async def timed_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = ", ".join(f"{name};dur={secs * 1000:.2f}" for name, secs in stages.items())
+                if timing:
+                    # a new message: the response cache may hold on to the original one
+                    headers = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+                    message = {**message, "headers": headers}
+            if sampler is not None:
+                held.append(message)   # the profile replaces the body
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            elapsed = time.perf_counter() - t0
+            for var, token in reversed(tokens):
+                var.reset(token)
+            REQUESTS.observe(elapsed, scope["method"], endpoint, str(status))
+            for name, secs in stages.items():
+                STAGES.observe(secs, endpoint, name)
+
+        if sampler is not None:
+            await _send_profile(send, sampler, held, elapsed)
+
+
+async def _send_profile(send, sampler: Sampler, held: list, elapsed: float):
+    folded = sampler.stop().encode()
+    start = next((m for m in held if m["type"] == "http.response.start"), {"status": 500, "headers": []})
+    keep = [(k, v) for k, v in start.get("headers", []) if k.lower() in (b"server-timing",)]
+    headers = keep + [
+        (b"content-type", b"text/plain; charset=utf-8"),
+        (b"content-length", str(len(folded)).encode()),
+        (b"x-profile-samples", str(sum(sampler.samples.values())).encode()),
+        (b"x-profile-interval-ms", f"{sampler.interval * 1000:g}".encode()),
+        (b"x-profile-elapsed-ms", f"{elapsed * 1000:.2f}".encode()),
+    ]
+    await send({"type": "http.response.start", "status": start["status"], "headers": headers})
+    await send({"type": "http.response.body", "body": folded})
@@ -0,0 +1,255 @@
+"""Sales kept on disk in month (x store) partitions, opened only for the dates a query covers.
+
+Layout under DATA/.partitions/:
+
+    manifest.json                       sales.csv state the partitions were built from,
+                                        plus one entry per partition
+    month=2024-01/g3.rollup.feather     the partition's rollup cube (what the endpoints aggregate)
+    month=2024-01/g3.sales.feather      its typed sales rows (basket mining reads these)
+    store=S01/month=2024-01/...         the same, per store, when sales.csv has a store_id column
+
+Every manifest entry records the partition's min and max date, store and row
+count. A query compares its date range against those bounds and
+memory-maps just the partitions that overlap, so a one-week question reads
+one or two months per store however long the history is.
+
+Files are written through colcache (Arrow IPC, so pyarrow is required) under
+a generation number that grows with every write. A rewritten partition gets
+new files, and a snapshot still holding the previous manifest keeps reading
+the old ones; files that neither the new nor the previous manifest uses are
+deleted. Appended rows only rewrite the partitions they fall in.
+
+One-time build from BACKEND/:  python partitions.py [DATA]
+"""
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import colcache
+from metrics import stage
+from rollup import ROLLUP_KEYS, ROLLUP_MEASURES, build_rollup, empty_rollup, merge_rollups, slice_dates
+from schema import concat_sales
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+OPEN_PARTITIONS = 256   # rollup cubes kept open per partition set
+
+
+@dataclass(frozen=True)
+class Partition:
+    key: str                 # directory under the root, e.g. "store=S01/month=2024-01"
+    store: Optional[str]
+    month: str
+    min_date: str
+    max_date: str
+    rows: int
+    generation: int          # files are g<generation>.{rollup,sales}.feather
+
+    @property
+    def source(self) -> str:
+        return f"g{self.generation}.csv"
+
+
+def _key(store, month: str) -> str:
+    return f"month={month}" if store is None else f"store={store}/month={month}"
+
+
+def _concat_cubes(pieces: List[pd.DataFrame]) -> pd.DataFrame:
+    """Stack rollup cubes column by column; categoricals get the sorted union of their categories."""
+    columns = {}
+    for c in ROLLUP_KEYS + ROLLUP_MEASURES:
+        values = [p[c] for p in pieces]
+        if all(isinstance(v.dtype, pd.CategoricalDtype) for v in values):
+            columns[c] = union_categoricals([v.array for v in values], sort_categories=True)
+        else:
+            columns[c] = np.concatenate([v.to_numpy() for v in values])
+    return pd.DataFrame(columns)
+
+
+def _read(root: str, p: Partition, part: str) -> pd.DataFrame:
+    cached = colcache.read(os.path.join(root, p.key), p.source, [part])
+    if cached is None:
+        raise FileNotFoundError(f"partition {p.key} generation {p.generation} is missing")
+    return cached[0][part]
+
+
+class PartitionSet:
+    """One manifest's worth of partitions: pruning by date / store and reading them back."""
+
+    def __init__(self, root: str, partitions: Iterable[Partition], source: dict, generation: int = 0):
+        self.root = root
+        self.partitions: List[Partition] = sorted(partitions, key=lambda p: (p.min_date, p.key))
+        self.source = source          # the FileState meta of sales.csv these were built from
+        self.generation = generation
+        self._min = np.array([p.min_date for p in self.partitions], dtype="datetime64[D]")
+        self._max = np.array([p.max_date for p in self.partitions], dtype="datetime64[D]")
+        self._open: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self) -> int:
+        return sum(p.rows for p in self.partitions)
+
+    def last_day(self):
+        """The latest date with rows in any partition, or None."""
+        return self._max.max().item() if len(self._max) else None
+
+    def select(self, start=None, end=None) -> List[Partition]:
+        """Partitions with rows dated in [start, end] (either bound optional)."""
+        keep = np.ones(len(self.partitions), dtype=bool)
+        if start is not None:
+            keep &= self._max >= np.datetime64(pd.Timestamp(start).date(), "D")
+        if end is not None:
+            keep &= self._min <= np.datetime64(pd.Timestamp(end).date(), "D")
+        return [p for p, k in zip(self.partitions, keep) if k]
+
+    def _rollup_of(self, p: Partition) -> pd.DataFrame:
+        with self._lock:
+            cube = self._open.get(p.key)
+            if cube is not None:
+                self._open.move_to_end(p.key)
+                return cube
+        cube = _read(self.root, p, "rollup")
+        with self._lock:
+            self._open[p.key] = cube
+            while len(self._open) > OPEN_PARTITIONS:
+                self._open.popitem(last=False)
+        return cube
+
+    def rollup(self, start=None, end=None) -> pd.DataFrame:
+        """The rollup cube rows dated in [start, end], read from the overlapping partitions only."""
+        first = "" if start is None else str(pd.Timestamp(start).date())
+        last = "9999" if end is None else str(pd.Timestamp(end).date())
+        with stage("load"):
+            pieces = []
+            for p in self.select(start, end):
+                cube = self._rollup_of(p)
+                # only the partitions at either end of the range are cut
+                if p.min_date < first or p.max_date > last:
+                    cube = slice_dates(cube, start, end)
+                pieces.append(cube)
+            if not pieces:
+                return empty_rollup()
+            if len(pieces) == 1:
+                return pieces[0]
+            return _concat_cubes(pieces)
+
+    def iter_sales(self, columns, start=None, end=None):
+        """Yield the typed sales rows of each overlapping partition, date-indexed, limited to `columns`."""
+        for p in self.select(start, end):
+            rows = _read(self.root, p, "sales")
+            yield slice_dates(rows, start, end)[[c for c in columns if c in rows.columns]]
+
+
+def load(root: str) -> Optional[PartitionSet]:
+    """The partition set described by root/manifest.json, or None if there is none."""
+    try:
+        with open(os.path.join(root, MANIFEST)) as f:
+            manifest = json.load(f)
+        return PartitionSet(root, [Partition(**p) for p in manifest["partitions"]], manifest["source"],
+                            manifest["generation"])
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("ignoring unreadable partition manifest in %s", root, exc_info=True)
+        return None
+
+
+class PartitionWriter:
+    """Splits typed sales frames into partitions and writes them under a new generation.
+
+    With `base`, the rows are appended to that set: untouched partitions carry
+    over, touched ones are merged and rewritten. Without it, the result holds
+    only what was added. `previous` is the manifest currently on disk (for
+    numbering and clean-up); it defaults to `base`.
+    """
+
+    def __init__(self, root: str, base: Optional[PartitionSet] = None, previous: Optional[PartitionSet] = None):
+        self.root = root
+        self.base = base
+        self.previous = previous or base
+        self.generation = (self.previous.generation if self.previous else 0) + 1
+        self._written: Dict[str, Partition] = {} if base is None else {p.key: p for p in base.partitions}
+        self._pending: Dict[tuple, list] = {}
+
+    def add(self, sales: pd.DataFrame):
+        """Buffer rows by partition; months that the input has moved past are written out."""
+        if sales.empty:
+            return
+        months = sales.index.to_numpy().astype("datetime64[M]")
+        positions = pd.Series(np.arange(len(sales)))
+        if "store_id" in sales.columns:
+            groups = positions.groupby([sales["store_id"].astype(str).to_numpy(), months], sort=False).indices
+        else:
+            groups = {(None, m): idx for m, idx in positions.groupby(months, sort=False).indices.items()}
+        for (store, month), idx in groups.items():
+            self._pending.setdefault((store, str(np.datetime64(month, "M"))), []).append(sales.iloc[idx])
+        # sales.csv is (nearly always) in date order, so earlier months are complete
+        first = str(months.min())
+        for store, month in [k for k in self._pending if k[1] < first]:
+            self._flush(store, month)
+
+    def _flush(self, store, month: str):
+        frames = self._pending.pop((store, month))
+        key = _key(store, month)
+        rows = concat_sales(frames) if len(frames) > 1 else frames[0]
+        cube = build_rollup(rows)
+        old = self._written.get(key)
+        if old is not None:
+            # the partition exists already (an append, or out-of-order input): merge into it
+            rows = concat_sales([_read(self.root, old, "sales"), rows])
+            cube = merge_rollups(_read(self.root, old, "rollup"), cube)
+        if not rows.index.is_monotonic_increasing:
+            rows = rows.sort_index(kind="stable")
+        p = Partition(key, store, month, str(rows.index[0].date()), str(rows.index[-1].date()), len(rows),
+                      self.generation)
+        if not colcache.write(os.path.join(self.root, key), p.source, {"sales": rows, "rollup": cube},
+                              {"partition": key}):
+            raise OSError(f"could not write partition {key}")
+        self._written[key] = p
+
+    def close(self, source: dict) -> PartitionSet:
+        """Write what is still buffered and the manifest; returns the new set."""
+        for store, month in list(self._pending):
+            self._flush(store, month)
+        parts = PartitionSet(self.root, self._written.values(), source, self.generation)
+        manifest = {"generation": self.generation, "source": source,
+                    "partitions": [vars(p) for p in parts.partitions]}
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, MANIFEST + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(self.root, MANIFEST))
+        self._remove_unused(parts)
+        return parts
+
+    def _remove_unused(self, parts: PartitionSet):
+        keep = set()
+        for s in filter(None, [parts, self.previous]):
+            keep.update(os.path.join(p.key, f"g{p.generation}.") for p in s.partitions)
+        for dirpath, _, names in os.walk(self.root, topdown=False):
+            rel = os.path.relpath(dirpath, self.root)
+            for name in names:
+                if name.endswith(".feather") and not any(os.path.join(rel, name).startswith(k) for k in keep):
+                    os.remove(os.path.join(dirpath, name))
+            if dirpath != self.root and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+
+
+if __name__ == "__main__":
+    import sys
+    from datastore import DataStore
+
+    logging.basicConfig(level=logging.INFO)
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "DATA"
+    parts = DataStore(data_dir, partitioned=True).current().partitions
+    print(f"{len(parts.partitions):,} partitions, {parts.rows:,} sales rows under {parts.root}")
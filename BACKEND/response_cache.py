@@ -0,0 +1,129 @@
+"""Server-side response cache with ETag / 304 support for the GET analytics endpoints.
+
+Responses are keyed on path + normalised query string + the data snapshot
+tag, so they stay valid until the CSVs change and need no explicit
+invalidation. The ETag is derived from the same key, so a client revalidating
+with If-None-Match gets a 304 without the endpoint running or any JSON being
+encoded, even when the entry has already been evicted.
+
+Implemented as plain ASGI middleware so a hit never reaches the router or
+the threadpool. Middleware further out can set scope["bipa.no_cache"] to send
+a request straight through (profiled requests do).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+CACHE_CONTROL = b"private, no-cache"
+
+
+class ResponseCache:
+    """Bounded LRU of encoded responses with a TTL."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, int, list, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.not_modified = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, status: int, headers: list, body: bytes):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), status, headers, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def cache_key(path: str, query_string: bytes, version: str) -> str:
+    params = sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+    return f"{path}?{urlencode(params)}#{version}"
+
+
+def etag_for(key: str) -> bytes:
+    return b'"' + hashlib.sha1(key.encode()).hexdigest()[:20].encode() + b'"'
+
+
+class ResponseCacheMiddleware:
+    """Serve cached GET responses for `paths` and answer conditional requests with 304."""
+
+    def __init__(self, app, cache: ResponseCache, version: Callable[[], str], paths: Iterable[str]):
+        self.app = app
+        self.cache = cache
+        self.version = version
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in self.paths
+                or scope.get("bipa.no_cache")):
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope["path"], scope.get("query_string", b""), self.version())
+        etag = etag_for(key)
+        if etag in _if_none_match(scope):
+            self.cache.not_modified += 1
+            await _send(send, 304, [(b"etag", etag), (b"cache-control", CACHE_CONTROL)], b"")
+            return
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.cache.hits += 1
+            _, status, headers, body = entry
+            await _send(send, status, headers, body)
+            return
+
+        self.cache.misses += 1
+        start: Optional[dict] = None
+        chunks = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                if start["status"] == 200:
+                    start["headers"] = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"etag"] + [
+                        (b"etag", etag), (b"cache-control", CACHE_CONTROL)]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False) and start is not None and start["status"] == 200:
+                    self.cache.put(key, 200, list(start["headers"]), b"".join(chunks))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+
+def _if_none_match(scope) -> set:
+    for k, v in scope.get("headers", []):
+        if k == b"if-none-match":
+            return {t.strip() for t in v.split(b",")}
+    return set()
+
+
+async def _send(send, status: int, headers: list, body: bytes):
+    if status != 304:
+        headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+        headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
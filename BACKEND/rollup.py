@@ -0,0 +1,132 @@
+"""Pre-aggregated sales rollup used by the analytics endpoints.
+
+The raw sales file has one row per line item. Every analytics endpoint only
+ever needs sums of quantity / total grouped by some subset of
+date, hour, item, category and payment method, so we collapse the raw rows
+into that cube once and answer requests from it.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from schema import unify_categories
+from timeindex import date_window, window_bounds
+
+ROLLUP_KEYS = ["date", "hour", "item_name", "category", "payment_method"]
+ROLLUP_MEASURES = ["quantity", "total"]
+CATEGORICAL_KEYS = ["item_name", "category", "payment_method"]
+
+
+def empty_rollup() -> pd.DataFrame:
+    """Return an empty cube with the expected columns."""
+    return pd.DataFrame(columns=ROLLUP_KEYS + ROLLUP_MEASURES)
+
+
+def build_rollup(sales: pd.DataFrame) -> pd.DataFrame:
+    """Collapse raw sales rows into date x hour x item x category x payment totals."""
+    if sales is None or sales.empty:
+        return empty_rollup()
+
+    # "date" may be the (sorted) index rather than a column
+    by = []
+    for k in ROLLUP_KEYS:
+        if k in sales.columns:
+            by.append(pd.Series(sales[k].array, name=k))
+        elif k in sales.index.names:
+            by.append(pd.Series(sales.index.get_level_values(k).array, name=k))
+    # sales are stored narrow (uint16 / float32); sum in int64 / float64, rounded to cents
+    measures = pd.DataFrame({
+        "quantity": np.asarray(sales["quantity"], dtype="int64"),
+        "total": np.round(np.asarray(sales["total"], dtype="float64"), 2),
+    })
+    cube = measures.groupby(by, sort=True, dropna=False, observed=True).sum().reset_index()
+    # keep any key the source didn't have so callers can rely on the schema
+    for k in ROLLUP_KEYS:
+        if k not in cube.columns:
+            cube[k] = None
+    # string dimensions as categoricals: smaller, and groupby works on the integer codes
+    for k in CATEGORICAL_KEYS:
+        if cube[k].dtype == object:
+            cube[k] = cube[k].astype("category")
+    return cube[ROLLUP_KEYS + ROLLUP_MEASURES]
+
+
+def merge_rollups(cube: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """Fold the cube of newly arrived rows into an existing cube.
+
+    Only cube rows on or after the first date in `delta` are re-aggregated, so
+    appending today's sales costs a day's worth of cells, not the whole cube.
+    """
+    if delta.empty:
+        return cube
+    if cube.empty:
+        return delta
+    i, _ = window_bounds(cube["date"], delta["date"].min(), None)
+    head, recent, delta = unify_categories([cube.iloc[:i], cube.iloc[i:], delta], CATEGORICAL_KEYS)
+    recent = (
+        pd.concat([recent, delta], ignore_index=True)
+        .groupby(ROLLUP_KEYS, sort=True, dropna=False, observed=True)[ROLLUP_MEASURES]
+        .sum()
+        .reset_index()
+    )
+    return pd.concat([head, recent[ROLLUP_KEYS + ROLLUP_MEASURES]], ignore_index=True)
+
+
+def slice_dates(cube: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """Return the cube rows whose date falls in [start, end] (either bound optional).
+
+    The cube is sorted by date (its leading key), so this is a binary search.
+    """
+    return date_window(cube, start, end)
+
+
+def totals_by(cube: pd.DataFrame, key: str, sort_by: Optional[str] = None, ascending: bool = False) -> pd.DataFrame:
+    """Sum quantity/total over a single cube dimension."""
+    out = cube.groupby(key, observed=True)[ROLLUP_MEASURES].sum().reset_index()
+    if sort_by is not None:
+        out = out.sort_values(sort_by, ascending=ascending)
+    return out
+
+
+def filter_cube(cube: pd.DataFrame, **filters) -> pd.DataFrame:
+    """Keep cube rows matching the given dimension values, e.g. category="coffee".
+
+    Matching is case-insensitive; None, "" and "all" mean no filter. The
+    comparison runs on categorical codes, so each filter is one integer pass.
+    """
+    mask = None
+    for key, value in filters.items():
+        if value is None or str(value).strip().lower() in ("", "all"):
+            continue
+        col = cube[key]
+        wanted = str(value).strip().lower()
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            codes = [i for i, c in enumerate(col.cat.categories) if str(c).lower() == wanted]
+            m = np.isin(col.cat.codes.to_numpy(), codes)
+        else:
+            m = col.astype(str).str.lower().to_numpy() == wanted
+        mask = m if mask is None else mask & m
+    return cube if mask is None else cube.loc[mask]
+
+
+def category_by_day(cube: pd.DataFrame) -> pd.DataFrame:
+    """Sales total per day (rows, sorted) and category (one column each, as strings)."""
+    if cube.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="date"))
+    by_day = cube.groupby(["date", "category"], observed=True)["total"].sum().unstack(fill_value=0.0)
+    by_day.columns = [str(c) for c in by_day.columns]
+    by_day.index = pd.DatetimeIndex(by_day.index, name="date")
+    return by_day
+
+
+def weekday_hour_grid(cube: pd.DataFrame):
+    """Dense 7 x 24 (Monday first) quantity and revenue arrays for the cube rows."""
+    hours = pd.to_numeric(cube["hour"], errors="coerce").to_numpy(dtype="float64")
+    ok = (hours >= 0) & (hours < 24)   # also drops NaN
+    # 1970-01-01 was a Thursday, so Monday == 0 is (days since epoch + 3) % 7
+    days = cube["date"].to_numpy().astype("datetime64[D]").astype("int64")[ok]
+    cell = ((days + 3) % 7) * 24 + hours[ok].astype("int64")
+    qty = np.bincount(cell, weights=cube["quantity"].to_numpy(dtype="float64")[ok], minlength=168)
+    rev = np.bincount(cell, weights=cube["total"].to_numpy(dtype="float64")[ok], minlength=168)
+    return qty.reshape(7, 24), rev.reshape(7, 24)
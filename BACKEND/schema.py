@@ -0,0 +1,95 @@
+"""Typed in-memory schema for sales rows.
+
+    column          dtype
+    date (index)    datetime64[ns]
+    time            category (<= 1440 values, int16 codes)
+    item_name       category
+    category        category
+    payment_method  category
+    staff_name      category
+    store_id        category (multi-store datasets only)
+    quantity        uint16
+    price, total    float32
+    hour            int8
+
+pandas can't hold datetime64[D] (the coarsest unit it keeps is seconds, and
+every unit is 8 bytes anyway), so the date index stays datetime64[ns], which
+is what the searchsorted lookups in timeindex compare against.
+
+float32 keeps cents exact up to 99,999.99 per line. Aggregations must not sum
+in float32, though: rollup.build_rollup widens quantity/total before summing.
+
+Frames that are appended to one another must share categories, otherwise
+pandas silently falls back to object columns; `concat_sales` takes care of
+that.
+"""
+import numpy as np
+import pandas as pd
+
+SALES_CATEGORICALS = ["time", "item_name", "category", "payment_method", "staff_name", "store_id"]
+SALES_FLOATS = ["price", "total"]
+
+
+def parse_hour(time: pd.Series) -> pd.Series:
+    """'HH:MM' strings -> int8 hour. Categorical input only parses each distinct time once."""
+    if isinstance(time.dtype, pd.CategoricalDtype):
+        hours = parse_hour(pd.Series(time.cat.categories)).to_numpy()
+        codes = time.cat.codes.to_numpy()
+        if (codes < 0).any():
+            raise ValueError("missing time values")
+        return pd.Series(hours[codes], index=time.index, dtype="int8")
+    return time.astype(str).str.split(":").str[0].astype("int8")
+
+
+def _narrow_quantity(values: pd.Series) -> pd.Series:
+    q = pd.to_numeric(values, errors="coerce").fillna(0)
+    if len(q) and (q.min() < 0 or q.max() > np.iinfo(np.uint16).max):
+        # refunds / bulk rows don't fit uint16; don't wrap them
+        return q.astype("int32")
+    return q.astype("uint16")
+
+
+def apply_sales_schema(frame: pd.DataFrame) -> pd.DataFrame:
+    """Cast raw sales columns to the in-memory schema (in place; returns the frame)."""
+    for c in SALES_CATEGORICALS:
+        if c in frame.columns and not isinstance(frame[c].dtype, pd.CategoricalDtype):
+            frame[c] = frame[c].astype("category")
+    if "quantity" in frame.columns:
+        frame["quantity"] = _narrow_quantity(frame["quantity"])
+    for c in SALES_FLOATS:
+        if c in frame.columns:
+            frame[c] = pd.to_numeric(frame[c], errors="coerce").astype("float32")
+    if "time" in frame.columns and "hour" not in frame.columns:
+        # normalize hour column for grouping
+        try:
+            frame["hour"] = parse_hour(frame["time"])
+        except Exception:
+            frame["hour"] = None
+    return frame
+
+
+def unify_categories(frames, columns):
+    """Return copies of `frames` whose categorical `columns` share one set of categories."""
+    frames = list(frames)
+    for c in columns:
+        if not any(c in f.columns for f in frames):
+            continue
+        cats = pd.Index([])
+        for f in frames:
+            if c not in f.columns:
+                continue
+            values = f[c].cat.categories if isinstance(f[c].dtype, pd.CategoricalDtype) else f[c].dropna().unique()
+            cats = cats.union(pd.Index(values))
+        # frames that already have exactly these categories are left as they are
+        frames = [
+            f.assign(**{c: pd.Categorical(f[c], categories=cats)})
+            if c in f.columns and not (isinstance(f[c].dtype, pd.CategoricalDtype) and f[c].cat.categories.equals(cats))
+            else f
+            for f in frames
+        ]
+    return frames
+
+
+def concat_sales(frames) -> pd.DataFrame:
+    """Concatenate sales frames without losing categorical dtypes."""
+    return pd.concat(unify_categories(frames, SALES_CATEGORICALS))
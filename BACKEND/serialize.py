@@ -0,0 +1,91 @@
+"""Bulk DataFrame -> JSON serialization.
+
+Endpoints used to build responses with `iterrows()` and per-value
+`float()` / `int()` calls, then FastAPI's `jsonable_encoder` walked the result
+again before `json.dumps`. Here each column is converted to native Python
+values in one `tolist()` call, and `FastJSONResponse` encodes straight to
+bytes with orjson. Returning a Response from an endpoint also makes FastAPI
+skip `jsonable_encoder` entirely.
+
+orjson is optional; without it we fall back to the stdlib encoder.
+"""
+import json
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+from metrics import stage
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def column_values(values) -> list:
+    """One column as a list of JSON-ready Python values.
+
+    datetime64 becomes 'YYYY-MM-DD', categoricals their labels and NaN None.
+    """
+    if isinstance(values, (pd.Series, pd.Index)):
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(object)
+        values = values.to_numpy()
+    arr = np.asarray(values)
+    if arr.dtype.kind == "M":
+        out = np.datetime_as_string(arr, unit="D").astype(object)
+        out[np.isnat(arr)] = None
+        return out.tolist()
+    if arr.dtype.kind == "f":
+        nan = np.isnan(arr)
+        if nan.any():
+            out = arr.astype(object)
+            out[nan] = None
+            return out.tolist()
+    if arr.dtype.kind == "O":
+        return [None if isinstance(v, float) and v != v else v for v in arr.tolist()]
+    return arr.tolist()
+
+
+def columnar(columns: Dict[str, Any]) -> Dict[str, list]:
+    """{"name": [...]} layout: one list per output column."""
+    with stage("serialize"):
+        return {name: column_values(col) for name, col in columns.items()}
+
+
+def records(columns: Dict[str, Any]) -> list:
+    """[{"name": value, ...}, ...] layout built from whole columns, not rows."""
+    with stage("serialize"):
+        names = list(columns)
+        cols = [column_values(c) for c in columns.values()]
+        return [dict(zip(names, row)) for row in zip(*cols)]
+
+
+def layout(columns: Dict[str, Any], shape: str = "records"):
+    """`records` (default) or `columns` layout for a series-shaped payload."""
+    return columnar(columns) if shape == "columns" else records(columns)
+
+
+def _default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (numpy scalars/arrays allowed)."""
+
+    def render(self, content) -> bytes:
+        with stage("serialize"):
+            return dumps(content)
@@ -0,0 +1,127 @@
+"""Ingredient stock projected from sales through the recipes.
+
+DATA/recipes.csv is the bill of materials: one (menu_item, ingredient,
+quantity) line per ingredient a menu item uses, quantity in the stock units of
+inventory.csv. It becomes one items x ingredients matrix, and from there
+everything is a matrix product over the cached item aggregates (the rollup,
+through `view.item_hours`), never the sales lines:
+
+    sold        items x days quantities from the first day the inventory counts
+                need up to the last day with sales
+    used        ingredients x days = recipe matrix.T @ sold
+    velocity    mean daily use over the trailing `window` days
+    since count use on the days after each ingredient's last_updated, read off a
+                running sum of `used`, subtracted from the counted stock
+
+and then for each ingredient the days until its estimated stock reaches the
+reorder level, and until it runs out, at that velocity. The cost grows with
+menu items x ingredients x days, not with stores or sales lines.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from forecast import window_cube
+from metrics import stage
+
+TOP_ITEMS = 3   # menu items listed as the main users of each ingredient
+
+
+@dataclass(frozen=True)
+class Recipes:
+    items: List[str]
+    ingredients: List[str]
+    matrix: np.ndarray         # items x ingredients, stock units used per item sold
+
+
+def load_recipes(path: str) -> Recipes:
+    """FileCache builder for recipes.csv."""
+    lines = pd.read_csv(path).dropna(subset=["menu_item", "ingredient"])
+    item = pd.Categorical(lines["menu_item"].astype(str).str.strip())
+    ingredient = pd.Categorical(lines["ingredient"].astype(str).str.strip())
+    matrix = np.zeros((len(item.categories), len(ingredient.categories)))
+    quantity = pd.to_numeric(lines["quantity"], errors="coerce").fillna(0).to_numpy(dtype="float64")
+    np.add.at(matrix, (item.codes, ingredient.codes), quantity)
+    return Recipes(list(item.categories), list(ingredient.categories), matrix)
+
+
+def load_stock(path: str) -> pd.DataFrame:
+    """FileCache builder for inventory.csv, typed for `project`."""
+    inv = pd.read_csv(path)
+    inv["item_name"] = inv["item_name"].astype(str).str.strip()
+    for col in ("current_stock", "reorder_level"):
+        inv[col] = pd.to_numeric(inv[col], errors="coerce").fillna(0.0)
+    inv["last_updated"] = pd.to_datetime(inv["last_updated"], errors="coerce").dt.date
+    return inv
+
+
+def _days(values: np.ndarray) -> list:
+    return [None if np.isnan(v) else round(float(v), 1) for v in values]
+
+
+def project(recipes: Recipes, stock: pd.DataFrame, view, window: int = 14) -> dict:
+    """Estimated stock, daily use and days until reorder / stockout for every inventory item."""
+    as_of = view.last_sale_day()
+    if as_of is None or stock.empty:
+        return {"as_of": None, "window_days": window, "ingredients": [], "unmapped_items": []}
+    # a count without a date is taken as current
+    counted = stock["last_updated"].where(stock["last_updated"].notna(), as_of)
+    counted = np.array([min(d, as_of) for d in counted], dtype="datetime64[D]")
+    start = min(as_of - timedelta(days=window - 1), (counted.min() + 1).item())
+    days = (as_of - start).days + 1
+
+    with stage("load"):
+        cells = view.item_hours(start, as_of)
+    with stage("aggregate"):
+        sold = window_cube(cells, recipes.items, start, days).sum(axis=2)       # items x days
+        # inventory rows with no recipe line get a zero column
+        pos = pd.Index(recipes.ingredients).get_indexer(stock["item_name"])
+        bom = np.where(pos >= 0, recipes.matrix[:, np.maximum(pos, 0)], 0.0)    # items x inventory rows
+        used = bom.T @ sold                                                      # inventory rows x days
+
+        item_velocity = sold[:, -window:].sum(axis=1) / window
+        velocity = bom.T @ item_velocity
+        running = np.concatenate([np.zeros((len(stock), 1)), np.cumsum(used, axis=1)], axis=1)
+        after = (counted - np.datetime64(start, "D")).astype("int64") + 1        # first day not in the count
+        since = running[:, -1] - running[np.arange(len(stock)), after]
+        estimated = np.maximum(stock["current_stock"].to_numpy(dtype="float64") - since, 0.0)
+        above = np.maximum(estimated - stock["reorder_level"].to_numpy(dtype="float64"), 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            to_reorder = np.where(velocity > 0, above / velocity, np.nan)
+            to_stockout = np.where(velocity > 0, estimated / velocity, np.nan)
+
+        share = bom * item_velocity[:, None]                                     # items x inventory rows
+        top = np.argsort(-share, axis=0, kind="stable")[:TOP_ITEMS].T
+        order = np.lexsort((stock["item_name"].to_numpy(), np.nan_to_num(to_stockout, nan=np.inf),
+                            np.nan_to_num(to_reorder, nan=np.inf)))
+        sold_items = set(map(str, cells["item_name"].unique()))
+
+    with stage("serialize"):
+        names, counts = stock["item_name"].tolist(), stock["current_stock"].tolist()
+        categories = stock["category"].tolist() if "category" in stock else [None] * len(stock)
+        levels, dates = stock["reorder_level"].tolist(), counted.astype(str).tolist()
+        since, estimated = np.round(since, 2).tolist(), np.round(estimated, 2).tolist()
+        usage, shares = np.round(velocity, 3).tolist(), np.round(share, 3)
+        reorder, stockout = _days(to_reorder), _days(to_stockout)
+        reorder_by = [None if d is None else (as_of + timedelta(days=int(np.ceil(t)))).isoformat()
+                      for d, t in zip(reorder, to_reorder)]
+        rows = [{
+            "item_name": names[i],
+            "category": categories[i],
+            "counted_stock": float(counts[i]),
+            "counted_on": dates[i],
+            "used_since_count": since[i],
+            "estimated_stock": estimated[i],
+            "reorder_level": float(levels[i]),
+            "daily_usage": usage[i],
+            "days_until_reorder": reorder[i],
+            "reorder_by": reorder_by[i],
+            "days_until_stockout": stockout[i],
+            "top_items": [{"item_name": recipes.items[k], "daily_usage": float(shares[k, i])}
+                          for k in top[i] if share[k, i] > 0],
+        } for i in order]
+    return {"as_of": as_of.isoformat(), "window_days": window, "ingredients": rows,
+            "unmapped_items": sorted(sold_items - set(recipes.items))}
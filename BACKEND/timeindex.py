@@ -0,0 +1,130 @@
+"""Sorted datetime64 indexing and binary-search date windows.
+
+Frames keyed by day are kept sorted on a native datetime64 index so a date
+range is two `searchsorted` calls plus a positional slice, instead of a
+boolean comparison over the whole column.
+
+`DailyPrefix` goes one step further for the daily stats: a row offset per
+calendar day turns any window into two array reads, and running totals turn
+a window's sum into one subtraction. Its `buckets` does the same per week,
+month or quarter, so a bucketed series costs one subtraction per bucket.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def index_by_date(frame: pd.DataFrame, column: str = "date") -> pd.DataFrame:
+    """Return `frame` indexed by a sorted, day-normalised DatetimeIndex built from `column`."""
+    dates = pd.to_datetime(frame[column]).dt.normalize()
+    out = frame.drop(columns=[column])
+    out.index = pd.DatetimeIndex(dates, name=column)
+    if not out.index.is_monotonic_increasing:
+        out = out.sort_index(kind="stable")
+    return out
+
+
+def _day(value) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).normalize().to_datetime64(), "ns")
+
+
+def window_bounds(dates, start=None, end=None):
+    """Positions [i, j) of the sorted datetime64 array `dates` that fall in [start, end]."""
+    values = np.asarray(dates, dtype="datetime64[ns]")
+    i = 0 if start is None else int(np.searchsorted(values, _day(start), side="left"))
+    j = len(values) if end is None else int(np.searchsorted(values, _day(end), side="right"))
+    return i, max(i, j)
+
+
+def date_window(frame: pd.DataFrame, start=None, end=None, column: str = "date") -> pd.DataFrame:
+    """Slice a date-sorted frame to [start, end] without scanning or copying it.
+
+    Uses the DatetimeIndex when there is one, otherwise the sorted `column`.
+    """
+    if start is None and end is None:
+        return frame
+    dates = frame.index if isinstance(frame.index, pd.DatetimeIndex) else frame[column]
+    i, j = window_bounds(dates, start, end)
+    return frame.iloc[i:j]
+
+
+# bucket name -> pandas period frequency; weeks start on Monday
+FREQUENCIES = {"daily": "D", "weekly": "W-SUN", "monthly": "M", "quarterly": "Q"}
+
+
+def bucket_starts(index: pd.DatetimeIndex, freq: str) -> pd.DatetimeIndex:
+    """First day of the daily / weekly / monthly / quarterly bucket of each date."""
+    return index.to_period(FREQUENCIES[freq]).start_time
+
+
+def _day_number(value) -> int:
+    return int(pd.Timestamp(value).to_datetime64().astype("datetime64[D]").astype(np.int64))
+
+
+class DailyPrefix:
+    """Constant-time windows and window totals over a date-indexed, date-sorted frame.
+
+    `starts[k]` is the first row dated on or after day `first + k` (one entry
+    per calendar day from the first row's date to the day after the last), and
+    `sums[c][i]` is the total of column c over rows [0, i).
+    """
+
+    def __init__(self, frame: pd.DataFrame, columns):
+        days = np.asarray(frame.index, dtype="datetime64[D]").astype(np.int64)
+        self.rows = len(days)
+        self.first = int(days[0]) if self.rows else 0
+        span = int(days[-1]) - self.first + 1 if self.rows else 0
+        self.starts = np.searchsorted(days, self.first + np.arange(span + 1), side="left")
+        self.sums = {}
+        self._edges = {}
+        for c in columns:
+            values = frame[c].to_numpy()
+            values = values.astype(np.int64) if values.dtype.kind in "iub" else values.astype(np.float64)
+            self.sums[c] = np.concatenate([np.zeros(1, dtype=values.dtype), np.cumsum(values)])
+
+    def _start_of(self, day: int) -> int:
+        return int(self.starts[min(max(day - self.first, 0), len(self.starts) - 1)])
+
+    def bounds(self, start=None, end=None, last: Optional[int] = None) -> Tuple[int, int]:
+        """Rows [i, j) dated within [start, end]; only the final `last` of them if given."""
+        i = 0 if start is None else self._start_of(_day_number(start))
+        j = self.rows if end is None else self._start_of(_day_number(end) + 1)
+        j = max(i, j)
+        if last:
+            i = max(i, j - last)
+        return i, j
+
+    def total(self, column: str, i: int, j: int):
+        s = self.sums[column]
+        return s[j] - s[i]
+
+    def _bucket_edges(self, freq: str) -> np.ndarray:
+        """First day (as a day number) of every `freq` bucket the data touches; computed once."""
+        edges = self._edges.get(freq)
+        if edges is None:
+            first = np.datetime64(self.first, "D")
+            periods = pd.period_range(first, first + (len(self.starts) - 2), freq=FREQUENCIES[freq])
+            edges = self._edges[freq] = periods.start_time.to_numpy().astype("datetime64[D]").astype(np.int64)
+        return edges
+
+    def buckets(self, freq: str, start=None, end=None, columns=None) -> pd.DataFrame:
+        """Column totals per `freq` bucket within [start, end], indexed by bucket start.
+
+        Buckets cut by the window only count its days; buckets without rows are left out.
+        """
+        columns = list(self.sums) if columns is None else columns
+        stop = self.first + len(self.starts) - 1
+        lo = self.first if start is None else max(self.first, _day_number(start))
+        hi = stop if end is None else min(stop, _day_number(end) + 1)
+        if not self.rows or lo >= hi:
+            return pd.DataFrame({c: self.sums[c][:0] for c in columns},
+                                index=pd.DatetimeIndex([], dtype="datetime64[ns]", name="date"))
+        edges = self._bucket_edges(freq)
+        b0 = int(np.searchsorted(edges, lo, side="right")) - 1
+        b1 = int(np.searchsorted(edges, hi, side="left"))
+        cuts = np.concatenate([[lo], edges[b0 + 1:b1], [hi]])
+        rows = self.starts[cuts - self.first]
+        keep = np.diff(rows) > 0
+        index = pd.DatetimeIndex(edges[b0:b1][keep].astype("datetime64[D]").astype("datetime64[ns]"), name="date")
+        return pd.DataFrame({c: np.diff(self.sums[c][rows])[keep] for c in columns}, index=index)
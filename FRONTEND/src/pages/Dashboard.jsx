@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
     Box,
     Grid,
@@ -31,7 +31,18 @@ import KPIGrid from '../kpis/KPIGrid';
 import RevenueChart from '../charts/RevenueChart';
 import ProductSalesChart from '../charts/ProductSalesChart';
 import PaymentMethodChart from '../charts/PaymentMethodChart';
-import api from '../services/api';
+import { fetchDashboardBundle, subscribeLive } from '../services/api';
+
+// Add live increments to the matching rows; cells without one are appended when `append` is set
+const addCells = (rows, cells, same, fields, append = true) => {
+    const out = rows.map(r => ({ ...r }));
+    cells.forEach(cell => {
+        const row = out.find(r => same(r, cell));
+        if (row) fields.forEach(f => { row[f] = Math.round(((row[f] || 0) + cell[f]) * 100) / 100; });
+        else if (append) out.push({ ...cell });
+    });
+    return out;
+};
 
 const Dashboard = () => {
     const [dashboardData, setDashboardData] = useState(null);
@@ -48,62 +59,54 @@ const Dashboard = () => {
     const [hourlyData, setHourlyData] = useState([]);
     const [heatmapData, setHeatmapData] = useState([]);
     const [feedbackSummary, setFeedbackSummary] = useState(null);
+    const [liveTotals, setLiveTotals] = useState({ revenue: 0, lines: 0 });
+    // window, category and live_version of the bundle on screen; null while one is loading
+    const shownRef = useRef(null);
+    // deltas that arrive while a bundle loads, replayed once it is in
+    const pendingRef = useRef([]);
+    const refetchRef = useRef(null);
+
     const fetchDashboardData = async () => {
         try {
             setLoading(true);
             setError(null);
+            shownRef.current = null;
 
             // Build query parameters based on filters
-            const params = new URLSearchParams();
+            const params = {};
             if (dateRange !== 'custom') {
-                params.append('period', dateRange);
+                params.period = dateRange;
             } else if (startDate && endDate) {
-                params.append('start_date', startDate);
-                params.append('end_date', endDate);
-            }
-
-            // Fetch comprehensive dashboard data
-            const [dashboardResponse, revenueResponse, productResponse, hourlyResponse] = await Promise.all([
-                api.get('/dashboard-data'),
-                api.get(`/revenue-trends?period=daily&${params.toString()}`),
-                api.get('/product-analytics'),
-                api.get('/hourly-analysis')
-            ]);
-
-            console.log('dashboardResponse', dashboardResponse.data);
-            console.log('revenueResponse', revenueResponse.data);
-
-            // Normalize dashboard payload
-            const dd = dashboardResponse.data || {};
-
-            // Normalize revenue series: backend may return { period, data: [...] } or an array directly
-            const revenueSeries = Array.isArray(revenueResponse.data)
-                ? revenueResponse.data
-                : (revenueResponse.data?.data ?? []);
-
-            // If dashboard kpi is present but zeroed, compute fallbacks from revenue/product/hourly arrays
-            const kpi = dd.kpi || {};
-            // compute total_revenue from revenueSeries if backend kpi total_revenue is falsy
-            if ((!kpi.total_revenue || kpi.total_revenue === 0) && revenueSeries.length > 0) {
-                const totalRevenue = revenueSeries.reduce((s, r) => s + (Number(r.total_revenue) || 0), 0);
-                kpi.total_revenue = totalRevenue;
+                params.start_date = startDate;
+                params.end_date = endDate;
             }
-            // compute total_transactions from top_products quantities if needed
-            if ((!kpi.total_transactions || kpi.total_transactions === 0) && Array.isArray(dd.top_products)) {
-                const tx = dd.top_products.reduce((s, p) => s + (Number(p.quantity) || 0), 0);
-                kpi.total_transactions = tx;
-            }
-            // avg_order_value fallback
-            if ((!kpi.avg_order_value || kpi.avg_order_value === 0) && kpi.total_revenue && kpi.total_transactions) {
-                kpi.avg_order_value = Number((kpi.total_revenue / Math.max(1, kpi.total_transactions)).toFixed(2));
-            }
-
-            // Attach normalized shapes back
-            dd.kpi = kpi;
-            setDashboardData(dd);
-            setRevenueData(revenueSeries || []);
-            setProductData(productResponse.data.top_products || productResponse.data?.top_products || []);
-            setHourlyData(hourlyResponse.data.hourly_data || hourlyResponse.data?.hourly_data || []);
+            if (category !== 'all') params.category = category;
+
+            // One round trip for every panel
+            const bundle = await fetchDashboardBundle(params);
+
+            setDashboardData({
+                kpi: bundle.kpi || {},
+                top_products: bundle.top_products || [],
+                payment_distribution: bundle.payment_distribution || [],
+            });
+            setRevenueData(bundle.revenue_trend || []);
+            setProductData(bundle.top_products || []);
+            setHourlyData(bundle.hourly_data || []);
+            setHeatmapData(bundle.heatmap || []);
+            setFeedbackSummary(bundle.feedback || null);
+            setLiveTotals({ revenue: 0, lines: 0 });
+
+            shownRef.current = {
+                version: bundle.live_version,
+                start_date: bundle.start_date,
+                end_date: bundle.end_date,
+                category: (bundle.category || 'all').toLowerCase(),
+                rolling: !params.start_date,
+            };
+            const pending = pendingRef.current;
+            pendingRef.current = [];
+            pending.forEach(applyDelta);
         } catch (err) {
             console.error('Error fetching dashboard data:', err);
             setError('Failed to load dashboard data. Please try again.');
@@ -112,33 +115,57 @@ const Dashboard = () => {
         }
     };
 
-    // Fetch heatmap and feedback summary from backend
-    const fetchExtraData = async () => {
-        try {
-            const params = new URLSearchParams();
-            if (dateRange !== 'custom') params.append('period', dateRange);
-            if (startDate && endDate) {
-                params.append('start_date', startDate);
-                params.append('end_date', endDate);
-            }
-
-            const [heatRes, fbRes] = await Promise.all([
-                api.get(`/heatmap?${params.toString()}`),
-                api.get('/feedback-summary')
-            ]);
-
-            setHeatmapData(heatRes.data.heatmap || []);
-            setFeedbackSummary(fbRes.data || null);
-        } catch (e) {
-            console.warn('Failed to load additional dashboard data', e);
+    // Deltas newer than the bundle, for its window and category, are added to the panels they touch
+    const applyDelta = (delta) => {
+        const shown = shownRef.current;
+        if (!shown) {
+            pendingRef.current.push(delta);
+            return;
+        }
+        if (shown.version == null || delta.version <= shown.version) return;
+        // a period window ('7d') ends on the latest day with sales: a later day moves it, so reload
+        if (shown.rolling && delta.changes.some(c => c.date > shown.end_date)) {
+            refetchRef.current();
+            return;
         }
+        const changes = delta.changes.filter(c =>
+            c.date >= shown.start_date && c.date <= shown.end_date &&
+            (shown.category === 'all' || c.category.toLowerCase() === shown.category));
+        if (!changes.length) return;
+        const cells = (key) => changes.flatMap(c => c[key] || []);
+
+        setHourlyData(prev => addCells(prev, cells('hourly'), (r, c) => r.hour === c.hour, ['quantity', 'revenue'])
+            .sort((a, b) => a.hour - b.hour));
+        setHeatmapData(prev => addCells(prev, cells('heatmap'), (r, c) => r.day === c.day && r.hour === c.hour,
+            ['value', 'revenue']));
+        // only the items already listed are known in full, so the top list is re-ranked, not extended
+        const rankProducts = (rows) => addCells(rows, cells('products'), (r, c) => r.item_name === c.item_name,
+            ['quantity', 'revenue'], false).sort((a, b) => b.revenue - a.revenue);
+        setProductData(rankProducts);
+        setDashboardData(prev => {
+            if (!prev) return prev;
+            const payments = addCells(prev.payment_distribution, cells('payments'), (r, c) => r.method === c.method,
+                ['revenue']);
+            const total = payments.reduce((sum, r) => sum + r.revenue, 0);
+            payments.forEach(r => { r.pct = total ? Math.round(r.revenue / total * 1000) / 10 : 0; });
+            return { ...prev, top_products: rankProducts(prev.top_products), payment_distribution: payments };
+        });
+        setLiveTotals(prev => ({
+            revenue: Math.round((prev.revenue + changes.reduce((sum, c) => sum + c.kpi.revenue, 0)) * 100) / 100,
+            lines: prev.lines + changes.reduce((sum, c) => sum + c.kpi.lines, 0),
+        }));
     };
+    refetchRef.current = fetchDashboardData;
 
     useEffect(() => {
         fetchDashboardData();
-        fetchExtraData();
     }, [dateRange, category, startDate, endDate]);
 
+    useEffect(() => {
+        // a reset means the increments can't be trusted any more: refetch the bundle
+        return subscribeLive(applyDelta, () => refetchRef.current());
+    }, []);
+
     const handleRefresh = () => {
         fetchDashboardData();
     };
@@ -474,6 +501,19 @@ const Dashboard = () => {
                                                     </Typography>
                                                 </Box>
                                             </Box>
+                                            {liveTotals.lines > 0 && (
+                                                <Box sx={{ display: 'flex', alignItems: 'center', gap: 2 }}>
+                                                    <RefreshIcon sx={{ color: '#4caf50' }} />
+                                                    <Box>
+                                                        <Typography variant="body2" sx={{ color: 'white' }}>
+                                                            Live: +₹{liveTotals.revenue}
+                                                        </Typography>
+                                                        <Typography variant="caption" sx={{ color: 'rgba(255,255,255,0.6)' }}>
+                                                            {liveTotals.lines} sale lines since this view loaded
+                                                        </Typography>
+                                                    </Box>
+                                                </Box>
+                                            )}
                                             <Box sx={{ display: 'flex', alignItems: 'center', gap: 2 }}>
                                                 <PeopleIcon sx={{ color: '#9c27b0' }} />
                                                 <Box>
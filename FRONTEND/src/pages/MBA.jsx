@@ -27,77 +27,46 @@ import {
 } from '@mui/icons-material';
 import DashboardLayout from '../layout/DashboardLayout';
 import Navbar from '../layout/Navbar';
+import { fetchMbaRules } from '../services/api';
 
 const MBA = () => {
-    const [minSupport, setMinSupport] = useState(0.1);
-    const [minConfidence, setMinConfidence] = useState(0.5);
+    const [minSupport, setMinSupport] = useState(0.01);
+    const [minConfidence, setMinConfidence] = useState(0.1);
     const [associationRules, setAssociationRules] = useState([]);
+    const [items, setItems] = useState([]);
     const [loading, setLoading] = useState(false);
+    const [error, setError] = useState(null);
 
-    // Mock data for demonstration
-    const mockRules = [
-        {
-            antecedents: ['Cappuccino'],
-            consequents: ['Croissant'],
-            support: 0.25,
-            confidence: 0.78,
-            lift: 1.8,
-            conviction: 2.1
-        },
-        {
-            antecedents: ['Latte'],
-            consequents: ['Blueberry Muffin'],
-            support: 0.18,
-            confidence: 0.65,
-            lift: 1.5,
-            conviction: 1.7
-        },
-        {
-            antecedents: ['Espresso'],
-            consequents: ['Chocolate Cake'],
-            support: 0.15,
-            confidence: 0.72,
-            lift: 2.1,
-            conviction: 2.5
-        },
-        {
-            antecedents: ['Green Tea'],
-            consequents: ['Veggie Sandwich'],
-            support: 0.12,
-            confidence: 0.68,
-            lift: 1.9,
-            conviction: 2.2
-        },
-        {
-            antecedents: ['Americano'],
-            consequents: ['Cheesecake'],
-            support: 0.20,
-            confidence: 0.61,
-            lift: 1.4,
-            conviction: 1.6
+    // Itemsets are mined once on the server; new thresholds only re-filter them
+    const loadRules = async (support = minSupport, confidence = minConfidence) => {
+        try {
+            setLoading(true);
+            setError(null);
+            const data = await fetchMbaRules({ min_support: support, min_confidence: confidence, limit: 100 });
+            setAssociationRules(data.rules || []);
+            setItems(data.items || []);
+        } catch (err) {
+            console.error('Error fetching association rules:', err);
+            setError('Failed to load association rules. Please try again.');
+        } finally {
+            setLoading(false);
         }
-    ];
+    };
 
+    // Network of the strongest rules: items as nodes sized by support, rules as links weighted by lift
+    const topRules = associationRules.slice(0, 10);
+    const itemInfo = Object.fromEntries(items.map(i => [i.item, i]));
     const networkData = {
-        nodes: [
-            { id: 'Cappuccino', group: 'coffee', size: 30 },
-            { id: 'Croissant', group: 'food', size: 25 },
-            { id: 'Latte', group: 'coffee', size: 28 },
-            { id: 'Blueberry Muffin', group: 'food', size: 20 },
-            { id: 'Espresso', group: 'coffee', size: 26 },
-            { id: 'Chocolate Cake', group: 'dessert', size: 22 },
-            { id: 'Green Tea', group: 'tea', size: 18 },
-            { id: 'Veggie Sandwich', group: 'food', size: 24 },
-            { id: 'Americano', group: 'coffee', size: 27 },
-            { id: 'Cheesecake', group: 'dessert', size: 21 }
-        ],
-        links: [
-            { source: 'Cappuccino', target: 'Croissant', strength: 1.8 },
-            { source: 'Latte', target: 'Blueberry Muffin', strength: 1.5 },
-            { source: 'Espresso', target: 'Chocolate Cake', strength: 2.1 },
-            { source: 'Green Tea', target: 'Veggie Sandwich', strength: 1.9 },
-            { source: 'Americano', target: 'Cheesecake', strength: 1.4 }
-        ]
+        nodes: [...new Set(topRules.flatMap(r => [...r.antecedents, ...r.consequents]))].map(id => ({
+            id,
+            group: (itemInfo[id]?.category || '').toLowerCase(),
+            size: Math.min(30, 12 + (itemInfo[id]?.support || 0) * 100)
+        })),
+        links: topRules.flatMap(r => r.antecedents.flatMap(a => r.consequents.map(c => ({
+            source: a,
+            target: c,
+            strength: r.lift
+        }))))
     };
 
     const getGroupColor = (group) => {
@@ -105,7 +74,8 @@ const MBA = () => {
             coffee: '#8D4004',
             food: '#4caf50',
             dessert: '#ff9800',
-            tea: '#4CAF50'
+            tea: '#4CAF50',
+            beverages: '#ab47bc'
         };
         return colors[group] || '#42a5f5';
     };
@@ -197,7 +167,7 @@ const MBA = () => {
 
                     {/* Legend */}
                     <Box sx={{ display: 'flex', justifyContent: 'center', gap: 2, flexWrap: 'wrap' }}>
-                        {Object.entries({ coffee: 'Coffee', food: 'Food', dessert: 'Dessert', tea: 'Tea' }).map(([key, label]) => (
+                        {[...new Set(data.nodes.map(n => n.group))].map(key => [key, key.charAt(0).toUpperCase() + key.slice(1)]).map(([key, label]) => (
                             <Box key={key} sx={{ display: 'flex', alignItems: 'center', gap: 1 }}>
                                 <Box
                                     sx={{
@@ -226,7 +196,7 @@ const MBA = () => {
                     <CardContent sx={{ textAlign: 'center' }}>
                         <NetworkIcon sx={{ fontSize: 32, color: '#42a5f5', mb: 1 }} />
                         <Typography variant="h4" sx={{ fontWeight: 'bold', color: 'white' }}>
-                            {mockRules.length}
+                            {associationRules.length}
                         </Typography>
                         <Typography variant="body2" sx={{ color: 'rgba(255,255,255,0.7)' }}>
                             Association Rules
@@ -239,7 +209,7 @@ const MBA = () => {
                     <CardContent sx={{ textAlign: 'center' }}>
                         <TrendingUpIcon sx={{ fontSize: 32, color: '#4caf50', mb: 1 }} />
                         <Typography variant="h4" sx={{ fontWeight: 'bold', color: 'white' }}>
-                            {Math.max(...mockRules.map(r => r.lift)).toFixed(1)}
+                            {associationRules.length ? Math.max(...associationRules.map(r => r.lift)).toFixed(1) : '-'}
                         </Typography>
                         <Typography variant="body2" sx={{ color: 'rgba(255,255,255,0.7)' }}>
                             Max Lift Score
@@ -252,7 +222,9 @@ const MBA = () => {
                     <CardContent sx={{ textAlign: 'center' }}>
                         <CartIcon sx={{ fontSize: 32, color: '#ff9800', mb: 1 }} />
                         <Typography variant="h4" sx={{ fontWeight: 'bold', color: 'white' }}>
-                            {(mockRules.reduce((sum, r) => sum + r.support, 0) / mockRules.length * 100).toFixed(1)}%
+                            {associationRules.length
+                                ? `${(associationRules.reduce((sum, r) => sum + r.support, 0) / associationRules.length * 100).toFixed(1)}%`
+                                : '-'}
                         </Typography>
                         <Typography variant="body2" sx={{ color: 'rgba(255,255,255,0.7)' }}>
                             Avg Support
@@ -276,14 +248,15 @@ const MBA = () => {
                 <Grid container spacing={3}>
                     <Grid item xs={12} sm={6}>
                         <Typography gutterBottom sx={{ color: 'rgba(255,255,255,0.8)' }}>
-                            Minimum Support: {minSupport.toFixed(2)}
+                            Minimum Support: {minSupport.toFixed(3)}
                         </Typography>
                         <Slider
                             value={minSupport}
                             onChange={(e, value) => setMinSupport(value)}
-                            min={0.05}
-                            max={0.5}
-                            step={0.01}
+                            onChangeCommitted={(e, value) => loadRules(value, minConfidence)}
+                            min={0.001}
+                            max={0.2}
+                            step={0.001}
                             sx={{
                                 color: '#4caf50',
                                 '& .MuiSlider-thumb': { backgroundColor: '#4caf50' },
@@ -299,7 +272,8 @@ const MBA = () => {
                         <Slider
                             value={minConfidence}
                             onChange={(e, value) => setMinConfidence(value)}
-                            min={0.1}
+                            onChangeCommitted={(e, value) => loadRules(minSupport, value)}
+                            min={0.01}
                             max={1.0}
                             step={0.01}
                             sx={{
@@ -314,13 +288,14 @@ const MBA = () => {
                 <Box sx={{ mt: 2 }}>
                     <Button
                         variant="contained"
-                        onClick={() => setLoading(true)}
+                        onClick={() => loadRules()}
+                        disabled={loading}
                         sx={{
                             backgroundColor: '#4caf50',
                             '&:hover': { backgroundColor: '#45a049' }
                         }}
                     >
-                        Update Analysis
+                        {loading ? 'Updating...' : 'Update Analysis'}
                     </Button>
                 </Box>
             </CardContent>
@@ -363,8 +338,6 @@ const MBA = () => {
                         </TableHead>
                         <TableBody>
                             {rules
-                                .filter(rule => rule.support >= minSupport && rule.confidence >= minConfidence)
-                                .sort((a, b) => b.lift - a.lift)
                                 .map((rule, index) => (
                                     <TableRow key={index}>
                                         <TableCell sx={{ color: 'white' }}>
@@ -408,26 +381,13 @@ const MBA = () => {
     );
 
     const InsightsPanel = () => {
-        const insights = [
-            {
-                title: "Top Cross-Sell Opportunity",
-                description: "Customers buying Espresso are 2.1x more likely to purchase Chocolate Cake",
-                action: "Create 'Afternoon Treat' combo offer",
-                impact: "Potential 15% revenue increase"
-            },
-            {
-                title: "Healthy Options Pairing",
-                description: "Green Tea and Veggie Sandwich show strong correlation (1.9x lift)",
-                action: "Promote as 'Healthy Choice' menu section",
-                impact: "Appeal to health-conscious customers"
-            },
-            {
-                title: "Classic Coffee Combo",
-                description: "Cappuccino and Croissant remain the strongest pairing (1.8x lift)",
-                action: "Maintain as signature breakfast combo",
-                impact: "Consistent revenue driver"
-            }
-        ];
+        // The three highest-lift rules, phrased for the menu team
+        const insights = associationRules.slice(0, 3).map(rule => ({
+            title: `${rule.antecedents.join(' + ')} → ${rule.consequents.join(' + ')}`,
+            description: `Customers buying ${rule.antecedents.join(' and ')} are ${rule.lift.toFixed(1)}x as likely to also buy ${rule.consequents.join(' and ')}`,
+            action: rule.lift > 1 ? 'Consider a combo offer or placing these together' : 'Rarely bought together; keep promotions separate',
+            impact: `Seen in ${(rule.support * 100).toFixed(1)}% of orders, ${(rule.confidence * 100).toFixed(0)}% confidence`
+        }));
 
         return (
             <Card sx={{
@@ -473,7 +433,7 @@ const MBA = () => {
     };
 
     useEffect(() => {
-        setAssociationRules(mockRules);
+        loadRules();
     }, []);
 
     return (
@@ -495,6 +455,12 @@ const MBA = () => {
                         <ControlPanel />
                     </Box>
 
+                    {error && (
+                        <Alert severity="error" sx={{ mb: 3 }}>
+                            {error}
+                        </Alert>
+                    )}
+
                     <Grid container spacing={3}>
                         {/* Network Visualization */}
                         <Grid item xs={12} lg={8}>
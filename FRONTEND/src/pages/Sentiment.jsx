@@ -44,28 +44,51 @@ import {
 } from 'recharts';
 import DashboardLayout from '../layout/DashboardLayout';
 import Navbar from '../layout/Navbar';
+import { fetchFeedbackSentiment } from '../services/api';
+
+const SENTIMENT_LEVELS = [
+    { key: 'positive', name: 'Positive', color: '#4caf50' },
+    { key: 'neutral', name: 'Neutral', color: '#ff9800' },
+    { key: 'negative', name: 'Negative', color: '#f44336' }
+];
 
 const Sentiment = () => {
     const [feedbackText, setFeedbackText] = useState('');
     const [analyzing, setAnalyzing] = useState(false);
     const [expandedRows, setExpandedRows] = useState(new Set());
 
-    // Mock sentiment data
-    const sentimentData = [
-        { name: 'Positive', value: 68, count: 342, color: '#4caf50' },
-        { name: 'Neutral', value: 22, count: 110, color: '#ff9800' },
-        { name: 'Negative', value: 10, count: 50, color: '#f44336' }
-    ];
-
-    const trendData = [
-        { date: '2024-01-01', positive: 65, neutral: 25, negative: 10 },
-        { date: '2024-01-02', positive: 70, neutral: 20, negative: 10 },
-        { date: '2024-01-03', positive: 68, neutral: 22, negative: 10 },
-        { date: '2024-01-04', positive: 72, neutral: 18, negative: 10 },
-        { date: '2024-01-05', positive: 69, neutral: 21, negative: 10 },
-        { date: '2024-01-06', positive: 71, neutral: 19, negative: 10 },
-        { date: '2024-01-07', positive: 68, neutral: 22, negative: 10 },
-    ];
+    const [sentimentData, setSentimentData] = useState(
+        SENTIMENT_LEVELS.map(({ name, color }) => ({ name, color, value: 0, count: 0 }))
+    );
+    const [trendData, setTrendData] = useState([]);
+    const [error, setError] = useState(null);
+
+    // Counts are scored once on the server and kept per day; weeks are summed from them
+    useEffect(() => {
+        const loadSentiment = async () => {
+            try {
+                setError(null);
+                const data = await fetchFeedbackSentiment({ freq: 'week' });
+                const { totals } = data;
+                setSentimentData(SENTIMENT_LEVELS.map(({ key, name, color }) => ({
+                    name,
+                    color,
+                    count: totals[key],
+                    value: totals.total ? Math.round((totals[key] / totals.total) * 1000) / 10 : 0,
+                })));
+                setTrendData((data.series || []).slice(-12).map((row) => ({
+                    date: row.date,
+                    positive: row.positive_pct,
+                    neutral: row.neutral_pct,
+                    negative: row.negative_pct,
+                })));
+            } catch (err) {
+                console.error('Error fetching feedback sentiment:', err);
+                setError('Failed to load feedback sentiment. Please try again.');
+            }
+        };
+        loadSentiment();
+    }, []);
 
     const mockFeedback = [
         {
@@ -336,7 +359,7 @@ const Sentiment = () => {
                     Sentiment Trends Over Time
                 </Typography>
                 <Typography variant="body2" sx={{ color: 'rgba(255,255,255,0.7)', mb: 3 }}>
-                    Daily sentiment percentages for the past week
+                    Weekly sentiment percentages for the last 12 weeks
                 </Typography>
 
                 <Box sx={{ height: 300 }}>
@@ -630,6 +653,12 @@ const Sentiment = () => {
                         Customer Sentiment Analysis
                     </Typography>
 
+                    {error && (
+                        <Alert severity="error" sx={{ mb: 3 }}>
+                            {error}
+                        </Alert>
+                    )}
+
                     {/* Sentiment Overview Cards */}
                     <Box mb={4}>
                         <SentimentOverviewCards />
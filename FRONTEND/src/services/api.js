@@ -9,3 +9,30 @@ const api = axios.create({
 });
 
 export default api;
+
+// Every dashboard panel in one request; params: { period } or { start_date, end_date }, plus { category }
+export const fetchDashboardBundle = async (params = {}) => {
+    const response = await api.get('/dashboard/bundle', { params });
+    return response.data;
+};
+
+// Association rules from the basket miner; params: { min_support, min_confidence, limit }
+export const fetchMbaRules = async (params = {}) => {
+    const response = await api.get('/mba/rules', { params });
+    return response.data;
+};
+
+// Feedback sentiment counts and shares; params: { freq: 'day' | 'week', start_date, end_date }
+export const fetchFeedbackSentiment = async (params = {}) => {
+    const response = await api.get('/feedback/sentiment', { params });
+    return response.data;
+};
+
+// Live dashboard updates over SSE; returns a function that closes the stream.
+// onDelta({ version, changes: [{ date, category, kpi, hourly, heatmap, products, payments }] }), onReset({ version })
+export const subscribeLive = (onDelta, onReset) => {
+    const source = new EventSource(`${api.defaults.baseURL}/live/stream`);
+    source.addEventListener('delta', (e) => onDelta(JSON.parse(e.data)));
+    source.addEventListener('reset', (e) => onReset(JSON.parse(e.data)));
+    return () => source.close();
+};